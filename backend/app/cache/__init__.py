@@ -0,0 +1,2 @@
+from .shared_cache import SharedCache, get_shared_cache
+from .single_flight import SingleFlight
@@ -0,0 +1,295 @@
+"""
+Host-wide cache shared by every worker process.
+
+Each uvicorn worker has its own memory, so in-process caches warm up once
+per worker. This cache keeps entries in a single SQLite file in WAL mode:
+readers never block the writer or each other. The file is memory-mapped, so
+the workers on a host read pages straight from the shared page cache with no
+network hop.
+
+Entries are grouped by namespace (e.g. "render", "llm"). Inserts are atomic
+(INSERT OR REPLACE in one transaction), so concurrent workers never see a
+partial value; the last writer of a key wins. The file is bounded by total
+value size. When a worker has written enough to possibly cross the bound, it
+deletes expired entries and then the least recently used ones until the cache
+is back under SHARED_CACHE_LOW_WATER of the limit. It does this under an
+immediate transaction, so only one worker evicts at a time.
+
+SQLite calls run in a worker thread so they never block the event loop. A
+failing database (locked for too long, disk full, corrupt file) is logged
+and treated as a miss: the cache can slow nothing down but itself. If the
+database cannot be opened or set up at all (a read-only or unwritable
+SHARED_CACHE_PATH, a path SQLite cannot create a file at), the cache disables
+itself for the life of the process.
+"""
+
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from app.observability.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+# Database file shared by the workers on a host (empty disables the cache)
+SHARED_CACHE_PATH = os.getenv("SHARED_CACHE_PATH", ".cache/shared_cache.db")
+# Total size of stored values before the least recently used are evicted
+SHARED_CACHE_MAX_BYTES = int(os.getenv("SHARED_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+# Fraction of the limit eviction brings the cache back down to
+SHARED_CACHE_LOW_WATER = float(os.getenv("SHARED_CACHE_LOW_WATER", "0.9"))
+# Bytes of the file memory-mapped by each connection
+SHARED_CACHE_MMAP_BYTES = int(os.getenv("SHARED_CACHE_MMAP_BYTES", str(256 * 1024 * 1024)))
+# Milliseconds a connection waits for another worker's write lock
+SHARED_CACHE_BUSY_TIMEOUT_MS = int(os.getenv("SHARED_CACHE_BUSY_TIMEOUT_MS", "2000"))
+
+# Reads refresh an entry's recency at most this often, so hot keys do not
+# turn every lookup into a write
+_TOUCH_INTERVAL_SECONDS = 60.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache_entries (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    expires_at REAL,
+    accessed_at REAL NOT NULL,
+    PRIMARY KEY (namespace, key)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS cache_entries_accessed_at ON cache_entries (accessed_at);
+"""
+
+
+class _CacheUnavailableError(Exception):
+    """The cache database could not be opened or set up; raised from the underlying error."""
+
+
+class SharedCache:
+    """
+    Size-bounded key/value cache in a SQLite file shared across processes.
+
+    Args:
+        path: Database file; its directory is created if missing
+        max_bytes: Total value size at which the least recently used entries are evicted
+        mmap_bytes: Bytes of the file each connection memory-maps
+    """
+
+    def __init__(
+        self,
+        path: str = SHARED_CACHE_PATH,
+        max_bytes: int = SHARED_CACHE_MAX_BYTES,
+        mmap_bytes: int = SHARED_CACHE_MMAP_BYTES
+    ):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.mmap_bytes = mmap_bytes
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        self._schema_ready = False
+        # Check the bound after this many bytes are written, so a worker that
+        # writes little rarely pays for the size query
+        self._check_every_bytes = max(1, int(max_bytes * (1 - SHARED_CACHE_LOW_WATER) / 2))
+        self._written_since_check = self._check_every_bytes
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        self.errors = 0
+        self.disabled = False
+
+    def _connection(self) -> sqlite3.Connection:
+        """
+        Returns this thread's connection, opening and configuring it on first use.
+
+        Raises:
+            _CacheUnavailableError: If the database cannot be opened or set up
+        """
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            return connection
+
+        try:
+            connection = self._open()
+        except (OSError, sqlite3.Error) as e:
+            raise _CacheUnavailableError(e) from e
+
+        self._local.connection = connection
+        with self._connections_lock:
+            self._connections.append(connection)
+        return connection
+
+    def _open(self) -> sqlite3.Connection:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Autocommit mode: transactions are opened explicitly where needed
+        connection = sqlite3.connect(
+            self.path,
+            timeout=SHARED_CACHE_BUSY_TIMEOUT_MS / 1000,
+            isolation_level=None,
+            check_same_thread=False
+        )
+        try:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(f"PRAGMA mmap_size={int(self.mmap_bytes)}")
+            connection.execute(f"PRAGMA busy_timeout={SHARED_CACHE_BUSY_TIMEOUT_MS}")
+            if not self._schema_ready:
+                connection.executescript(_SCHEMA)
+                self._schema_ready = True
+        except BaseException:
+            connection.close()
+            raise
+        return connection
+
+    def _disable(self, error: Exception) -> None:
+        if not self.disabled:
+            self.disabled = True
+            logger.warning("Disabling the shared cache, %s is not usable: %s", self.path, error)
+
+    async def get(self, namespace: str, key: str) -> Optional[str]:
+        """Returns the unexpired value stored under `key`, or None."""
+        value = None
+        if not self.disabled:
+            try:
+                value = await asyncio.to_thread(self._get, namespace, key)
+            except _CacheUnavailableError as e:
+                self.errors += 1
+                self._disable(e.__cause__)
+            except sqlite3.Error as e:
+                self.errors += 1
+                logger.warning("Shared cache read failed: %s", e, extra={"namespace": namespace})
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def _get(self, namespace: str, key: str) -> Optional[str]:
+        connection = self._connection()
+        now = time.time()
+        row = connection.execute(
+            "SELECT value, expires_at, accessed_at FROM cache_entries WHERE namespace = ? AND key = ?",
+            (namespace, key)
+        ).fetchone()
+        if row is None:
+            return None
+        value, expires_at, accessed_at = row
+        if expires_at is not None and expires_at <= now:
+            return None
+        if now - accessed_at > _TOUCH_INTERVAL_SECONDS:
+            connection.execute(
+                "UPDATE cache_entries SET accessed_at = ? WHERE namespace = ? AND key = ?",
+                (now, namespace, key)
+            )
+        return value
+
+    async def put(self, namespace: str, key: str, value: str, ttl: Optional[float] = None) -> None:
+        """
+        Stores `value` under `key`, replacing any previous entry.
+
+        Args:
+            namespace: Group the key belongs to
+            key: Entry key, unique within the namespace
+            value: Text to store
+            ttl: Seconds until the entry expires; None keeps it until evicted
+        """
+        size = len(value.encode("utf-8"))
+        if self.disabled or size > self.max_bytes:
+            return
+        try:
+            await asyncio.to_thread(self._put, namespace, key, value, size, ttl)
+            self.writes += 1
+        except _CacheUnavailableError as e:
+            self.errors += 1
+            self._disable(e.__cause__)
+        except sqlite3.Error as e:
+            self.errors += 1
+            logger.warning("Shared cache write failed: %s", e, extra={"namespace": namespace})
+
+    def _put(self, namespace: str, key: str, value: str, size: int, ttl: Optional[float]) -> None:
+        connection = self._connection()
+        now = time.time()
+        connection.execute(
+            "INSERT OR REPLACE INTO cache_entries (namespace, key, value, size, expires_at, accessed_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (namespace, key, value, size, now + ttl if ttl is not None else None, now)
+        )
+        self._written_since_check += size
+        if self._written_since_check >= self._check_every_bytes:
+            self._written_since_check = 0
+            try:
+                self._evict(connection, now)
+            except sqlite3.Error as e:
+                # The entry is already stored; the next check retries the eviction
+                self.errors += 1
+                logger.warning("Shared cache eviction failed: %s", e)
+
+    def _evict(self, connection: sqlite3.Connection, now: float) -> None:
+        """Deletes expired entries, then the least recently used ones down to the low watermark."""
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            evicted = connection.execute(
+                "DELETE FROM cache_entries WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,)
+            ).rowcount
+            total = connection.execute("SELECT COALESCE(SUM(size), 0) FROM cache_entries").fetchone()[0]
+            if total > self.max_bytes:
+                # Oldest entries whose removal brings the total under the low watermark
+                excess = total - int(self.max_bytes * SHARED_CACHE_LOW_WATER)
+                evicted += connection.execute(
+                    "DELETE FROM cache_entries WHERE (namespace, key) IN ("
+                    " SELECT namespace, key FROM ("
+                    "  SELECT namespace, key, SUM(size) OVER (ORDER BY accessed_at, namespace, key) - size AS before"
+                    "  FROM cache_entries"
+                    " ) WHERE before < ?"
+                    ")",
+                    (excess,)
+                ).rowcount
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        if evicted:
+            self.evictions += evicted
+            logger.debug("Evicted %d shared cache entries", evicted)
+
+    def close(self) -> None:
+        """Closes every connection opened by this cache."""
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+        for connection in connections:
+            try:
+                connection.close()
+            except sqlite3.Error:
+                pass
+        self._local = threading.local()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit, miss, write and eviction counters for this process."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "writes": self.writes,
+            "evictions": self.evictions,
+            "errors": self.errors,
+            "enabled": not self.disabled,
+            "max_bytes": self.max_bytes,
+        }
+
+
+_shared_cache: Optional[SharedCache] = None
+
+
+def get_shared_cache() -> Optional[SharedCache]:
+    """Returns the process-wide SharedCache, or None when SHARED_CACHE_PATH is empty."""
+    global _shared_cache
+    if _shared_cache is None and SHARED_CACHE_PATH:
+        _shared_cache = SharedCache()
+    return _shared_cache
@@ -0,0 +1,83 @@
+"""
+Single-flight coalescing of identical concurrent work.
+
+When many requests need the same result at once (say, a campaign sends
+thousands of users to one template prompt), only the first starts the work.
+The others await the same task and share its result or exception. The entry
+is dropped as soon as the task finishes, so this is not a cache: a later
+request starts fresh work (or finds the result in a real cache).
+
+Each caller awaits the shared task through asyncio.shield, so one caller
+being cancelled (a client disconnecting, a per-request deadline expiring)
+does not cancel the work for the others. The shared task is cancelled only
+when every caller waiting on it has gone.
+"""
+
+import asyncio
+from typing import Awaitable, Callable, Dict, Generic, Hashable, TypeVar
+
+from app.observability.metrics import COALESCED_REQUESTS
+
+T = TypeVar("T")
+
+
+class _Flight:
+    """One in-flight task and the number of callers waiting on it."""
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight(Generic[T]):
+    """
+    Runs at most one task per key at a time and shares it among callers.
+
+    Args:
+        name: Label of the coalesced work in metrics (e.g. "llm", "render")
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._flights: Dict[Hashable, _Flight] = {}
+
+    @property
+    def in_flight(self) -> int:
+        """Number of keys currently being worked on."""
+        return len(self._flights)
+
+    async def run(self, key: Hashable, func: Callable[[], Awaitable[T]]) -> T:
+        """
+        Returns the result of `func()`, joining the call already in flight for
+        `key` if there is one.
+
+        `func` runs in its own task, created in the first caller's context.
+
+        Raises:
+            Whatever the shared call raises, to every caller waiting on it
+        """
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _Flight(asyncio.ensure_future(func()))
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda _: self._finish(key, flight))
+        else:
+            COALESCED_REQUESTS.inc(group=self.name, outcome="coalesced")
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                # Every caller has gone; nobody is left to use the result
+                self._finish(key, flight)
+                flight.task.cancel()
+                COALESCED_REQUESTS.inc(group=self.name, outcome="abandoned")
+
+    def _finish(self, key: Hashable, flight: _Flight) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+        if flight.task.done() and not flight.task.cancelled():
+            # Mark the exception as retrieved when no caller was left to await it
+            flight.task.exception()
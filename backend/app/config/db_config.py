@@ -1,25 +1,89 @@
 import os
+from typing import Optional
 from dotenv import load_dotenv
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker, declarative_base
 
 load_dotenv()
-DATABASE_URL = os.getenv("DATABASE_URL")
 
+Base = declarative_base()
 
-async_engine = create_async_engine(
-    DATABASE_URL,
-    echo=True,  
-)
+# The engine and session factory are created on first use, so importing the
+# app (or a script that only needs the ORM models) never opens a pool and
+# does not require DATABASE_URL to be set
+_async_engine: Optional[AsyncEngine] = None
+_session_factory: Optional[sessionmaker] = None
 
+# Connection pool sizing. Request handlers no longer hold a session for the
+# whole generation, so the pool only has to cover the job workers, the card
+# writer and short lookups
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "5"))
+# Seconds to wait for a free connection before failing
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))
+# Recycle connections older than this many seconds (-1 never recycles)
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
 
-AsyncSessionLocal = sessionmaker(
-    bind=async_engine,
-    class_=AsyncSession,
-    expire_on_commit=False,
-)
 
-Base = declarative_base()
+def _pool_options(database_url: str) -> dict:
+    """Pool keyword arguments for create_async_engine; SQLite keeps its default pool."""
+    if database_url.startswith("sqlite"):
+        return {}
+    return {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+
+
+def database_configured() -> bool:
+    """Returns True if a DATABASE_URL is set for this process."""
+    return bool(os.getenv("DATABASE_URL"))
+
+
+def get_engine() -> AsyncEngine:
+    """
+    Returns the process-wide async engine, creating it on first use.
+
+    Raises:
+        RuntimeError: If DATABASE_URL is not set
+    """
+    global _async_engine
+    if _async_engine is None:
+        database_url = os.getenv("DATABASE_URL")
+        if not database_url:
+            raise RuntimeError("DATABASE_URL is not set")
+        _async_engine = create_async_engine(
+            database_url,
+            # SQL statement logging is very noisy; enable it only when debugging queries
+            echo=os.getenv("DB_ECHO", "false").lower() == "true",
+            **_pool_options(database_url)
+        )
+    return _async_engine
+
+
+def get_sessionmaker() -> sessionmaker:
+    """Returns the session factory bound to the process-wide engine."""
+    global _session_factory
+    if _session_factory is None:
+        _session_factory = sessionmaker(
+            bind=get_engine(),
+            class_=AsyncSession,
+            expire_on_commit=False,
+        )
+    return _session_factory
+
+
+def AsyncSessionLocal() -> AsyncSession:
+    """
+    Opens a new database session; use as `async with AsyncSessionLocal() as session`.
+    """
+    return get_sessionmaker()()
+
 
 async def get_db() -> AsyncSession:
     """
@@ -27,3 +91,34 @@ async def get_db() -> AsyncSession:
     """
     async with AsyncSessionLocal() as session:
         yield session
+
+
+async def init_models() -> None:
+    """
+    Creates any missing tables for the ORM models registered on Base.
+    """
+    # Import models so they are registered on Base.metadata
+    import app.model.generation_job  # noqa: F401
+    import app.model.card_record  # noqa: F401
+
+    async with get_engine().begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+
+async def ping_database() -> None:
+    """
+    Runs a trivial query to check the database is reachable.
+
+    Raises:
+        RuntimeError: If DATABASE_URL is not set
+    """
+    async with get_engine().connect() as conn:
+        await conn.execute(text("SELECT 1"))
+
+
+async def dispose_engine() -> None:
+    """Closes every pooled connection; the engine is recreated on next use."""
+    global _async_engine, _session_factory
+    engine, _async_engine, _session_factory = _async_engine, None, None
+    if engine is not None:
+        await engine.dispose()
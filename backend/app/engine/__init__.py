@@ -1 +1,4 @@
-from .fractal_engine import *
\ No newline at end of file
+"""Pattern generation engines; submodules are imported on first use."""
+from .lazy_exports import lazy_exports
+
+__getattr__, __dir__ = lazy_exports(__name__, ("fractal_engine", "renderer", "complexity"))
@@ -0,0 +1,332 @@
+"""
+Preflight complexity estimates and the complexity budget governor.
+
+Nothing in the engine models bounds the work a config causes: L-system
+`iterations` is unconstrained and a small grammar grows exponentially, so a
+config can exhaust memory before the renderer returns. The estimators here
+predict, from the config alone, how many line segments a pattern paints
+across the card, how large its SVG is and roughly how much CPU the render
+takes:
+
+- L-system: symbol counts are propagated through the rules' growth matrix
+  (how many of each symbol every symbol rewrites to) iteration by
+  iteration, without ever building the string. Cycles in the counts are
+  extrapolated in closed form, and the propagation stops as soon as the CPU
+  estimate is over budget.
+- Parametric: every cost is linear in `num_points`.
+- Tessellation: the number of tiles painted follows from the tile size and
+  spacing.
+
+govern_complexity() checks an estimate against a ComplexityBudget and, when
+it is exceeded, reduces the config's detail (L-system iterations, parametric
+num_points, tessellation tile density) until it fits or reaches the bounds
+of the config model, returning one ComplexityDowngrade per reduced
+parameter. L-system iteration counts are also capped at what the renderer
+can draw.
+
+Costs are rough per-operation figures for the pure-Python engines; they only
+have to rank configs against the budget, not predict exact render times.
+"""
+
+import math
+import os
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.engine.fractal_engine.models import ComplexityDowngrade, LSystemConfig, LSystemPatternParams
+from app.engine.parametric_engine.models import ParametricConfig
+from app.engine.tessellation_engine.models import TessellationConfig
+
+
+# Default budgets; a config whose estimate exceeds any of them is downgraded
+COMPLEXITY_MAX_SEGMENTS = int(os.getenv("COMPLEXITY_MAX_SEGMENTS", "2000000"))
+COMPLEXITY_MAX_OUTPUT_BYTES = int(os.getenv("COMPLEXITY_MAX_OUTPUT_BYTES", "4000000"))
+COMPLEXITY_MAX_CPU_SECONDS = float(os.getenv("COMPLEXITY_MAX_CPU_SECONDS", "2.0"))
+
+# Card and pattern tile layout used by the processors
+CARD_AREA = 1080 * 1920
+PATTERN_TILE_SIZE = 300
+SVG_BASE_BYTES = 1000
+# "L x y " (or "M x y ") with full float precision
+PATH_BYTES_PER_COMMAND = 40
+
+# Approximate CPU cost of the engines' inner loops
+L_SYSTEM_SECONDS_PER_ITERATION = 0.15e-6
+L_SYSTEM_SECONDS_PER_REWRITTEN_SYMBOL = 20e-9
+L_SYSTEM_SECONDS_PER_SYMBOL = 0.9e-6
+L_SYSTEM_SECONDS_PER_SEGMENT = 1.8e-6
+PARAMETRIC_SECONDS_PER_POINT = 4e-6
+TESSELLATION_SECONDS = 0.2e-3
+
+# The renderer scales segments by 1.2**-iterations: past this they are far below
+# a pixel, and past ~3900 the scaling overflows, so more iterations add no detail
+L_SYSTEM_MAX_ITERATIONS = 100
+PARAMETRIC_MIN_POINTS = 500
+TESSELLATION_MAX_TILE_SIZE = 200.0
+TILE_EDGES = {"square": 4, "hexagon": 6, "triangle": 3, "diamond": 4}
+
+
+class ComplexityEstimate:
+    """
+    Predicted cost of rendering one pattern config.
+
+    Args:
+        segments: Line segments painted across the card
+        output_bytes: Size of the pattern SVG
+        cpu_seconds: Approximate render CPU time
+    """
+
+    def __init__(self, segments: float, output_bytes: float, cpu_seconds: float):
+        self.segments = segments
+        self.output_bytes = output_bytes
+        self.cpu_seconds = cpu_seconds
+
+    def as_dict(self) -> Dict[str, float]:
+        return {"segments": self.segments, "output_bytes": self.output_bytes, "cpu_seconds": self.cpu_seconds}
+
+    def __repr__(self) -> str:
+        return (
+            f"ComplexityEstimate(segments={self.segments:.0f}, "
+            f"output_bytes={self.output_bytes:.0f}, cpu_seconds={self.cpu_seconds:.3f})"
+        )
+
+
+class ComplexityBudget:
+    """
+    Upper bounds on the estimated cost of a render.
+
+    Args:
+        max_segments: Segments painted across the card
+        max_output_bytes: Pattern SVG size
+        max_cpu_seconds: Render CPU time
+    """
+
+    def __init__(
+        self,
+        max_segments: float = COMPLEXITY_MAX_SEGMENTS,
+        max_output_bytes: float = COMPLEXITY_MAX_OUTPUT_BYTES,
+        max_cpu_seconds: float = COMPLEXITY_MAX_CPU_SECONDS
+    ):
+        self.limits = {
+            "segments": max_segments,
+            "output_bytes": max_output_bytes,
+            "cpu_seconds": max_cpu_seconds,
+        }
+
+    def exceeded(self, estimate: ComplexityEstimate) -> Optional[Tuple[str, float, float]]:
+        """
+        Returns (limit, estimated, budget) for the most exceeded limit, or None
+        if the estimate fits.
+        """
+        usage = estimate.as_dict()
+        worst = max(self.limits, key=lambda name: usage[name] / self.limits[name])
+        if usage[worst] <= self.limits[worst]:
+            return None
+        return worst, usage[worst], self.limits[worst]
+
+    def headroom(self, estimate: ComplexityEstimate) -> float:
+        """The factor by which every linear cost must shrink to fit (1.0 when it already fits)."""
+        usage = estimate.as_dict()
+        return min([1.0] + [self.limits[name] / usage[name] for name in self.limits if usage[name] > 0])
+
+
+def _l_system_estimate(params: LSystemPatternParams, iterations: int, max_cpu_seconds: float) -> ComplexityEstimate:
+    """
+    Estimates an L-system render by propagating symbol counts through the
+    rules. Stops early (returning a lower bound that is already over budget)
+    once the rewriting alone exceeds `max_cpu_seconds`.
+    """
+    # Only single-character rules ever match (the rewriter works per character)
+    productions = {symbol: Counter(replacement) for symbol, replacement in params.rules.items() if len(symbol) == 1}
+    counts = Counter(params.axiom)
+    rewrite_seconds = 0.0
+    seen: Dict[Tuple[Tuple[str, int], ...], int] = {}
+    history: List[Counter] = []
+
+    iteration = 0
+    while iteration < iterations:
+        state = tuple(sorted(counts.items()))
+        if state in seen:
+            # The counts repeat with this period: extrapolate the remaining iterations
+            start = seen[state]
+            cycle = history[start:]
+            cycle_seconds = sum(
+                L_SYSTEM_SECONDS_PER_ITERATION + L_SYSTEM_SECONDS_PER_REWRITTEN_SYMBOL * sum(c.values())
+                for c in cycle[1:] + [counts]
+            )
+            remaining = iterations - iteration
+            full_cycles, partial = divmod(remaining, len(cycle))
+            rewrite_seconds += full_cycles * cycle_seconds
+            for step in range(1, partial + 1):
+                rewrite_seconds += (
+                    L_SYSTEM_SECONDS_PER_ITERATION
+                    + L_SYSTEM_SECONDS_PER_REWRITTEN_SYMBOL * sum(cycle[step % len(cycle)].values())
+                )
+            counts = cycle[partial % len(cycle)]
+            break
+        seen[state] = iteration
+        history.append(counts)
+
+        next_counts: Counter = Counter()
+        for symbol, count in counts.items():
+            production = productions.get(symbol)
+            if production is None:
+                next_counts[symbol] += count
+            else:
+                for produced, multiplicity in production.items():
+                    next_counts[produced] += count * multiplicity
+        counts = next_counts
+        iteration += 1
+        rewrite_seconds += L_SYSTEM_SECONDS_PER_ITERATION + L_SYSTEM_SECONDS_PER_REWRITTEN_SYMBOL * sum(counts.values())
+        if rewrite_seconds > max_cpu_seconds:
+            break
+
+    symbols = sum(counts.values())
+    segments = counts["F"] + counts["G"]
+    moves = counts["]"]
+    return ComplexityEstimate(
+        segments=segments * CARD_AREA / PATTERN_TILE_SIZE ** 2,
+        output_bytes=SVG_BASE_BYTES + PATH_BYTES_PER_COMMAND * (segments + moves),
+        cpu_seconds=rewrite_seconds + L_SYSTEM_SECONDS_PER_SYMBOL * symbols + L_SYSTEM_SECONDS_PER_SEGMENT * (segments + moves)
+    )
+
+
+def _parametric_estimate(num_points: int) -> ComplexityEstimate:
+    return ComplexityEstimate(
+        segments=num_points * CARD_AREA / PATTERN_TILE_SIZE ** 2,
+        output_bytes=SVG_BASE_BYTES + PATH_BYTES_PER_COMMAND * num_points,
+        cpu_seconds=PARAMETRIC_SECONDS_PER_POINT * num_points
+    )
+
+
+def _tessellation_estimate(config: TessellationConfig, tile_size: float) -> ComplexityEstimate:
+    params = config.parameters
+    shape = params.tile_shape
+    # Pattern cell dimensions and tiles per cell, as laid out by the processor
+    if shape == "hexagon":
+        cell_area = (tile_size * 0.75 + params.spacing) * (tile_size * math.sqrt(3) / 2 + params.spacing)
+    elif shape == "triangle":
+        cell_area = (tile_size + params.spacing) * (tile_size * math.sqrt(3) / 2 + params.spacing)
+    else:
+        cell_area = (tile_size + params.spacing) ** 2
+    tiles_per_cell = 2 if shape in ("hexagon", "triangle") and len(params.color_palette) > 1 else 1
+    edges = TILE_EDGES.get(shape, 4) * tiles_per_cell
+    return ComplexityEstimate(
+        segments=edges * CARD_AREA / cell_area,
+        output_bytes=SVG_BASE_BYTES + PATH_BYTES_PER_COMMAND * 2 * edges,
+        cpu_seconds=TESSELLATION_SECONDS
+    )
+
+
+def estimate_complexity(engine_type: str, config: Any, budget: Optional[ComplexityBudget] = None) -> ComplexityEstimate:
+    """
+    Predicts the cost of rendering a validated engine config.
+
+    Args:
+        engine_type: "l_system", "parametric" or "tessellation"
+        config: The engine's config model
+        budget: Lets the L-system estimate stop early once the CPU budget is exceeded
+
+    Returns:
+        The ComplexityEstimate for the config
+    """
+    budget = budget or ComplexityBudget()
+    if engine_type == "parametric":
+        return _parametric_estimate(config.parameters.num_points)
+    if engine_type == "tessellation":
+        return _tessellation_estimate(config, config.parameters.tile_size)
+    return _l_system_estimate(config.parameters, config.parameters.iterations, budget.limits["cpu_seconds"])
+
+
+def _downgrade(parameter: str, original, applied, exceeded: Tuple[str, float, float]) -> ComplexityDowngrade:
+    limit, estimated, budget = exceeded
+    return ComplexityDowngrade(
+        parameter=parameter, original=original, applied=applied,
+        limit=limit, estimated=estimated, budget=budget
+    )
+
+
+def _govern_l_system(config: LSystemConfig, budget: ComplexityBudget) -> Tuple[LSystemConfig, List[ComplexityDowngrade]]:
+    params = config.parameters
+    max_cpu_seconds = budget.limits["cpu_seconds"]
+    exceeded = budget.exceeded(_l_system_estimate(params, params.iterations, max_cpu_seconds))
+    if exceeded is None:
+        if params.iterations <= L_SYSTEM_MAX_ITERATIONS:
+            return config, []
+        exceeded = ("iterations", params.iterations, L_SYSTEM_MAX_ITERATIONS)
+
+    # Highest iteration count that fits; costs grow with iterations, so bisect
+    low, high = 0, min(params.iterations - 1, L_SYSTEM_MAX_ITERATIONS)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if budget.exceeded(_l_system_estimate(params, middle, max_cpu_seconds)) is None:
+            low = middle
+        else:
+            high = middle - 1
+    iterations = max(low, 0)
+    if iterations >= params.iterations:
+        return config, []
+
+    governed = config.model_copy(update={"parameters": params.model_copy(update={"iterations": iterations})})
+    return governed, [_downgrade("iterations", params.iterations, iterations, exceeded)]
+
+
+def _govern_parametric(config: ParametricConfig, budget: ComplexityBudget) -> Tuple[ParametricConfig, List[ComplexityDowngrade]]:
+    params = config.parameters
+    estimate = _parametric_estimate(params.num_points)
+    exceeded = budget.exceeded(estimate)
+    if exceeded is None:
+        return config, []
+    headroom = budget.headroom(estimate)
+    num_points = max(PARAMETRIC_MIN_POINTS, int(params.num_points * headroom))
+    if num_points >= params.num_points:
+        return config, []
+    governed = config.model_copy(update={"parameters": params.model_copy(update={"num_points": num_points})})
+    return governed, [_downgrade("num_points", params.num_points, num_points, exceeded)]
+
+
+def _govern_tessellation(config: TessellationConfig, budget: ComplexityBudget) -> Tuple[TessellationConfig, List[ComplexityDowngrade]]:
+    params = config.parameters
+    exceeded = budget.exceeded(_tessellation_estimate(config, params.tile_size))
+    if exceeded is None:
+        return config, []
+    # Painted segments fall with the square of the tile size
+    tile_size = params.tile_size
+    while tile_size < TESSELLATION_MAX_TILE_SIZE:
+        headroom = budget.headroom(_tessellation_estimate(config, tile_size))
+        if headroom >= 1.0:
+            break
+        tile_size = min(TESSELLATION_MAX_TILE_SIZE, math.ceil(tile_size / math.sqrt(headroom) * 100) / 100)
+    if tile_size <= params.tile_size:
+        return config, []
+    governed = config.model_copy(update={"parameters": params.model_copy(update={"tile_size": tile_size})})
+    return governed, [_downgrade("tile_size", params.tile_size, tile_size, exceeded)]
+
+
+_GOVERNORS = {
+    "l_system": _govern_l_system,
+    "parametric": _govern_parametric,
+    "tessellation": _govern_tessellation,
+}
+
+
+def govern_complexity(
+    engine_type: str,
+    config: Any,
+    budget: Optional[ComplexityBudget] = None
+) -> Tuple[Any, List[ComplexityDowngrade]]:
+    """
+    Keeps a config within the complexity budget, reducing its detail when
+    the preflight estimate exceeds it.
+
+    Args:
+        engine_type: "l_system", "parametric" or "tessellation"
+        config: The engine's validated config model (not modified)
+        budget: The budget to enforce (the COMPLEXITY_* defaults when omitted)
+
+    Returns:
+        The config to render (the same object when no reduction was needed)
+        and the downgrades applied to it
+    """
+    governor = _GOVERNORS.get(engine_type, _govern_l_system)
+    return governor(config, budget or ComplexityBudget())
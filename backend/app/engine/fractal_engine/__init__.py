@@ -1,5 +1,4 @@
-from .engine import * 
-from .models import *
-from .processor import *
-from .card_generator import *
-from .prompts import *
\ No newline at end of file
+"""L-system fractal pattern generation engine; submodules are imported on first use."""
+from app.engine.lazy_exports import lazy_exports
+
+__getattr__, __dir__ = lazy_exports(__name__, ("engine", "models", "processor", "card_generator", "prompts"))
@@ -1,6 +1,12 @@
 import re
-from .models import LSystemConfig, ContentConfig, CardResponse, ColorScheme
-from typing import Optional
+from .models import LSystemConfig, ContentConfig, CardResponse, ColorScheme, ComplexityDowngrade
+from typing import List, Optional
+from app.model.deadline import Deadline
+from app.inference.client_manager import InferenceOverloadedError
+from app.observability.metrics import OUTPUT_BYTES, record_fallback, stage_timer
+from app.observability.logging import get_logger
+
+logger = get_logger(__name__)
 
 # Default content config to use when AI inference fails
 DEFAULT_CONTENT_CONFIG = ContentConfig(
@@ -23,7 +29,9 @@ async def generate_card(
     pattern_svg: str,
     user_prompt: str,
     pattern_config: LSystemConfig,
-    inference_service
+    inference_service,
+    deadline: Optional[Deadline] = None,
+    complexity_downgrades: Optional[List[ComplexityDowngrade]] = None
 ) -> CardResponse:
     """
     Generate a complete e-invitation card by combining pattern SVG with AI-generated content.
@@ -33,32 +41,62 @@ async def generate_card(
         user_prompt: The user's original prompt describing the invitation
         pattern_config: The L-System configuration used to generate the pattern
         inference_service: The InferenceService instance for AI content generation
+        deadline: Optional request deadline; content falls back to defaults when too little time is left
+        complexity_downgrades: Detail reductions applied to the pattern config, reported in the response
         
     Returns:
         CardResponse object containing the complete card SVG and all configurations
     """
-    print("=== Starting Card Generation ===")
-    print(f"User prompt: {user_prompt}")
+    logger.debug("Starting card generation for prompt: %s", user_prompt)
     
     # Subtask 4.2: Implement content config generation logic
-    content_config = await _generate_content_config(inference_service, user_prompt)
+    content_config = await _generate_content_config(inference_service, user_prompt, deadline)
     
-    # Subtask 4.3 & 4.4: Implement SVG composition and apply color scheme
-    card_svg = _compose_card_svg(pattern_svg, content_config)
+    card_response = compose_card(pattern_svg, pattern_config, content_config, deadline, complexity_downgrades)
+    
+    logger.debug("Card generation complete")
+    return card_response
+
+
+def compose_card(
+    pattern_svg: str,
+    pattern_config: LSystemConfig,
+    content_config: ContentConfig,
+    deadline: Optional[Deadline] = None,
+    complexity_downgrades: Optional[List[ComplexityDowngrade]] = None
+) -> CardResponse:
+    """
+    Compose the final CardResponse from an already generated pattern and content config.
     
-    print("=== Card Generation Complete ===")
+    Args:
+        pattern_svg: The SVG string containing the repeating pattern background
+        pattern_config: The engine configuration used to generate the pattern
+        content_config: The content and color scheme to overlay
+        deadline: Optional request deadline whose degraded stages are reported
+        complexity_downgrades: Detail reductions applied to the pattern config, reported in the response
+        
+    Returns:
+        CardResponse object containing the complete card SVG and all configurations
+    """
+    # Subtask 4.3 & 4.4: Implement SVG composition and apply color scheme
+    with stage_timer("compose", pattern_config.engine_type):
+        card_svg = _compose_card_svg(pattern_svg, content_config)
+    OUTPUT_BYTES.observe(len(card_svg), kind="card_svg", engine=pattern_config.engine_type)
     
     # Return CardResponse object
     return CardResponse(
         card_svg=card_svg,
         pattern_config=pattern_config,
-        content_config=content_config
+        content_config=content_config,
+        degraded_stages=list(deadline.degraded_stages) if deadline else [],
+        complexity_downgrades=list(complexity_downgrades or [])
     )
 
 
 async def _generate_content_config(
     inference_service,
-    user_prompt: str
+    user_prompt: str,
+    deadline: Optional[Deadline] = None
 ) -> ContentConfig:
     """
     Generate content configuration using AI inference with fallback to defaults.
@@ -67,25 +105,30 @@ async def _generate_content_config(
     - Call inference_service.generate_content_config() with user prompt
     - Handle inference failures with default ContentConfig
     - Log AI response and any errors
+    
+    The inference service decides whether the request deadline leaves enough
+    time for the call. Overload is re-raised so the request fails fast with a
+    503 instead of shipping a default card.
     """
-    print("--- Generating Content Config ---")
     
     try:
         # Call the inference service to generate content config
-        content_config = await inference_service.generate_content_config(user_prompt)
+        content_config = await inference_service.generate_content_config(user_prompt, deadline=deadline)
         
         if content_config:
-            print("✓ Successfully generated content config from AI")
-            print(f"  Event: {content_config.event_title}")
-            print(f"  Colors: {content_config.color_scheme.primary_text_color}")
+            logger.debug("Generated content config from AI", extra={"event_title": content_config.event_title})
             return content_config
         else:
-            print("⚠ AI returned None, using default content config")
+            logger.warning("AI returned no content config, using default content config")
+            record_fallback("content", "invalid_response")
             return DEFAULT_CONTENT_CONFIG
+
+    except InferenceOverloadedError:
+        raise
             
     except Exception as e:
-        print(f"✗ Error generating content config: {e}")
-        print("  Falling back to default content config")
+        logger.warning("Error generating content config, using default content config: %s", e)
+        record_fallback("content", "error")
         return DEFAULT_CONTENT_CONFIG
 
 
@@ -104,7 +147,6 @@ def _compose_card_svg(pattern_svg: str, content_config: ContentConfig) -> str:
     - Apply secondary_text_color to secondary text elements
     - Apply overlay_color and overlay_opacity to overlay rect
     """
-    print("--- Composing Card SVG ---")
     
     # Extract pattern defs and rect from the pattern_svg
     defs_match = re.search(r'<defs>(.*?)</defs>', pattern_svg, re.DOTALL)
@@ -112,31 +154,62 @@ def _compose_card_svg(pattern_svg: str, content_config: ContentConfig) -> str:
     pattern_rect_match = re.search(r'<rect[^>]*fill="url\([^)]+\)"[^>]*/>', pattern_svg)
     
     if not defs_match or not pattern_rect_match:
-        print("⚠ Warning: Could not extract pattern elements from SVG")
+        logger.warning("Could not extract pattern elements from SVG")
         defs_content = ""
         pattern_rect = '<rect width="100%" height="100%" fill="#CCCCCC" />'
     else:
         defs_content = defs_match.group(1)
         pattern_rect = pattern_rect_match.group(0)
-        print("✓ Extracted pattern defs and rect")
     
     # Extract color scheme
     color_scheme = content_config.color_scheme
-    print(f"✓ Applying color scheme:")
-    print(f"  Primary text: {color_scheme.primary_text_color}")
-    print(f"  Secondary text: {color_scheme.secondary_text_color}")
-    print(f"  Overlay: {color_scheme.overlay_color} @ {color_scheme.overlay_opacity}")
     
-    # Card dimensions
-    CARD_WIDTH = 1080
-    CARD_HEIGHT = 1920
-    
-    # Build the final SVG with proper layer ordering
-    # Layer 1: Pattern background
-    # Layer 2: Semi-transparent overlay
-    # Layer 3: Text content
+    return _CARD_SVG_TEMPLATE.format(
+        card_width=CARD_WIDTH,
+        card_height=CARD_HEIGHT,
+        defs_content=defs_content,
+        pattern_rect=pattern_rect,
+        color_scheme=color_scheme,
+        event_title=_escape_xml(content_config.event_title),
+        event_subtitle=_escape_xml(content_config.event_subtitle),
+        date_placeholder=_escape_xml(content_config.date_placeholder),
+        time_placeholder=_escape_xml(content_config.time_placeholder),
+        venue_placeholder=_escape_xml(content_config.venue_placeholder),
+        rsvp_text=_escape_xml(content_config.rsvp_text)
+    )
+
+
+_SVG_COMMENT_RE = re.compile(r'<!--.*?-->', re.DOTALL)
+_SVG_WHITESPACE_RE = re.compile(r'\s+')
+_SVG_TAG_GAP_RE = re.compile(r'\s*([<>])\s*')
+
+
+def _minify_svg(svg: str) -> str:
+    """
+    Strip comments and redundant whitespace from card SVG markup.
     
-    card_svg = f"""<svg width="{CARD_WIDTH}" height="{CARD_HEIGHT}" viewBox="0 0 {CARD_WIDTH} {CARD_HEIGHT}" 
+    Whitespace runs collapse to one space and whitespace next to tag
+    delimiters is dropped. Text content keeps its meaning because SVG's
+    default whitespace handling already collapses and trims it.
+    """
+    svg = _SVG_COMMENT_RE.sub('', svg)
+    svg = _SVG_WHITESPACE_RE.sub(' ', svg)
+    return _SVG_TAG_GAP_RE.sub(r'\1', svg).strip()
+
+
+# Card dimensions
+CARD_WIDTH = 1080
+CARD_HEIGHT = 1920
+
+# Build the final SVG with proper layer ordering
+# Layer 1: Pattern background
+# Layer 2: Semi-transparent overlay
+# Layer 3: Text content
+#
+# The static markup is minified once here rather than the whole card on every
+# request: the pattern defs dominate the card and are already compact, so
+# minifying them cost several times the composition for a negligible saving.
+_CARD_SVG_TEMPLATE = _minify_svg("""<svg width="{card_width}" height="{card_height}" viewBox="0 0 {card_width} {card_height}" 
      xmlns="http://www.w3.org/2000/svg">
   
   <!-- Layer 1: Pattern Background -->
@@ -157,7 +230,7 @@ def _compose_card_svg(pattern_svg: str, content_config: ContentConfig) -> str:
         font-family="serif" font-size="96" font-weight="bold"
         fill="{color_scheme.primary_text_color}" 
         text-anchor="middle" dominant-baseline="middle">
-    {_escape_xml(content_config.event_title)}
+    {event_title}
   </text>
   
   <!-- Event Subtitle (Secondary Text) -->
@@ -165,7 +238,7 @@ def _compose_card_svg(pattern_svg: str, content_config: ContentConfig) -> str:
         font-family="serif" font-size="48" font-style="italic"
         fill="{color_scheme.secondary_text_color}" 
         text-anchor="middle" dominant-baseline="middle">
-    {_escape_xml(content_config.event_subtitle)}
+    {event_subtitle}
   </text>
   
   <!-- Date Placeholder (Secondary Text) -->
@@ -173,7 +246,7 @@ def _compose_card_svg(pattern_svg: str, content_config: ContentConfig) -> str:
         font-family="sans-serif" font-size="36"
         fill="{color_scheme.secondary_text_color}" 
         text-anchor="middle" dominant-baseline="middle">
-    {_escape_xml(content_config.date_placeholder)}
+    {date_placeholder}
   </text>
   
   <!-- Time Placeholder (Secondary Text) -->
@@ -181,7 +254,7 @@ def _compose_card_svg(pattern_svg: str, content_config: ContentConfig) -> str:
         font-family="sans-serif" font-size="36"
         fill="{color_scheme.secondary_text_color}" 
         text-anchor="middle" dominant-baseline="middle">
-    {_escape_xml(content_config.time_placeholder)}
+    {time_placeholder}
   </text>
   
   <!-- Venue Placeholder (Secondary Text) -->
@@ -189,7 +262,7 @@ def _compose_card_svg(pattern_svg: str, content_config: ContentConfig) -> str:
         font-family="sans-serif" font-size="36"
         fill="{color_scheme.secondary_text_color}" 
         text-anchor="middle" dominant-baseline="middle">
-    {_escape_xml(content_config.venue_placeholder)}
+    {venue_placeholder}
   </text>
   
   <!-- RSVP Text (Secondary Text) -->
@@ -197,13 +270,10 @@ def _compose_card_svg(pattern_svg: str, content_config: ContentConfig) -> str:
         font-family="sans-serif" font-size="32"
         fill="{color_scheme.secondary_text_color}" 
         text-anchor="middle" dominant-baseline="middle">
-    {_escape_xml(content_config.rsvp_text)}
+    {rsvp_text}
   </text>
   
-</svg>"""
-    
-    print("✓ Card SVG composition complete")
-    return card_svg
+</svg>""")
 
 
 def _escape_xml(text: str) -> str:
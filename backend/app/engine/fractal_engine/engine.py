@@ -1,6 +1,9 @@
 import math
 from .models import LSystemConfig
 from typing import Dict, Any
+from app.observability.logging import get_logger
+
+logger = get_logger(__name__)
 
 def apply_l_system_rules(axiom: str, rules: dict, iterations: int) -> str:
     """Recursively applies the L-System rules to the axiom."""
@@ -19,7 +22,7 @@ def generate_l_system_components(config: LSystemConfig) -> Dict[str, Any]:
     
     This function is a pure "math engine" component.
     """
-    print(f"Generating L-System components...")
+    logger.debug("Generating L-System components")
     
     # 1. Get parameters from the config
     params = config.parameters
@@ -71,7 +74,7 @@ def generate_l_system_components(config: LSystemConfig) -> Dict[str, Any]:
                 path_data += f"M {current_x} {current_y} "
 
     # 5. Return the raw components
-    print("L-System components generated.")
+    logger.debug("L-System components generated")
     return {
         "path_data": path_data,
         "style": {
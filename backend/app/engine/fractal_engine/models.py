@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Dict, Optional, Union
+from typing import Dict, List, Optional, Union
 from app.engine.parametric_engine.models import ParametricConfig
 from app.engine.tessellation_engine.models import TessellationConfig
 
@@ -57,6 +57,17 @@ class LSystemConfig(BaseModel):
         description="The visual style for the resulting SVG."
     )
 
+# Default configuration used when the AI config stage is skipped (fern / plant)
+DEFAULT_L_SYSTEM_CONFIG = LSystemConfig(
+    parameters=LSystemPatternParams(
+        axiom="X",
+        rules={"X": "F+[[X]-X]-F[-FX]+X", "F": "FF"},
+        angle=25.0,
+        iterations=5
+    ),
+    style=StyleParams(stroke="#2E7D32")
+)
+
 class ColorScheme(BaseModel):
     """Color palette for the invitation card."""
     primary_text_color: str = Field(
@@ -119,6 +130,24 @@ class ContentConfig(BaseModel):
         description="The color palette for text and overlay elements."
     )
 
+class ComplexityDowngrade(BaseModel):
+    """A detail reduction applied to a pattern config to keep it within the complexity budget."""
+    parameter: str = Field(
+        ...,
+        description="The reduced config parameter (e.g. 'iterations', 'num_points', 'tile_size')."
+    )
+    original: Union[int, float] = Field(..., description="The value the AI generated.")
+    applied: Union[int, float] = Field(..., description="The value the pattern was rendered with.")
+    limit: str = Field(
+        ...,
+        description=(
+            "The budget the original value exceeded: 'segments', 'output_bytes', 'cpu_seconds', "
+            "or 'iterations' for L-system iteration counts beyond what the renderer can draw."
+        )
+    )
+    estimated: float = Field(..., description="Estimated usage of that budget with the original value.")
+    budget: float = Field(..., description="The configured budget.")
+
 class CardResponse(BaseModel):
     """Complete response containing the final card SVG and all configuration data."""
     card_svg: str = Field(
@@ -133,3 +162,23 @@ class CardResponse(BaseModel):
         ...,
         description="The AI-generated content and styling configuration."
     )
+    degraded_stages: List[str] = Field(
+        default_factory=list,
+        description="Pipeline stages that fell back to local defaults to meet the request deadline."
+    )
+    complexity_downgrades: List[ComplexityDowngrade] = Field(
+        default_factory=list,
+        description="Detail reductions applied to the pattern config to stay within the complexity budget."
+    )
+    artifact_hash: Optional[str] = Field(
+        default=None,
+        description="Content hash of the stored card SVG, served at /pattern/artifacts/{artifact_hash}."
+    )
+
+
+class BatchCardResponse(BaseModel):
+    """Response for a batch request: one composed card per distinct pattern variant."""
+    cards: List[CardResponse] = Field(
+        ...,
+        description="The composed cards, sharing one engine type and content config."
+    )
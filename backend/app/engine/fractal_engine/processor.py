@@ -2,6 +2,13 @@ from pydantic import BaseModel
 from .models import LSystemConfig
 from .engine import generate_l_system_components # Import the new function
 import json
+from app.observability.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Bump whenever a change to this engine alters the SVG it renders for a given
+# config, so cached renders from older code are not served
+ENGINE_VERSION = "1"
 
 class FractalResponse(BaseModel):
     """
@@ -60,6 +67,16 @@ def build_e_card_svg(components: dict) -> str:
 """
     return svg_string
 
+def render_fractal_svg(config: LSystemConfig) -> str:
+    """
+    Renders the L-System pattern SVG string for a config.
+
+    This is the compact entry point used by the render process pool: it
+    returns only the SVG, without the JSON envelope of process_fractal_request.
+    """
+    svg_components = generate_l_system_components(config)
+    return build_e_card_svg(svg_components)
+
 def process_fractal_request(config: LSystemConfig) -> str:
     """
     Orchestrates the L-System generation and returns a
@@ -67,7 +84,7 @@ def process_fractal_request(config: LSystemConfig) -> str:
 
     This is the "FractalProcessor" layer.
     """
-    print(f"Processing L-System request for engine: {config.engine_type}")
+    logger.debug("Processing L-System request for engine: %s", config.engine_type)
     
     # 1. Call the "math engine" to get the raw components
     svg_components = generate_l_system_components(config)
@@ -82,5 +99,5 @@ def process_fractal_request(config: LSystemConfig) -> str:
     )
     
     # 4. Return as a JSON string
-    print("Successfully generated repeating pattern SVG. Returning JSON payload.")
+    logger.debug("Generated repeating pattern SVG, returning JSON payload")
     return response_data.model_dump_json(indent=2)
\ No newline at end of file
@@ -0,0 +1,47 @@
+"""
+Lazy package exports for the engine packages.
+
+The engine packages used to star-import every submodule from their
+`__init__`, so importing any one module (say, the config models) loaded every
+engine, processor and prompt. With lazy exports a package attribute is only
+resolved, by importing the submodule that defines it, on first access.
+"""
+
+import importlib
+from typing import Callable, List, Sequence, Tuple
+
+
+def lazy_exports(package: str, submodules: Sequence[str]) -> Tuple[Callable[[str], object], Callable[[], List[str]]]:
+    """
+    Builds the module-level `__getattr__` and `__dir__` for a package (PEP 562).
+
+    Args:
+        package: The package's `__name__`
+        submodules: Submodules searched, in order, for a requested attribute
+
+    Returns:
+        The (`__getattr__`, `__dir__`) pair to assign in the package `__init__`
+    """
+    package_module = importlib.import_module(package)
+
+    def __getattr__(name: str):
+        if name in submodules:
+            return importlib.import_module(f"{package}.{name}")
+        if not name.startswith("_"):
+            for submodule in submodules:
+                module = importlib.import_module(f"{package}.{submodule}")
+                if hasattr(module, name):
+                    value = getattr(module, name)
+                    # Cache on the package so later lookups skip __getattr__
+                    setattr(package_module, name, value)
+                    return value
+        raise AttributeError(f"module {package!r} has no attribute {name!r}")
+
+    def __dir__() -> List[str]:
+        names = set(vars(package_module))
+        for submodule in submodules:
+            module = importlib.import_module(f"{package}.{submodule}")
+            names.update(name for name in vars(module) if not name.startswith("_"))
+        return sorted(names)
+
+    return __getattr__, __dir__
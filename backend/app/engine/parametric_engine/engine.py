@@ -2,6 +2,9 @@
 import math
 from typing import List, Tuple, Dict, Any
 from .models import ParametricConfig, ParametricParams
+from app.observability.logging import get_logger
+
+logger = get_logger(__name__)
 
 def generate_rose_curve(params: ParametricParams) -> List[Tuple[float, float]]:
     """
@@ -121,7 +124,7 @@ def generate_parametric_components(config: ParametricConfig) -> Dict[str, Any]:
     
     This is a pure "math engine" component.
     """
-    print(f"Generating parametric components with equation type: {config.parameters.equation_type}")
+    logger.debug("Generating parametric components with equation type: %s", config.parameters.equation_type)
     
     params = config.parameters
     style = config.style
@@ -142,7 +145,7 @@ def generate_parametric_components(config: ParametricConfig) -> Dict[str, Any]:
     # Convert points to SVG path data
     path_data = points_to_path(points)
     
-    print("Parametric components generated.")
+    logger.debug("Parametric components generated")
     return {
         "path_data": path_data,
         "style": {
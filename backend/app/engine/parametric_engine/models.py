@@ -107,3 +107,16 @@ class ParametricResponse(BaseModel):
         ...,
         description="The parametric configuration used to generate the pattern."
     )
+
+# Default configuration used when the AI config stage is skipped (5-petal rose)
+DEFAULT_PARAMETRIC_CONFIG = ParametricConfig(
+    parameters=ParametricParams(
+        equation_type="rose",
+        amplitude_a=200.0,
+        amplitude_b=200.0,
+        frequency_a=5.0,
+        frequency_b=1.0,
+        num_points=1000
+    ),
+    style=StyleParams(stroke="#FF1493")
+)
@@ -2,6 +2,12 @@
 from .models import ParametricConfig, ParametricResponse
 from .engine import generate_parametric_components
 import json
+from app.observability.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Render cache key component; bump when curve sampling or SVG output changes
+ENGINE_VERSION = "1"
 
 def build_parametric_pattern_svg(components: dict) -> str:
     """
@@ -53,6 +59,16 @@ def build_parametric_pattern_svg(components: dict) -> str:
 """
     return svg_string
 
+def render_parametric_svg(config: ParametricConfig) -> str:
+    """
+    Renders the parametric pattern SVG string for a config.
+
+    This is the compact entry point used by the render process pool: it
+    returns only the SVG, without the JSON envelope of process_parametric_request.
+    """
+    svg_components = generate_parametric_components(config)
+    return build_parametric_pattern_svg(svg_components)
+
 def process_parametric_request(config: ParametricConfig) -> str:
     """
     Orchestrates the parametric pattern generation and returns a
@@ -60,7 +76,7 @@ def process_parametric_request(config: ParametricConfig) -> str:
     
     This is the "ParametricProcessor" layer.
     """
-    print(f"Processing parametric request for engine: {config.engine_type}")
+    logger.debug("Processing parametric request for engine: %s", config.engine_type)
     
     # 1. Call the "math engine" to get the raw components
     svg_components = generate_parametric_components(config)
@@ -75,5 +91,5 @@ def process_parametric_request(config: ParametricConfig) -> str:
     )
     
     # 4. Return as a JSON string
-    print("Successfully generated parametric pattern SVG. Returning JSON payload.")
+    logger.debug("Generated parametric pattern SVG, returning JSON payload")
     return response_data.model_dump_json(indent=2)
@@ -0,0 +1,91 @@
+"""
+Engine-agnostic pattern rendering entry point.
+
+Maps an engine type to its config model and SVG renderer, and runs a render
+under an optional CPU time limit. It takes and returns only plain data so it
+can run cheaply inside a render pool worker process.
+"""
+
+import importlib
+import math
+import signal
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from app.engine.fractal_engine.models import LSystemConfig
+from app.engine.parametric_engine.models import ParametricConfig
+from app.engine.tessellation_engine.models import TessellationConfig
+
+try:
+    import resource
+except ImportError:  # Windows: only the wall-clock timeout applies
+    resource = None
+
+
+# Config model and "module:function" SVG renderer for each engine type. The
+# renderer modules are imported on first use, so only the engines that are
+# actually requested are loaded
+RENDERERS: Dict[str, Tuple[type, str]] = {
+    "l_system": (LSystemConfig, "app.engine.fractal_engine.processor:render_fractal_svg"),
+    "parametric": (ParametricConfig, "app.engine.parametric_engine.processor:render_parametric_svg"),
+    "tessellation": (TessellationConfig, "app.engine.tessellation_engine.processor:render_tessellation_svg"),
+}
+
+
+@lru_cache(maxsize=None)
+def _load_renderer(engine_type: str) -> Tuple[Callable[[Any], str], str]:
+    """Imports an engine's processor module, returning its renderer and ENGINE_VERSION."""
+    _, target = RENDERERS.get(engine_type, RENDERERS["l_system"])
+    module_name, _, function_name = target.partition(":")
+    module = importlib.import_module(module_name)
+    return getattr(module, function_name), module.ENGINE_VERSION
+
+
+def engine_version(engine_type: str) -> str:
+    """Returns the renderer code version of an engine type, part of every render cache key."""
+    return _load_renderer(engine_type)[1]
+
+
+def warm_up_renderers() -> None:
+    """Imports every engine's renderer ahead of the first request."""
+    for engine_type in RENDERERS:
+        _load_renderer(engine_type)
+
+
+class RenderTimeoutError(RuntimeError):
+    """Raised when a render exceeds its CPU time limit."""
+
+
+def _on_cpu_limit(signum, frame):
+    raise RenderTimeoutError("Pattern render exceeded its CPU time limit")
+
+
+def render_config(engine_type: str, config_data: Dict[str, Any], cpu_timeout: Optional[float] = None) -> str:
+    """
+    Renders a pattern from a plain config dict and returns the SVG string.
+
+    Runs inside a pool worker process. When `cpu_timeout` is set and the
+    platform supports it, the render is interrupted with RenderTimeoutError
+    once it has used that many CPU seconds.
+    """
+    config_model, _ = RENDERERS.get(engine_type, RENDERERS["l_system"])
+    renderer, _ = _load_renderer(engine_type)
+    config = config_model.model_validate(config_data)
+
+    if not cpu_timeout or resource is None:
+        return renderer(config)
+
+    soft, hard = resource.getrlimit(resource.RLIMIT_CPU)
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    used = usage.ru_utime + usage.ru_stime
+    limit = math.ceil(used + cpu_timeout)
+    if hard != resource.RLIM_INFINITY:
+        limit = min(limit, hard)
+
+    previous_handler = signal.signal(signal.SIGXCPU, _on_cpu_limit)
+    resource.setrlimit(resource.RLIMIT_CPU, (limit, hard))
+    try:
+        return renderer(config)
+    finally:
+        resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+        signal.signal(signal.SIGXCPU, previous_handler)
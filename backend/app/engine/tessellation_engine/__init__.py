@@ -1,5 +1,4 @@
-"""Tessellation pattern generation engine."""
-from .engine import *
-from .models import *
-from .processor import *
-from .prompts import *
+"""Tessellation pattern generation engine; submodules are imported on first use."""
+from app.engine.lazy_exports import lazy_exports
+
+__getattr__, __dir__ = lazy_exports(__name__, ("engine", "models", "processor", "prompts"))
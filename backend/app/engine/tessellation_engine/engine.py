@@ -2,6 +2,9 @@
 import math
 from typing import List, Tuple, Dict, Any
 from .models import TessellationConfig, TessellationParams
+from app.observability.logging import get_logger
+
+logger = get_logger(__name__)
 
 def generate_square_tile(params: TessellationParams) -> str:
     """
@@ -100,7 +103,7 @@ def generate_tessellation_components(config: TessellationConfig) -> Dict[str, An
     
     This is a pure "math engine" component.
     """
-    print(f"Generating tessellation components with tile shape: {config.parameters.tile_shape}")
+    logger.debug("Generating tessellation components with tile shape: %s", config.parameters.tile_shape)
     
     params = config.parameters
     style = config.style
@@ -118,7 +121,7 @@ def generate_tessellation_components(config: TessellationConfig) -> Dict[str, An
         # Default to square
         tile_path = generate_square_tile(params)
     
-    print("Tessellation components generated.")
+    logger.debug("Tessellation components generated")
     return {
         "tile_path": tile_path,
         "tile_shape": params.tile_shape,
@@ -86,3 +86,15 @@ class TessellationResponse(BaseModel):
         ...,
         description="The tessellation configuration used to generate the pattern."
     )
+
+# Default configuration used when the AI config stage is skipped (Islamic hexagons)
+DEFAULT_TESSELLATION_CONFIG = TessellationConfig(
+    parameters=TessellationParams(
+        tile_shape="hexagon",
+        tile_size=100.0,
+        rotation=0.0,
+        spacing=2.0,
+        color_palette=["#4682B4", "#87CEEB", "#B0E0E6"]
+    ),
+    style=StyleParams()
+)
@@ -3,6 +3,12 @@ from .models import TessellationConfig, TessellationResponse
 from .engine import generate_tessellation_components
 import json
 import math
+from app.observability.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Render cache key component; bump when tile geometry or SVG output changes
+ENGINE_VERSION = "1"
 
 def build_tessellation_pattern_svg(components: dict) -> str:
     """
@@ -184,6 +190,16 @@ def _build_triangle_pattern_tiles(tile_path: str, tile_size: float, spacing: flo
     
     return '\n'.join(tiles)
 
+def render_tessellation_svg(config: TessellationConfig) -> str:
+    """
+    Renders the tessellation pattern SVG string for a config.
+
+    This is the compact entry point used by the render process pool: it
+    returns only the SVG, without the JSON envelope of process_tessellation_request.
+    """
+    svg_components = generate_tessellation_components(config)
+    return build_tessellation_pattern_svg(svg_components)
+
 def process_tessellation_request(config: TessellationConfig) -> str:
     """
     Orchestrates the tessellation pattern generation and returns a
@@ -191,7 +207,7 @@ def process_tessellation_request(config: TessellationConfig) -> str:
     
     This is the "TessellationProcessor" layer.
     """
-    print(f"Processing tessellation request for engine: {config.engine_type}")
+    logger.debug("Processing tessellation request for engine: %s", config.engine_type)
     
     # 1. Call the "math engine" to get the raw components
     svg_components = generate_tessellation_components(config)
@@ -206,5 +222,5 @@ def process_tessellation_request(config: TessellationConfig) -> str:
     )
     
     # 4. Return as a JSON string
-    print("Successfully generated tessellation pattern SVG. Returning JSON payload.")
+    logger.debug("Generated tessellation pattern SVG, returning JSON payload")
     return response_data.model_dump_json(indent=2)
@@ -1,2 +1,4 @@
 from .inference_service import *
+from .client_manager import InferenceClientManager, InferenceOverloadedError, get_client_manager
+from .resilience import ResilientCaller, RetryBudget, LatencyTracker, get_retry_budget
 from .engine_router import classify_engine, ROUTER_SYSTEM_PROMPT
\ No newline at end of file
@@ -0,0 +1,29 @@
+"""Pluggable inference backends, selected with the INFERENCE_BACKEND setting."""
+import os
+from app.observability.logging import get_logger
+from .base import InferenceBackend
+from .local_backend import LocalBackend, LatencyDistribution, parse_latency_config
+
+logger = get_logger(__name__)
+
+
+def create_backend(model_name: str, backend_name: str = None) -> InferenceBackend:
+    """
+    Creates the inference backend configured for this process.
+
+    Args:
+        model_name: The model identifier to serve
+        backend_name: "vertex" or "local"; defaults to the INFERENCE_BACKEND env var (vertex)
+
+    Raises:
+        ValueError: If the backend name is not recognised
+    """
+    name = (backend_name or os.getenv("INFERENCE_BACKEND", "vertex")).lower()
+    logger.info("Using %s inference backend", name, extra={"model": model_name})
+    if name == "local":
+        return LocalBackend(model_name)
+    if name == "vertex":
+        # Imported lazily so offline runs do not need the GCP SDK or credentials
+        from .vertex_backend import VertexBackend
+        return VertexBackend(model_name)
+    raise ValueError(f"Unknown inference backend '{name}' (expected 'vertex' or 'local')")
@@ -0,0 +1,61 @@
+"""Interface shared by every inference backend."""
+
+from abc import ABC, abstractmethod
+from functools import lru_cache
+from typing import Any, AsyncIterator, Dict, Sequence, Type
+
+from pydantic import BaseModel
+
+from app.prompt.prompt_registry import PromptPrefix
+
+
+@lru_cache(maxsize=None)
+def response_schema(response_model: Type[BaseModel]) -> Dict[str, Any]:
+    """
+    Returns the JSON schema of a response model. Pydantic rebuilds the schema
+    on every model_json_schema() call, so it is computed once per model.
+    """
+    return response_model.model_json_schema()
+
+
+class InferenceBackend(ABC):
+    """
+    A structured-output LLM backend.
+
+    Implementations take a prompt and the Pydantic model describing the
+    expected JSON, and return the model's raw JSON text. Validation is left
+    to the InferenceService so every backend is held to the same schema.
+
+    Prompts built by the prompt registry are AssembledPrompt strings that
+    also carry their static prefix and per-request suffix; backends with
+    prompt/context caching can send the prefix once and only the suffix per
+    request.
+
+    Args:
+        model_name: The model identifier this backend instance serves
+    """
+
+    name = "base"
+
+    def __init__(self, model_name: str):
+        self.model_name = model_name
+
+    @abstractmethod
+    async def generate_json(self, prompt: str, response_model: Type[BaseModel]) -> str:
+        """Returns the raw JSON text generated for the prompt and response schema."""
+
+    async def stream_json(self, prompt: str, response_model: Type[BaseModel]) -> AsyncIterator[str]:
+        """
+        Yields the JSON text in chunks as the model generates it. Closing the
+        iterator early must cancel the generation.
+
+        Backends without streaming yield the complete response as one chunk.
+        """
+        yield await self.generate_json(prompt, response_model)
+
+    async def prepare_prefixes(self, prefixes: Sequence[PromptPrefix]) -> None:
+        """
+        Hook to register static prompt prefixes with the provider ahead of the
+        first request (for example, creating context caches). Called once by
+        the startup warm-up; backends without prefix caching do nothing.
+        """
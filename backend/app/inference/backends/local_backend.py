@@ -0,0 +1,301 @@
+"""
+Deterministic offline inference backend.
+
+Stands in for Vertex AI so the whole service can run and be benchmarked
+without GCP. Responses are schema-valid JSON for every structured-output
+model used by the pipeline and depend only on the prompt, so the same prompt
+always yields the same config. Response latency is drawn from a configurable
+distribution to mimic a real model under load.
+
+Latency is configured with LOCAL_BACKEND_LATENCY, either a single spec applied
+to every response model or a JSON object keyed by response model name with an
+optional "default" entry:
+
+    LOCAL_BACKEND_LATENCY="lognormal:-0.7,0.5"
+    LOCAL_BACKEND_LATENCY='{"default": "uniform:0.2,0.8", "ContentConfig": "fixed:1.5"}'
+
+Supported specs are "none", "fixed:<s>", "uniform:<low>,<high>",
+"normal:<mean>,<stddev>", "lognormal:<mu>,<sigma>" and "sequence:<s>,<s>,..."
+(all in seconds). A sequence scripts the latency of successive calls and
+repeats its last value once exhausted, so "sequence:2.0,0.1" makes only the
+first call slow, e.g. to exercise hedging.
+
+Streamed responses (stream_json) spread the same latency evenly over
+LOCAL_BACKEND_STREAM_CHUNKS chunks of the response text.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import random
+from typing import Any, AsyncIterator, Callable, Dict, Optional, Type, get_args
+
+from pydantic import BaseModel
+
+from app.inference.backends.base import InferenceBackend
+
+
+class LatencyDistribution:
+    """
+    Samples simulated response latencies in seconds.
+
+    Args:
+        spec: Distribution spec such as "fixed:0.5" or "lognormal:-0.7,0.5"
+    """
+
+    KINDS = ("none", "fixed", "uniform", "normal", "lognormal", "sequence")
+
+    def __init__(self, spec: str = "none"):
+        kind, _, args = spec.strip().partition(":")
+        self.kind = kind.lower()
+        self.args = [float(value) for value in args.split(",") if value.strip()]
+        if self.kind not in self.KINDS:
+            raise ValueError(f"Unknown latency distribution '{spec}'")
+        self._samples_taken = 0
+
+    def sample(self, rng: random.Random) -> float:
+        if self.kind == "fixed":
+            return self.args[0]
+        if self.kind == "uniform":
+            return rng.uniform(self.args[0], self.args[1])
+        if self.kind == "normal":
+            return max(0.0, rng.gauss(self.args[0], self.args[1]))
+        if self.kind == "lognormal":
+            return rng.lognormvariate(self.args[0], self.args[1])
+        if self.kind == "sequence":
+            index = min(self._samples_taken, len(self.args) - 1)
+            self._samples_taken += 1
+            return self.args[index]
+        return 0.0
+
+
+def parse_latency_config(value: Optional[str]) -> Dict[str, LatencyDistribution]:
+    """Parses LOCAL_BACKEND_LATENCY into distributions keyed by response model name."""
+    if not value:
+        return {"default": LatencyDistribution("none")}
+    value = value.strip()
+    if value.startswith("{"):
+        specs = json.loads(value)
+    else:
+        specs = {"default": value}
+    distributions = {name: LatencyDistribution(spec) for name, spec in specs.items()}
+    distributions.setdefault("default", LatencyDistribution("none"))
+    return distributions
+
+
+# --- Deterministic response builders -----------------------------------------
+
+PARAMETRIC_KEYWORDS = (
+    "spirograph", "circular", "hypnotic", "vortex", "cosmic", "flowing", "curved",
+    "rose", "lissajous", "spiral", "swirl", "psychedelic",
+)
+TESSELLATION_KEYWORDS = (
+    "tessellation", "tiled", "tile", "mosaic", "geometric", "architectural", "islamic",
+    "symmetrical", "grid", "honeycomb", "hexagon", "structured",
+)
+
+L_SYSTEM_PRESETS = [
+    {"axiom": "X", "rules": {"X": "F+[[X]-X]-F[-FX]+X", "F": "FF"}, "angle": 25.0, "max_iterations": 5},
+    {"axiom": "F--F--F", "rules": {"F": "F+F--F+F"}, "angle": 60.0, "max_iterations": 4},
+    {"axiom": "F-G-G", "rules": {"F": "F-G+F+G-F", "G": "GG"}, "angle": 120.0, "max_iterations": 5},
+    {"axiom": "FX", "rules": {"X": "X+YF+", "Y": "-FX-Y"}, "angle": 90.0, "max_iterations": 10},
+]
+
+PALETTES = [
+    ["#4682B4", "#87CEEB", "#B0E0E6"],
+    ["#FF6B6B", "#4ECDC4"],
+    ["#2C1810", "#D4AF37", "#F5F5DC"],
+    ["#1A237E", "#3949AB", "#C5CAE9", "#FFFFFF"],
+    ["#FF1493", "#FFD700", "#00CED1"],
+]
+
+CONTENT_TEMPLATES = {
+    "wedding": ("Together with their families", "request the honor of your presence at the marriage of",
+                "Saturday, the twenty-fifth of May, two thousand twenty-five", "at half past four in the afternoon",
+                "The Rose Garden Estate", "Kindly respond by the first of May", "#FFFFFF", "#F5F5DC", "#2C1810", 0.5),
+    "birthday": ("You're Invited!", "Let's celebrate another year of awesome",
+                 "Saturday, March 20th, 2025", "7:00 PM - Late",
+                 "The Party Loft", "Let us know if you can make it by March 10th!", "#FFD700", "#FFFFFF", "#FF1493", 0.35),
+    "corporate": ("Annual Leadership Summit", "Join us for strategic planning and networking",
+                  "Thursday, September 15th, 2025", "9:00 AM - 5:00 PM",
+                  "Grand Conference Center", "Please confirm attendance by September 1st", "#FFFFFF", "#E0E0E0", "#1A237E", 0.45),
+    "default": ("You're Invited", "Join us for a celebration",
+                "Saturday, December 20th, 2025", "6:00 PM onwards",
+                "The Grand Ballroom", "Please RSVP by December 10th", "#FFFFFF", "#F0F0F0", "#000000", 0.4),
+}
+
+
+def _user_prompt(prompt: str) -> str:
+    """Extracts the user's request from a fully assembled prompt."""
+    return prompt.rsplit("USER PROMPT:", 1)[-1].strip().lower()
+
+
+def _build_engine_choice(prompt: str, rng: random.Random) -> Dict[str, Any]:
+    text = _user_prompt(prompt)
+    if any(keyword in text for keyword in TESSELLATION_KEYWORDS):
+        return {"engine_type": "tessellation"}
+    if any(keyword in text for keyword in PARAMETRIC_KEYWORDS):
+        return {"engine_type": "parametric"}
+    return {"engine_type": "l_system"}
+
+
+def _build_l_system_config(prompt: str, rng: random.Random) -> Dict[str, Any]:
+    preset = rng.choice(L_SYSTEM_PRESETS)
+    return {
+        "engine_type": "l_system",
+        "parameters": {
+            "axiom": preset["axiom"],
+            "rules": preset["rules"],
+            "angle": preset["angle"],
+            "iterations": rng.randint(3, preset["max_iterations"]),
+        },
+        "style": {"fill": "none", "stroke": rng.choice(rng.choice(PALETTES)), "stroke_width": 0.5},
+    }
+
+
+def _build_parametric_config(prompt: str, rng: random.Random) -> Dict[str, Any]:
+    return {
+        "engine_type": "parametric",
+        "parameters": {
+            "equation_type": rng.choice(["rose", "lissajous", "epitrochoid", "hypotrochoid"]),
+            "amplitude_a": float(rng.randrange(100, 350, 10)),
+            "amplitude_b": float(rng.randrange(100, 350, 10)),
+            "frequency_a": float(rng.randint(1, 8)),
+            "frequency_b": float(rng.randint(1, 8)),
+            "phase_shift": round(rng.uniform(0.0, 3.14), 2),
+            "num_points": rng.choice([500, 1000, 1500, 2000]),
+        },
+        "style": {"fill": "none", "stroke": rng.choice(rng.choice(PALETTES)), "stroke_width": 2.0},
+    }
+
+
+def _build_tessellation_config(prompt: str, rng: random.Random) -> Dict[str, Any]:
+    return {
+        "engine_type": "tessellation",
+        "parameters": {
+            "tile_shape": rng.choice(["square", "hexagon", "triangle", "diamond"]),
+            "tile_size": float(rng.randrange(60, 160, 10)),
+            "rotation": rng.choice([0.0, 15.0, 30.0, 45.0]),
+            "spacing": float(rng.randint(0, 5)),
+            "color_palette": rng.choice(PALETTES),
+        },
+        "style": {"fill": "#4682B4", "stroke": "#FFFFFF", "stroke_width": 1.0},
+    }
+
+
+def _build_content_config(prompt: str, rng: random.Random) -> Dict[str, Any]:
+    text = _user_prompt(prompt)
+    key = next((name for name in ("wedding", "birthday", "corporate") if name in text), "default")
+    (title, subtitle, date, time, venue, rsvp, primary, secondary, overlay, opacity) = CONTENT_TEMPLATES[key]
+    return {
+        "event_title": title,
+        "event_subtitle": subtitle,
+        "date_placeholder": date,
+        "time_placeholder": time,
+        "venue_placeholder": venue,
+        "rsvp_text": rsvp,
+        "color_scheme": {
+            "primary_text_color": primary,
+            "secondary_text_color": secondary,
+            "overlay_color": overlay,
+            "overlay_opacity": opacity,
+        },
+    }
+
+
+RESPONSE_BUILDERS: Dict[str, Callable[[str, random.Random], Dict[str, Any]]] = {
+    "EngineChoice": _build_engine_choice,
+    "LSystemConfig": _build_l_system_config,
+    "ParametricConfig": _build_parametric_config,
+    "TessellationConfig": _build_tessellation_config,
+    "ContentConfig": _build_content_config,
+}
+
+
+def _build_variants(prompt: str, rng: random.Random, response_model: Type[BaseModel]) -> Dict[str, Any]:
+    """Builds a batch response: as many configs as the `variants` field allows."""
+    field = response_model.model_fields["variants"]
+    item_model = get_args(field.annotation)[0]
+    max_length = next((meta.max_length for meta in field.metadata if hasattr(meta, "max_length")), 1)
+    builder = RESPONSE_BUILDERS.get(item_model.__name__)
+    return {
+        "variants": [
+            builder(prompt, rng) if builder else _build_from_examples(item_model)
+            for _ in range(max_length)
+        ]
+    }
+
+
+def _build_from_examples(response_model: Type[BaseModel]) -> Dict[str, Any]:
+    """Fallback for unregistered models: fills required fields from their schema examples."""
+    data = {}
+    for name, field in response_model.model_fields.items():
+        if not field.is_required():
+            continue
+        extra = field.json_schema_extra if isinstance(field.json_schema_extra, dict) else {}
+        if "example" in extra:
+            data[name] = extra["example"]
+        elif isinstance(field.annotation, type) and issubclass(field.annotation, BaseModel):
+            data[name] = _build_from_examples(field.annotation)
+    return data
+
+
+class LocalBackend(InferenceBackend):
+    """
+    Offline backend returning deterministic, schema-valid responses.
+
+    Args:
+        model_name: Model identifier (only used to label the backend)
+        latency: Distributions keyed by response model name; defaults to LOCAL_BACKEND_LATENCY
+        seed: Seed for latency sampling; defaults to LOCAL_BACKEND_SEED
+    """
+
+    name = "local"
+
+    def __init__(
+        self,
+        model_name: str,
+        latency: Optional[Dict[str, LatencyDistribution]] = None,
+        seed: Optional[int] = None
+    ):
+        super().__init__(model_name)
+        self.latency = latency or parse_latency_config(os.getenv("LOCAL_BACKEND_LATENCY"))
+        if seed is None:
+            seed = int(os.getenv("LOCAL_BACKEND_SEED", "0"))
+        self._latency_rng = random.Random(seed)
+
+    async def generate_json(self, prompt: str, response_model: Type[BaseModel]) -> str:
+        delay = self._sample_latency(response_model)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return self._build_response(prompt, response_model)
+
+    async def stream_json(self, prompt: str, response_model: Type[BaseModel]) -> AsyncIterator[str]:
+        delay = self._sample_latency(response_model)
+        text = self._build_response(prompt, response_model)
+        chunk_count = max(1, int(os.getenv("LOCAL_BACKEND_STREAM_CHUNKS", "8")))
+        chunk_size = -(-len(text) // chunk_count)
+        for start in range(0, len(text), chunk_size):
+            if delay > 0:
+                await asyncio.sleep(delay / chunk_count)
+            yield text[start:start + chunk_size]
+
+    def _sample_latency(self, response_model: Type[BaseModel]) -> float:
+        distribution = self.latency.get(response_model.__name__, self.latency["default"])
+        return distribution.sample(self._latency_rng)
+
+    def _build_response(self, prompt: str, response_model: Type[BaseModel]) -> str:
+        model_name = response_model.__name__
+        # Seed from the prompt and schema so identical requests get identical answers
+        digest = hashlib.sha256(f"{model_name}\n{prompt}".encode("utf-8")).digest()
+        rng = random.Random(int.from_bytes(digest[:8], "big"))
+
+        builder = RESPONSE_BUILDERS.get(model_name)
+        if builder:
+            data = builder(prompt, rng)
+        elif "variants" in response_model.model_fields:
+            data = _build_variants(prompt, rng, response_model)
+        else:
+            data = _build_from_examples(response_model)
+        return json.dumps(data)
@@ -0,0 +1,153 @@
+"""Vertex AI (Gemini) inference backend."""
+
+import asyncio
+import datetime
+import os
+import time
+from functools import lru_cache
+from typing import AsyncIterator, Dict, Sequence, Tuple, Type
+
+import vertexai
+from pydantic import BaseModel
+from vertexai.generative_models import GenerationConfig, GenerativeModel
+
+from app.inference.backends.base import InferenceBackend, response_schema
+from app.observability.logging import get_logger
+from app.prompt.prompt_registry import AssembledPrompt, PromptPrefix
+
+logger = get_logger(__name__)
+
+
+# Send registered prompt prefixes as the model's system instruction, so
+# Gemini's implicit prefix caching applies and only the suffix varies
+VERTEX_PREFIX_CACHE = os.getenv("VERTEX_PREFIX_CACHE", "true").lower() == "true"
+# Prefixes at least this large also get an explicit context cache (Vertex
+# rejects caches below the model's minimum size)
+VERTEX_CONTEXT_CACHE_MIN_TOKENS = int(os.getenv("VERTEX_CONTEXT_CACHE_MIN_TOKENS", "32768"))
+VERTEX_CONTEXT_CACHE_TTL_SECONDS = int(os.getenv("VERTEX_CONTEXT_CACHE_TTL_SECONDS", "3600"))
+
+_vertex_initialized = False
+
+
+def init_vertex() -> None:
+    """Initializes the Vertex AI SDK once per process from GCP_PROJECT_ID / GCP_REGION."""
+    global _vertex_initialized
+    if _vertex_initialized:
+        return
+
+    project_id = os.getenv("GCP_PROJECT_ID")
+    region = os.getenv("GCP_REGION")  # e.g., "us-central1"
+    if not project_id or not region:
+        raise EnvironmentError("GCP_PROJECT_ID and GCP_REGION environment variables must be set.")
+    vertexai.init(project=project_id, location=region)
+    _vertex_initialized = True
+
+
+@lru_cache(maxsize=None)
+def _generation_config(response_model: Type[BaseModel]) -> GenerationConfig:
+    """Builds the JSON-mode generation config once per response model."""
+    return GenerationConfig(
+        response_mime_type="application/json",
+        response_schema=response_schema(response_model)
+    )
+
+
+class VertexBackend(InferenceBackend):
+    """Calls a Gemini model on Vertex AI with a JSON response schema."""
+
+    name = "vertex"
+
+    def __init__(self, model_name: str):
+        super().__init__(model_name)
+        init_vertex()
+        self.generative_model = GenerativeModel(model_name)
+        # Models bound to a prompt prefix, by prefix key, with the monotonic
+        # time their explicit context cache expires (None for no explicit cache)
+        self._prefix_models: Dict[str, Tuple[GenerativeModel, float]] = {}
+
+    async def generate_json(self, prompt: str, response_model: Type[BaseModel]) -> str:
+        model, contents = self._model_for(prompt)
+        response = await model.generate_content_async(
+            contents,
+            generation_config=_generation_config(response_model)
+        )
+        try:
+            return response.text
+        except Exception:
+            self._log_response_diagnostics(response)
+            raise
+
+    async def stream_json(self, prompt: str, response_model: Type[BaseModel]) -> AsyncIterator[str]:
+        model, contents = self._model_for(prompt)
+        responses = await model.generate_content_async(
+            contents,
+            generation_config=_generation_config(response_model),
+            stream=True
+        )
+        try:
+            async for response in responses:
+                try:
+                    text = response.text
+                except Exception:
+                    self._log_response_diagnostics(response)
+                    raise
+                if text:
+                    yield text
+        finally:
+            # Stops reading the server stream when the caller aborts early
+            aclose = getattr(responses, "aclose", None)
+            if aclose is not None:
+                await aclose()
+
+    def _model_for(self, prompt: str):
+        """Returns the model to call and the contents to send for a prompt."""
+        if not VERTEX_PREFIX_CACHE or not isinstance(prompt, AssembledPrompt):
+            return self.generative_model, str(prompt)
+
+        entry = self._prefix_models.get(prompt.prefix.key)
+        if entry is None or (entry[1] is not None and time.monotonic() >= entry[1]):
+            # No (or an expired) explicit cache: use the prefix as system instruction
+            entry = (GenerativeModel(self.model_name, system_instruction=prompt.prefix.text), None)
+            self._prefix_models[prompt.prefix.key] = entry
+        return entry[0], prompt.suffix
+
+    async def prepare_prefixes(self, prefixes: Sequence[PromptPrefix]) -> None:
+        """Creates explicit context caches for the prefixes large enough to be cached."""
+        if not VERTEX_PREFIX_CACHE:
+            return
+        for prefix in prefixes:
+            if prefix.tokens < VERTEX_CONTEXT_CACHE_MIN_TOKENS:
+                continue
+            try:
+                model = await asyncio.to_thread(self._create_cached_model, prefix)
+            except Exception as e:
+                logger.warning("Could not create context cache for prompt %s: %s", prefix.name, e)
+                continue
+            # Stop using the cache shortly before Vertex expires it
+            expires_at = time.monotonic() + VERTEX_CONTEXT_CACHE_TTL_SECONDS * 0.9
+            self._prefix_models[prefix.key] = (model, expires_at)
+            logger.info("Created context cache for prompt %s (~%d tokens)", prefix.name, prefix.tokens)
+
+    def _create_cached_model(self, prefix: PromptPrefix) -> GenerativeModel:
+        from vertexai.preview import caching
+
+        cached_content = caching.CachedContent.create(
+            model_name=self.model_name,
+            system_instruction=prefix.text,
+            ttl=datetime.timedelta(seconds=VERTEX_CONTEXT_CACHE_TTL_SECONDS),
+            display_name=f"tashreef-{prefix.name}-{prefix.key}"
+        )
+        return GenerativeModel.from_cached_content(cached_content=cached_content)
+
+    def _log_response_diagnostics(self, response) -> None:
+        """Logs why Vertex returned no usable text (safety blocks, finish reason)."""
+        if hasattr(response, 'prompt_feedback'):
+            logger.warning("Vertex prompt feedback: %s", response.prompt_feedback)
+        if hasattr(response, 'candidates') and response.candidates:
+            logger.warning(
+                "Vertex returned no text",
+                extra={
+                    "finish_reason": str(response.candidates[0].finish_reason),
+                    "safety_ratings": str(response.candidates[0].safety_ratings),
+                }
+            )
@@ -0,0 +1,130 @@
+"""
+Shared inference client manager.
+
+Keeps a single inference backend client per model name for the whole process
+and bounds the number of concurrent calls to each model with a semaphore.
+Under burst load callers queue for a slot (backpressure) instead of fanning
+out unbounded concurrent model requests, and once the wait queue is full
+new calls are rejected outright.
+"""
+
+import asyncio
+import os
+from contextlib import asynccontextmanager
+from typing import Callable, Dict, Optional
+
+from app.inference.backends import InferenceBackend, create_backend
+from app.observability.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+DEFAULT_MODEL_NAME = "gemini-2.0-flash"
+
+# Maximum number of in-flight calls per model
+MAX_CONCURRENT_CALLS = int(os.getenv("INFERENCE_MAX_CONCURRENCY", "8"))
+# Maximum number of callers allowed to wait for a slot before rejecting
+MAX_QUEUE_DEPTH = int(os.getenv("INFERENCE_MAX_QUEUE_DEPTH", "64"))
+
+
+class InferenceOverloadedError(RuntimeError):
+    """Raised when too many calls are already queued for a model slot."""
+
+
+class _ModelSlot:
+    """A shared model client together with its concurrency limiter and gauges."""
+
+    def __init__(self, client: InferenceBackend, max_concurrency: int):
+        self.client = client
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.waiting = 0
+        self.in_flight = 0
+
+
+class InferenceClientManager:
+    """
+    Process-wide registry of inference backend clients.
+
+    Args:
+        max_concurrency: Maximum concurrent calls allowed per model
+        max_queue_depth: Maximum callers allowed to wait for a slot per model
+        client_factory: Builds a backend for a model name; defaults to the backend
+            selected by INFERENCE_BACKEND and can be replaced with a fake in tests
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = MAX_CONCURRENT_CALLS,
+        max_queue_depth: int = MAX_QUEUE_DEPTH,
+        client_factory: Callable[[str], InferenceBackend] = create_backend
+    ):
+        self.client_factory = client_factory
+        self.max_concurrency = max_concurrency
+        self.max_queue_depth = max_queue_depth
+        self._slots: Dict[str, _ModelSlot] = {}
+
+    def _get_slot(self, model_name: str) -> _ModelSlot:
+        slot = self._slots.get(model_name)
+        if slot is None:
+            logger.info("Creating shared inference client", extra={"model": model_name})
+            slot = _ModelSlot(self.client_factory(model_name), self.max_concurrency)
+            self._slots[model_name] = slot
+        return slot
+
+    def get_client(self, model_name: str = DEFAULT_MODEL_NAME) -> InferenceBackend:
+        """Returns the shared client for a model, creating it on first use."""
+        return self._get_slot(model_name).client
+
+    @asynccontextmanager
+    async def acquire(self, model_name: str = DEFAULT_MODEL_NAME):
+        """
+        Waits for a free slot on the given model and yields its shared client.
+
+        Raises:
+            InferenceOverloadedError: If the wait queue for the model is full
+        """
+        slot = self._get_slot(model_name)
+        if slot.semaphore.locked() and slot.waiting >= self.max_queue_depth:
+            raise InferenceOverloadedError(
+                f"Inference queue for {model_name} is full ({slot.waiting} waiting)"
+            )
+
+        slot.waiting += 1
+        try:
+            await slot.semaphore.acquire()
+        finally:
+            slot.waiting -= 1
+
+        slot.in_flight += 1
+        try:
+            yield slot.client
+        finally:
+            slot.in_flight -= 1
+            slot.semaphore.release()
+
+    def queue_depth(self, model_name: str = DEFAULT_MODEL_NAME) -> int:
+        """Returns the number of callers currently waiting for a model slot."""
+        slot = self._slots.get(model_name)
+        return slot.waiting if slot else 0
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Returns in-flight and queued call counts for every known model."""
+        return {
+            name: {
+                "in_flight": slot.in_flight,
+                "queue_depth": slot.waiting,
+                "max_concurrency": self.max_concurrency,
+            }
+            for name, slot in self._slots.items()
+        }
+
+
+_client_manager: Optional[InferenceClientManager] = None
+
+
+def get_client_manager() -> InferenceClientManager:
+    """Returns the process-wide InferenceClientManager."""
+    global _client_manager
+    if _client_manager is None:
+        _client_manager = InferenceClientManager()
+    return _client_manager
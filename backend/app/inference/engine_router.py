@@ -5,8 +5,16 @@ This module provides AI-powered classification to route user prompts to the
 appropriate pattern generation engine (l_system, parametric, or tessellation).
 """
 
+from typing import Optional
 from app.model.prompt import EngineTypeEnum, EngineChoice
-from app.inference.inference_service import InferenceService
+from app.model.deadline import Deadline, DeadlineExceededError
+from app.inference.client_manager import InferenceOverloadedError
+from app.inference.inference_service import get_inference_service
+from app.observability.metrics import record_fallback
+from app.observability.logging import get_logger
+from app.prompt.prompt_registry import get_prompt_registry, user_prompt_suffix
+
+logger = get_logger(__name__)
 
 
 # Router system prompt with classification rules and examples
@@ -61,8 +69,10 @@ containing the chosen 'engine_type'. Do not include any other text, markdown,
 or parameters.
 """
 
+get_prompt_registry().register("routing", f"{ROUTER_SYSTEM_PROMPT}\n\n---\n")
+
 
-async def classify_engine(user_prompt: str) -> EngineTypeEnum:
+async def classify_engine(user_prompt: str, deadline: Optional[Deadline] = None) -> EngineTypeEnum:
     """
     Classifies user prompt to determine appropriate pattern generation engine.
     
@@ -72,40 +82,61 @@ async def classify_engine(user_prompt: str) -> EngineTypeEnum:
     
     Args:
         user_prompt: The user's natural language description of desired pattern
+        deadline: Optional request deadline; routing is skipped when too little time is left
         
     Returns:
         EngineTypeEnum indicating which engine should generate the pattern
         
+    Raises:
+        InferenceOverloadedError: If the model's wait queue is full
+        DeadlineExceededError: If the routing call ran out of time
+
     Note:
-        Defaults to l_system if classification fails or returns invalid result
+        Defaults to l_system if classification fails, returns invalid result,
+        or the deadline leaves too little time for the routing call
     """
-    print(f"[Engine Router] Classifying prompt: {user_prompt}")
+    logger.debug("Classifying prompt: %s", user_prompt)
+
+    timeout = None
+    if deadline is not None:
+        timeout = deadline.stage_timeout("routing")
+        if timeout is None:
+            logger.warning("Not enough time left for routing, defaulting to l_system")
+            deadline.mark_degraded("routing")
+            record_fallback("routing", "deadline")
+            return EngineTypeEnum.l_system
     
     try:
         # Build full prompt combining system prompt and user prompt
-        full_prompt = f"{ROUTER_SYSTEM_PROMPT}\n\n---\nUSER PROMPT:\n{user_prompt}"
+        full_prompt = get_prompt_registry().assemble("routing", user_prompt_suffix(user_prompt))
         
-        # Initialize inference service
-        inference_service = InferenceService()
+        # Use the shared inference service (pooled client + concurrency limiter)
+        inference_service = get_inference_service()
         
         # Call inference service with EngineChoice schema for structured output
         engine_choice = await inference_service._generate_structured_content(
             full_prompt, 
-            EngineChoice
+            EngineChoice,
+            timeout=timeout
         )
         
         # Check if we got a valid response
         if engine_choice and engine_choice.engine_type:
             selected_engine = engine_choice.engine_type
-            print(f"[Engine Router] Selected engine: {selected_engine}")
+            logger.info("Selected engine: %s", selected_engine.value)
             return selected_engine
         else:
             # AI returned None or invalid response
-            print("[Engine Router] AI returned None or invalid response, defaulting to l_system")
+            logger.warning("AI returned no valid engine choice, defaulting to l_system")
+            record_fallback("routing", "invalid_response")
             return EngineTypeEnum.l_system
             
+    except (InferenceOverloadedError, DeadlineExceededError):
+        # Backpressure becomes a 503 and timeouts a degraded stage, decided by the caller
+        raise
+
     except Exception as e:
         # Log error and default to l_system
-        print(f"[Engine Router] Error during classification: {e}")
-        print("[Engine Router] Defaulting to l_system due to error")
+        logger.warning("Error during classification, defaulting to l_system: %s", e)
+        record_fallback("routing", "error")
         return EngineTypeEnum.l_system
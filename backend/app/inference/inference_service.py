@@ -1,84 +1,251 @@
-from vertexai.generative_models import GenerativeModel, GenerationConfig
 from pydantic import BaseModel
+from functools import lru_cache
+from typing import Optional
+import hashlib
 import json
+import os
+from app.cache.shared_cache import get_shared_cache
+from app.cache.single_flight import SingleFlight
+from app.inference.client_manager import (
+    DEFAULT_MODEL_NAME,
+    InferenceClientManager,
+    InferenceOverloadedError,
+    get_client_manager,
+)
+from app.inference.resilience import ResilientCaller
+from app.inference.structured_stream import StructuredStreamError, decode_structured_stream
+from app.model.deadline import Deadline, DeadlineExceededError
+from app.observability.metrics import LLM_REQUESTS, LLM_STREAM_ABORTS, record_fallback, stage_timer
+from app.observability.logging import get_logger, log_payload
+from app.prompt.prompt_registry import get_prompt_registry, user_prompt_suffix
+from app.prompt.system_prompt import CONTENT_SYSTEM_PROMPT
+import asyncio
+
+logger = get_logger(__name__)
+
+get_prompt_registry().register("content", f"{CONTENT_SYSTEM_PROMPT}\n\n---\n")
+
+# Stream structured responses and validate fields as they complete, aborting
+# early on an invalid value instead of waiting for the whole response
+INFERENCE_STREAMING = os.getenv("INFERENCE_STREAMING", "true").lower() == "true"
+# Seconds a validated structured response is reused from the host-wide shared
+# cache for the same model, schema and prompt (0 disables caching)
+INFERENCE_CACHE_TTL_SECONDS = float(os.getenv("INFERENCE_CACHE_TTL_SECONDS", "3600"))
+# Namespace of the structured responses in the shared cache
+INFERENCE_CACHE_NAMESPACE = "llm"
+
+
+@lru_cache(maxsize=None)
+def _schema_fingerprint(response_model) -> str:
+    """Hash of a response model's JSON schema, so a schema change never reuses old responses."""
+    schema = json.dumps(response_model.model_json_schema(), sort_keys=True)
+    return hashlib.sha256(schema.encode("utf-8")).hexdigest()
+
 
 class InferenceService:
-    def __init__(self):
-        self.generative_model = GenerativeModel(
-             "gemini-2.0-flash", 
-        )
+    def __init__(
+        self,
+        model_name: str = DEFAULT_MODEL_NAME,
+        client_manager: Optional[InferenceClientManager] = None,
+        resilient_caller: Optional[ResilientCaller] = None
+    ):
+        self.model_name = model_name
+        self.client_manager = client_manager or get_client_manager()
+        self.resilient_caller = resilient_caller or ResilientCaller()
+        # Identical structured calls in flight at once share one model call
+        self._in_flight = SingleFlight("llm")
+
+    @property
+    def backend(self):
+        """The shared inference backend, owned by the client manager."""
+        return self.client_manager.get_client(self.model_name)
+
+    async def _generate_structured_content(
+        self,
+        prompt: str,
+        response_model: BaseModel,
+        timeout: Optional[float] = None
+    ):
+        """
+        Calls the LLM with a prompt and a JSON schema, returns a Pydantic object.
+
+        Validated responses are stored in the host-wide shared cache, so the
+        same prompt and schema are answered once per host until the entry
+        expires. Identical calls made while one is in flight wait for its
+        result instead of calling the model again; each caller keeps its own
+        timeout, and one caller giving up does not cancel the call for others.
+
+        Args:
+            prompt: The full prompt to send
+            response_model: Pydantic model describing the expected JSON
+            timeout: Seconds the call (including retries) may take; None for no limit
+
+        Raises:
+            InferenceOverloadedError: If the model's wait queue is full
+            DeadlineExceededError: If the call did not finish within `timeout`
+        """
+        request_key = self._request_key(prompt, response_model)
+        cached = await self._read_cached(request_key, response_model)
+        if cached is not None:
+            LLM_REQUESTS.inc(response_model=response_model.__name__, outcome="cached")
+            return cached
 
-    async def _generate_structured_content(self, prompt: str, response_model: BaseModel):
-        """Calls the LLM with a prompt and a JSON schema, returns a Pydantic object."""
-        # print(f"Generating structured content for model: {response_model.__name__}")
-        # print(f"Schema: {response_model.model_json_schema()}")
-        response = None
         try:
-            
-            response = await self.generative_model.generate_content_async(
-                prompt,
-                generation_config=GenerationConfig(
-                    response_mime_type="application/json",
-                    response_schema=response_model.model_json_schema()
-                )
+            validated = await asyncio.wait_for(
+                self._in_flight.run(request_key, lambda: self._call_and_cache(request_key, prompt, response_model)),
+                timeout=timeout
             )
-            
-            response_text = response.text
-            print("--- AI JSON Response ---")
-            print(response_text)
-            print("------------------------")
-            
-            # Validate and return
-            validated = response_model.model_validate_json(response_text)
-            print(f"✅ Successfully validated {response_model.__name__}")
+            logger.debug("Validated %s", response_model.__name__)
+            LLM_REQUESTS.inc(response_model=response_model.__name__, outcome="ok")
             return validated
+
+        except InferenceOverloadedError:
+            # Surface backpressure to the caller instead of masking it as a bad response
+            LLM_REQUESTS.inc(response_model=response_model.__name__, outcome="overloaded")
+            raise
+
+        except asyncio.TimeoutError:
+            LLM_REQUESTS.inc(response_model=response_model.__name__, outcome="timeout")
+            # Without a deadline the timeout came from inside the call (e.g. the backend's own)
+            budget = f"its {timeout:.2f}s budget" if timeout is not None else "a backend timeout"
+            raise DeadlineExceededError(f"{response_model.__name__} generation exceeded {budget}")
         
         except Exception as e:
-            print(f"❌ Error generating structured content: {e}")
-            print(f"   Model: {response_model.__name__}")
-            if response:
-                if hasattr(response, 'prompt_feedback'):
-                    print(f"   Prompt Feedback: {response.prompt_feedback}")
-                if hasattr(response, 'candidates') and response.candidates:
-                    print(f"   Finish Reason: {response.candidates[0].finish_reason}")
-                    print(f"   Safety Ratings: {response.candidates[0].safety_ratings}")
-                if hasattr(response, 'text'):
-                    print(f"   Raw Response Text: {response.text[:500]}")
+            logger.error("Error generating structured content: %s", e, extra={"response_model": response_model.__name__})
+            LLM_REQUESTS.inc(response_model=response_model.__name__, outcome="error")
             return None
 
-    async def generate_content_config(self, user_prompt: str):
+    async def _call_and_cache(self, request_key: str, prompt: str, response_model: BaseModel):
+        """Runs the resilient model call and stores the validated response in the shared cache."""
+        validated = await self.resilient_caller.run(
+            lambda: self._request_structured_content(prompt, response_model),
+            key=response_model.__name__
+        )
+        await self._write_cached(request_key, validated)
+        return validated
+
+    def _request_key(self, prompt: str, response_model: BaseModel) -> str:
+        """Identifies a structured call by model, response schema and prompt."""
+        payload = "\n".join((self.model_name, response_model.__name__, _schema_fingerprint(response_model), prompt))
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _response_cache():
+        """The shared cache used for structured responses, or None when caching is disabled."""
+        return get_shared_cache() if INFERENCE_CACHE_TTL_SECONDS > 0 else None
+
+    async def _read_cached(self, request_key: str, response_model: BaseModel):
+        """Returns the cached validated response for `request_key`, or None."""
+        cache = self._response_cache()
+        if cache is None:
+            return None
+        cached_text = await cache.get(INFERENCE_CACHE_NAMESPACE, request_key)
+        if cached_text is None:
+            return None
+        try:
+            return response_model.model_validate_json(cached_text)
+        except ValueError:
+            # Written by a different version of the model class; treat as a miss
+            logger.debug("Discarding stale cached %s", response_model.__name__)
+            return None
+
+    async def _write_cached(self, request_key: str, validated: BaseModel) -> None:
+        cache = self._response_cache()
+        if cache is not None:
+            await cache.put(
+                INFERENCE_CACHE_NAMESPACE, request_key, validated.model_dump_json(), ttl=INFERENCE_CACHE_TTL_SECONDS
+            )
+
+    async def _request_structured_content(self, prompt: str, response_model: BaseModel):
+        """
+        Performs a single model call and validates the response.
+
+        Raises on any failure so the resilient caller can retry or hedge.
+        """
+        response_text = None
+        try:
+            async with self.client_manager.acquire(self.model_name) as backend:
+                if INFERENCE_STREAMING:
+                    response_text = await decode_structured_stream(
+                        backend.stream_json(prompt, response_model), response_model
+                    )
+                else:
+                    response_text = await backend.generate_json(prompt, response_model)
+            
+            log_payload(logger, "AI JSON response", response_text, response_model=response_model.__name__)
+            
+            # Validate and return
+            return response_model.model_validate_json(response_text)
+
+        except StructuredStreamError as e:
+            LLM_STREAM_ABORTS.inc(response_model=response_model.__name__, reason=e.reason)
+            logger.warning(
+                "Aborted streamed response: %s", e,
+                extra={"response_model": response_model.__name__, "received": e.partial_text[-500:]}
+            )
+            raise
+        except Exception:
+            if response_text is not None:
+                logger.warning("Raw response text: %.500s", response_text, extra={"response_model": response_model.__name__})
+            raise
+
+    async def generate_content_config(self, user_prompt: str, deadline: Optional[Deadline] = None):
         """
         Generates content configuration for e-invitation card based on user prompt.
         
         Args:
             user_prompt: The user's natural language request for the invitation
+            deadline: Optional request deadline; falls back to defaults when too little time is left
             
         Returns:
             ContentConfig object with event content and color scheme, or default fallback on error
+
+        Raises:
+            InferenceOverloadedError: If the model's wait queue is full
         """
         from app.engine.fractal_engine.models import ContentConfig, ColorScheme
-        from app.prompt.system_prompt import CONTENT_SYSTEM_PROMPT
         
-        print(f"Generating content config for prompt: {user_prompt}")
+        logger.debug("Generating content config for prompt: %s", user_prompt)
         
-        # Build the specialized prompt combining system prompt and user prompt
-        full_prompt = f"{CONTENT_SYSTEM_PROMPT}\n\n---\nUSER PROMPT:\n{user_prompt}"
+        # The content system prompt is a registered prefix; only the user prompt is appended
+        full_prompt = get_prompt_registry().assemble("content", user_prompt_suffix(user_prompt))
         
-        try:
-            # Use existing _generate_structured_content with ContentConfig schema
-            content_config = await self._generate_structured_content(full_prompt, ContentConfig)
+        with stage_timer("content"):
+            timeout = None
+            if deadline is not None:
+                timeout = deadline.stage_timeout("content")
+                if timeout is None:
+                    logger.warning("Not enough time left for content generation, using default content config")
+                    deadline.mark_degraded("content")
+                    record_fallback("content", "deadline")
+                    return self._get_default_content_config()
+
+            try:
+                # Use existing _generate_structured_content with ContentConfig schema
+                content_config = await self._generate_structured_content(full_prompt, ContentConfig, timeout=timeout)
             
-            if content_config:
-                print("Successfully generated content config")
-                return content_config
-            else:
-                print("AI returned None, using default content config")
-                return self._get_default_content_config()
+                if content_config:
+                    logger.debug("Generated content config")
+                    return content_config
+                else:
+                    logger.warning("AI returned no content config, using default content config")
+                    record_fallback("content", "invalid_response")
+                    return self._get_default_content_config()
                 
-        except Exception as e:
-            print(f"Error in generate_content_config: {e}")
-            print("Falling back to default content config")
-            return self._get_default_content_config()
+            except DeadlineExceededError as e:
+                logger.warning("Content generation timed out, using default content config: %s", e)
+                if deadline is not None:
+                    deadline.mark_degraded("content")
+                record_fallback("content", "timeout")
+                return self._get_default_content_config()
+
+            except InferenceOverloadedError:
+                raise
+
+            except Exception as e:
+                logger.warning("Error in generate_content_config, using default content config: %s", e)
+                record_fallback("content", "error")
+                return self._get_default_content_config()
     
     def _get_default_content_config(self):
         """Returns a default ContentConfig when AI inference fails."""
@@ -98,3 +265,14 @@ class InferenceService:
                 overlay_opacity=0.4
             )
         )
+
+
+_inference_service: Optional[InferenceService] = None
+
+
+def get_inference_service() -> InferenceService:
+    """Returns the process-wide InferenceService backed by the shared client manager."""
+    global _inference_service
+    if _inference_service is None:
+        _inference_service = InferenceService()
+    return _inference_service
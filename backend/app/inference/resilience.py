@@ -0,0 +1,186 @@
+"""
+Tail-latency controls for LLM calls.
+
+Provides jittered retries (via tenacity) and optional request hedging: when a
+call has not returned by the observed p95 latency for its stage, a duplicate
+request is issued and the first valid result wins. Both retries and hedges draw
+from a single process-wide retry budget, so they cannot amplify an outage.
+"""
+
+import asyncio
+import math
+import os
+import time
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, Optional, TypeVar
+
+from tenacity import AsyncRetrying, RetryCallState, stop_after_attempt, wait_random_exponential
+
+from app.inference.client_manager import InferenceOverloadedError
+from app.observability.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+T = TypeVar("T")
+
+MAX_ATTEMPTS = int(os.getenv("INFERENCE_MAX_ATTEMPTS", "3"))
+HEDGING_ENABLED = os.getenv("INFERENCE_HEDGING_ENABLED", "false").lower() == "true"
+HEDGE_PERCENTILE = float(os.getenv("INFERENCE_HEDGE_PERCENTILE", "0.95"))
+HEDGE_MIN_SAMPLES = int(os.getenv("INFERENCE_HEDGE_MIN_SAMPLES", "20"))
+RETRY_BUDGET_RATIO = float(os.getenv("INFERENCE_RETRY_BUDGET_RATIO", "0.1"))
+RETRY_BUDGET_MAX_TOKENS = float(os.getenv("INFERENCE_RETRY_BUDGET_MAX_TOKENS", "10"))
+
+
+class LatencyTracker:
+    """Rolling window of successful call latencies for one stage."""
+
+    def __init__(self, window: int = 200, min_samples: int = HEDGE_MIN_SAMPLES):
+        self.min_samples = min_samples
+        self._samples: Deque[float] = deque(maxlen=window)
+
+    def record(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        """Returns the latency at the given fraction, or None until enough samples exist."""
+        if len(self._samples) < self.min_samples:
+            return None
+        ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, math.ceil(fraction * len(ordered)) - 1)
+        return ordered[max(index, 0)]
+
+
+class RetryBudget:
+    """
+    Token bucket that caps retries and hedges to a fraction of request volume.
+
+    Every request deposits `ratio` tokens (up to `max_tokens`) and every retry
+    or hedge spends one, so during an outage at most roughly `ratio` extra
+    calls are made per original request.
+    """
+
+    def __init__(self, ratio: float = RETRY_BUDGET_RATIO, max_tokens: float = RETRY_BUDGET_MAX_TOKENS):
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self.tokens = max_tokens
+        self.spent = 0
+        self.denied = 0
+
+    def record_request(self) -> None:
+        self.tokens = min(self.max_tokens, self.tokens + self.ratio)
+
+    def try_spend(self) -> bool:
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            self.spent += 1
+            return True
+        self.denied += 1
+        return False
+
+
+_retry_budget: Optional[RetryBudget] = None
+
+
+def get_retry_budget() -> RetryBudget:
+    """Returns the process-wide RetryBudget shared by all LLM calls."""
+    global _retry_budget
+    if _retry_budget is None:
+        _retry_budget = RetryBudget()
+    return _retry_budget
+
+
+class ResilientCaller:
+    """
+    Runs an async call with jittered retries and optional hedging.
+
+    Args:
+        max_attempts: Maximum attempts per call, including the first
+        hedging_enabled: Whether to issue a duplicate request after the p95 delay
+        retry_budget: Budget shared by retries and hedges (process-wide by default)
+        hedge_percentile: Latency percentile after which a hedge is issued
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = MAX_ATTEMPTS,
+        hedging_enabled: bool = HEDGING_ENABLED,
+        retry_budget: Optional[RetryBudget] = None,
+        hedge_percentile: float = HEDGE_PERCENTILE
+    ):
+        self.max_attempts = max_attempts
+        self.hedging_enabled = hedging_enabled
+        self.retry_budget = retry_budget or get_retry_budget()
+        self.hedge_percentile = hedge_percentile
+        self._trackers: Dict[str, LatencyTracker] = {}
+
+    def tracker(self, key: str) -> LatencyTracker:
+        if key not in self._trackers:
+            self._trackers[key] = LatencyTracker()
+        return self._trackers[key]
+
+    async def run(self, call_factory: Callable[[], Awaitable[T]], key: str) -> T:
+        """
+        Runs `call_factory()` until it returns a valid result or attempts run out.
+
+        Args:
+            call_factory: Creates a fresh awaitable for each attempt or hedge;
+                it must raise if the result is not valid
+            key: Stage key used for latency tracking (e.g. the response model name)
+        """
+        self.retry_budget.record_request()
+        async for attempt in AsyncRetrying(
+            stop=stop_after_attempt(self.max_attempts),
+            wait=wait_random_exponential(multiplier=0.5, max=4),
+            retry=self._should_retry,
+            reraise=True,
+        ):
+            with attempt:
+                if attempt.retry_state.attempt_number > 1:
+                    logger.warning("Retrying %s (attempt %d)", key, attempt.retry_state.attempt_number)
+                return await self._attempt(call_factory, key)
+
+    def _should_retry(self, retry_state: RetryCallState) -> bool:
+        error = retry_state.outcome.exception()
+        if error is None:
+            return False
+        # Backpressure means the system is saturated; retrying would only add load
+        if isinstance(error, (InferenceOverloadedError, asyncio.CancelledError)):
+            return False
+        # The last attempt is never retried, so it must not spend a budget token
+        if retry_state.attempt_number >= self.max_attempts:
+            return False
+        return self.retry_budget.try_spend()
+
+    async def _attempt(self, call_factory: Callable[[], Awaitable[T]], key: str) -> T:
+        tracker = self.tracker(key)
+        hedge_delay = tracker.percentile(self.hedge_percentile) if self.hedging_enabled else None
+
+        started = time.monotonic()
+        if hedge_delay is None:
+            result = await call_factory()
+        else:
+            result = await self._hedged(call_factory, hedge_delay, key)
+        tracker.record(time.monotonic() - started)
+        return result
+
+    async def _hedged(self, call_factory: Callable[[], Awaitable[T]], hedge_delay: float, key: str) -> T:
+        """Returns the first successful result of the primary call or its hedge."""
+        pending = {asyncio.ensure_future(call_factory())}
+        try:
+            done, _ = await asyncio.wait(pending, timeout=hedge_delay)
+            if not done and self.retry_budget.try_spend():
+                logger.info("%s exceeded p95 (%.2fs), issuing hedged request", key, hedge_delay)
+                pending.add(asyncio.ensure_future(call_factory()))
+
+            last_error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    last_error = task.exception()
+            raise last_error
+        finally:
+            for task in pending:
+                task.cancel()
@@ -0,0 +1,190 @@
+"""
+Incremental decoding of streamed structured (JSON) responses.
+
+Structured calls ask the model for a single JSON object. When the backend
+streams its output, the object is parsed as the chunks arrive: each
+top-level member is decoded as soon as its value is complete and validated
+against that field of the response model. A definitively invalid value (a
+wrong type, an out-of-range number, an unknown enum member) or malformed
+JSON aborts the call right away instead of after the model has generated
+the rest of the response; the resilient caller can then retry immediately.
+
+The complete text is still validated as a whole at the end, which also
+covers model-level validators and required fields.
+"""
+
+import json
+from functools import lru_cache
+from typing import Annotated, Any, AsyncIterator, Dict, List, Optional, Tuple, Type
+
+from pydantic import BaseModel, TypeAdapter, ValidationError
+
+
+_WHITESPACE = " \t\r\n"
+
+
+class StructuredStreamError(ValueError):
+    """
+    Raised when a streamed response is aborted before it completes.
+
+    Args:
+        message: What was wrong
+        reason: "malformed_json" or "invalid_field"
+        partial_text: The text received before the abort, for diagnostics
+    """
+
+    def __init__(self, message: str, reason: str, partial_text: str = ""):
+        super().__init__(message)
+        self.reason = reason
+        self.partial_text = partial_text
+
+
+class IncrementalJsonObjectParser:
+    """
+    Parses a JSON object fed in arbitrary chunks.
+
+    feed() returns the top-level (key, value) members completed by the chunk.
+    Only the characters since the previous chunk are scanned, so the total
+    work is linear in the response size.
+
+    Raises:
+        StructuredStreamError: As soon as the text cannot be a single JSON object
+    """
+
+    def __init__(self):
+        self.text = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._closed = False
+        self._key: Optional[str] = None
+        self._key_start: Optional[int] = None
+        self._value_start: Optional[int] = None
+
+    @property
+    def complete(self) -> bool:
+        """True once the top-level object has been closed."""
+        return self._closed
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        self.text += chunk
+        members = []
+        text = self.text
+        for index in range(self._pos, len(text)):
+            char = text[index]
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._depth == 1 and self._value_start is None:
+                        self._key = json.loads(text[self._key_start:index + 1])
+                continue
+
+            if self._closed:
+                if char not in _WHITESPACE:
+                    self._fail("Unexpected text after the JSON object")
+                continue
+            if self._depth == 0:
+                if char == "{":
+                    self._depth = 1
+                elif char not in _WHITESPACE:
+                    self._fail("Response is not a JSON object")
+                continue
+
+            if char == '"':
+                self._in_string = True
+                if self._depth == 1 and self._value_start is None:
+                    if self._key is not None:
+                        self._fail("Expected ':' after an object key")
+                    self._key_start = index
+            elif char in "{[":
+                self._depth += 1
+            elif char in "}]":
+                if self._depth == 1 and char == "}":
+                    if self._value_start is not None:
+                        members.append(self._complete_member(index))
+                    elif self._key is not None:
+                        self._fail("Object key without a value")
+                    self._depth = 0
+                    self._closed = True
+                else:
+                    self._depth -= 1
+            elif self._depth == 1:
+                if char == ":":
+                    if self._key is None or self._value_start is not None:
+                        self._fail("Unexpected ':'")
+                    self._value_start = index + 1
+                elif char == ",":
+                    if self._value_start is None:
+                        self._fail("Unexpected ','")
+                    members.append(self._complete_member(index))
+                elif self._value_start is None and char not in _WHITESPACE:
+                    self._fail(f"Unexpected {char!r} where an object key or ':' was expected")
+        self._pos = len(text)
+        return members
+
+    def _complete_member(self, end: int) -> Tuple[str, Any]:
+        raw_value = self.text[self._value_start:end]
+        try:
+            value = json.loads(raw_value)
+        except ValueError:
+            self._fail(f"Malformed value for '{self._key}'")
+        member = (self._key, value)
+        self._key = self._key_start = self._value_start = None
+        return member
+
+    def _fail(self, message: str) -> None:
+        raise StructuredStreamError(message, "malformed_json", self.text)
+
+
+@lru_cache(maxsize=None)
+def field_adapters(response_model: Type[BaseModel]) -> Dict[str, TypeAdapter]:
+    """
+    Builds, once per response model, a validator for each field keyed by the
+    name it has in JSON. Field constraints (ranges, lengths) are included;
+    model-level validators run in the final whole-object validation.
+    """
+    adapters = {}
+    for name, field in response_model.model_fields.items():
+        annotation = Annotated[(field.annotation, *field.metadata)] if field.metadata else field.annotation
+        adapters[field.alias or name] = TypeAdapter(annotation)
+    return adapters
+
+
+async def decode_structured_stream(chunks: AsyncIterator[str], response_model: Type[BaseModel]) -> str:
+    """
+    Consumes a streamed JSON response, validating each top-level field as it
+    completes, and returns the complete text.
+
+    Closing the chunk iterator on an early abort cancels the underlying
+    model stream.
+
+    Raises:
+        StructuredStreamError: On malformed JSON or a field that fails validation
+    """
+    parser = IncrementalJsonObjectParser()
+    adapters = field_adapters(response_model)
+    try:
+        async for chunk in chunks:
+            for key, value in parser.feed(chunk):
+                adapter = adapters.get(key)
+                if adapter is None:
+                    continue
+                try:
+                    adapter.validate_python(value)
+                except ValidationError as e:
+                    raise StructuredStreamError(
+                        f"Invalid value for '{key}': {e.errors()[0]['msg']}", "invalid_field", parser.text
+                    ) from e
+    finally:
+        aclose = getattr(chunks, "aclose", None)
+        if aclose is not None:
+            await aclose()
+    if not parser.complete:
+        raise StructuredStreamError("Response ended before the JSON object was complete", "malformed_json", parser.text)
+    return parser.text
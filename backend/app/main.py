@@ -1,25 +1,59 @@
 from fastapi import FastAPI
 from dotenv import load_dotenv
+from contextlib import asynccontextmanager
 import os
 from fastapi.middleware.cors import CORSMiddleware
-import vertexai
 from .routers.pattern import pattern_controller
+from .routers.metrics import metrics_controller
+from .routers.health import health_controller
+from .middleware.compression import CompressionMiddleware
+from .middleware.request_id import RequestIdMiddleware
+from .observability.logging import configure_logging
+from .config.db_config import dispose_engine
+from .cache.shared_cache import get_shared_cache
+from .service.render_pool import get_render_pool
+from .service.startup_service import get_startup_service
 
 
 load_dotenv()
+configure_logging()
+
+# Nothing here does I/O at import time: Vertex AI, the database engine and the
+# pattern engines are initialized on first use or by the startup warm-up, so
+# the service can also run fully offline with INFERENCE_BACKEND=local.
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Starts the warm-up (render processes, inference client, database tables
+    and job workers) in the background, so /healthz answers right away and
+    /readyz once it finishes. Stops the job workers, the render process pool
+    and the database pool and closes the shared cache on shutdown.
+    """
+    startup_service = get_startup_service()
+    startup_service.start()
+    yield
+    await startup_service.stop()
+    get_render_pool().shutdown()
+    await dispose_engine()
+    shared_cache = get_shared_cache()
+    if shared_cache is not None:
+        shared_cache.close()
 
-GCP_PROJECT_ID = os.getenv("GCP_PROJECT_ID")
-GCP_REGION = os.getenv("GCP_REGION") # e.g., "us-central1"
-if not GCP_PROJECT_ID or not GCP_REGION:
-    raise EnvironmentError("GCP_PROJECT_ID and GCP_REGION environment variables must be set.")
-vertexai.init(project=GCP_PROJECT_ID, location=GCP_REGION)
 
 app = FastAPI(
     title="Tashreef Web Service",
     description="An example app using FastAPI APIRoutiners (like Flask Blueprints)",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
+url_prefix = "/ts"
+
+# Card SVGs are large text; compress pattern responses with brotli or gzip
+app.add_middleware(CompressionMiddleware, path_prefix=f"{url_prefix}/pattern")
+
 origins = [
     "http://localhost:3000",
 ]
@@ -32,9 +66,15 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Outermost, so every log line of the request (including CORS and compression) carries its id
+app.add_middleware(RequestIdMiddleware)
+
 
-url_prefix = "/ts"
 app.include_router(pattern_controller.router, prefix=url_prefix)
+# Served at the root so Prometheus can scrape the conventional /metrics path
+app.include_router(metrics_controller.router)
+# Liveness and readiness probes, also at the root for load balancers and orchestrators
+app.include_router(health_controller.router)
 
 
 # A simple root endpoint
@@ -0,0 +1,2 @@
+from .compression import CompressionMiddleware, PrecompressedCache, get_precompressed_cache
+from .request_id import RequestIdMiddleware
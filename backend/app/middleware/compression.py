@@ -0,0 +1,282 @@
+"""
+Response compression for the pattern routes.
+
+Card SVGs are large, highly compressible text. This ASGI middleware negotiates
+brotli or gzip from Accept-Encoding and compresses complete response bodies.
+Compressed bodies are kept in a small LRU keyed by the body's hash and the
+encoding, so a hot card (for example a render cache hit returned to many
+clients) is only ever compressed once per encoding.
+
+Every complete response with a compressible content type carries
+Vary: Accept-Encoding, compressed or not, so shared caches keep identity and
+encoded bodies apart. A strong ETag on a compressed response is rewritten per
+encoding ("<tag>" -> "<tag>-gzip"), since a strong validator must identify
+one exact byte sequence; see encoded_etag(). Partial (206) responses are never
+compressed.
+
+A body sent in several chunks (FileResponse streams files in 64KB chunks) is
+buffered and compressed whole when its Content-Length is known and at most
+COMPRESSION_BUFFER_MAX_BYTES; zero-copy file sends are turned off for
+requests that may get a compressed body, so files take that path too.
+Event streams (Server-Sent Events) and bodies of unknown or excessive length
+are passed through untouched, since buffering them would defeat the point of
+streaming. Brotli is optional: when the `brotli` package is not installed
+only gzip is offered.
+"""
+
+import asyncio
+import gzip
+import hashlib
+import os
+from typing import Dict, Optional, Tuple
+
+from cachetools import LRUCache
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import brotli
+except ImportError:  # gzip only
+    brotli = None
+
+
+# Bodies smaller than this are sent uncompressed
+COMPRESSION_MIN_BYTES = int(os.getenv("COMPRESSION_MIN_BYTES", "1024"))
+# Total size of compressed bodies kept for reuse (0 disables the cache)
+COMPRESSION_CACHE_MAX_BYTES = int(os.getenv("COMPRESSION_CACHE_MAX_BYTES", str(16 * 1024 * 1024)))
+# Bodies at least this large are compressed in a worker thread, off the event loop
+COMPRESSION_THREAD_MIN_BYTES = int(os.getenv("COMPRESSION_THREAD_MIN_BYTES", str(64 * 1024)))
+# Largest multi-chunk body that is buffered in order to compress it
+COMPRESSION_BUFFER_MAX_BYTES = int(os.getenv("COMPRESSION_BUFFER_MAX_BYTES", str(16 * 1024 * 1024)))
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "5"))
+
+COMPRESSIBLE_CONTENT_TYPES = (
+    "application/json",
+    "image/svg+xml",
+    "text/",
+    "application/xml",
+)
+
+
+def supported_encodings() -> Tuple[str, ...]:
+    """Encodings this server can produce, in order of preference."""
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """
+    Picks the encoding to use for an Accept-Encoding header value.
+
+    Returns the supported encoding with the highest q-value (ties go to the
+    server's preference), or None if the client accepts none of them.
+    """
+    qualities: Dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        if not name:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        qualities[name.strip().lower()] = quality
+
+    best, best_quality = None, 0.0
+    for encoding in supported_encodings():
+        quality = qualities.get(encoding, qualities.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def encoded_etag(etag: str, encoding: str) -> str:
+    """
+    Returns the ETag of `encoding`'s representation of a response with the
+    given ETag. Strong tags get the encoding appended inside the quotes; weak
+    tags (W/"...") already allow byte-different representations and are kept.
+    """
+    if etag.startswith("W/") or not etag.endswith('"'):
+        return etag
+    return f'{etag[:-1]}-{encoding}"'
+
+
+def _compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=COMPRESSION_BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=COMPRESSION_GZIP_LEVEL)
+
+
+class PrecompressedCache:
+    """
+    LRU of compressed response bodies, bounded by their total size.
+
+    Args:
+        max_bytes: Total size of compressed bodies to keep (0 disables caching)
+    """
+
+    def __init__(self, max_bytes: int = COMPRESSION_CACHE_MAX_BYTES):
+        self._cache = LRUCache(maxsize=max_bytes, getsizeof=len) if max_bytes > 0 else None
+        self.hits = 0
+        self.misses = 0
+
+    async def compress(self, body: bytes, encoding: str) -> bytes:
+        """Returns `body` compressed with `encoding`, compressing it only on a cache miss."""
+        key = (hashlib.sha256(body).digest(), encoding)
+        if self._cache is not None:
+            compressed = self._cache.get(key)
+            if compressed is not None:
+                self.hits += 1
+                return compressed
+
+        self.misses += 1
+        if len(body) >= COMPRESSION_THREAD_MIN_BYTES:
+            compressed = await asyncio.to_thread(_compress, body, encoding)
+        else:
+            compressed = _compress(body, encoding)
+
+        if self._cache is not None and len(compressed) <= self._cache.maxsize:
+            self._cache[key] = compressed
+        return compressed
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(self._cache) if self._cache is not None else 0,
+            "bytes": self._cache.currsize if self._cache is not None else 0,
+        }
+
+
+_precompressed_cache: Optional[PrecompressedCache] = None
+
+
+def get_precompressed_cache() -> PrecompressedCache:
+    """Returns the process-wide PrecompressedCache."""
+    global _precompressed_cache
+    if _precompressed_cache is None:
+        _precompressed_cache = PrecompressedCache()
+    return _precompressed_cache
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware compressing complete responses under `path_prefix`.
+
+    Args:
+        app: The ASGI application to wrap
+        path_prefix: Only requests whose path starts with this are compressed
+        minimum_size: Bodies smaller than this many bytes are sent as-is
+        cache: Cache of compressed bodies; defaults to the process-wide cache
+    """
+
+    def __init__(
+        self,
+        app,
+        path_prefix: str = "/",
+        minimum_size: int = COMPRESSION_MIN_BYTES,
+        cache: Optional[PrecompressedCache] = None
+    ):
+        self.app = app
+        self.path_prefix = path_prefix
+        self.minimum_size = minimum_size
+        self.cache = cache or get_precompressed_cache()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not scope["path"].startswith(self.path_prefix):
+            await self.app(scope, receive, send)
+            return
+
+        # None when the client accepts no supported encoding; responses still get Vary
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is not None and "http.response.pathsend" in scope.get("extensions", {}):
+            # A zero-copy file send cannot be compressed; have files sent as body chunks
+            extensions = dict(scope["extensions"])
+            del extensions["http.response.pathsend"]
+            scope = {**scope, "extensions": extensions}
+        start_message = None
+        headers = None
+        chunks = None
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start_message, headers, chunks, passthrough
+            if passthrough:
+                await send(message)
+                return
+
+            if message["type"] == "http.response.start":
+                # Hold the headers back until we know whether the body gets compressed
+                start_message = message
+                headers = MutableHeaders(raw=start_message["headers"])
+                return
+
+            if message["type"] != "http.response.body":
+                # e.g. http.response.pathsend for zero-copy file responses
+                passthrough = True
+                if self._is_compressible(headers):
+                    headers.add_vary_header("Accept-Encoding")
+                await send(start_message)
+                await send(message)
+                return
+
+            if chunks is None:
+                if not message.get("more_body", False):
+                    await self._send_complete(send, start_message, headers, message.get("body", b""), encoding)
+                    return
+                if not self._should_buffer(headers, encoding):
+                    # Streaming response: forward it unchanged
+                    passthrough = True
+                    if self._is_compressible(headers):
+                        headers.add_vary_header("Accept-Encoding")
+                    await send(start_message)
+                    await send(message)
+                    return
+                chunks = []
+
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                await self._send_complete(send, start_message, headers, b"".join(chunks), encoding)
+
+        await self.app(scope, receive, send_wrapper)
+
+    async def _send_complete(
+        self, send, start_message, headers: MutableHeaders, body: bytes, encoding: Optional[str]
+    ) -> None:
+        """Sends a complete response body, compressed when its type, status and size allow."""
+        if self._is_compressible(headers):
+            headers.add_vary_header("Accept-Encoding")
+            if encoding is not None and self._should_compress(start_message["status"], headers, body):
+                body = await self.cache.compress(body, encoding)
+                headers["Content-Encoding"] = encoding
+                headers["Content-Length"] = str(len(body))
+                if "etag" in headers:
+                    headers["ETag"] = encoded_etag(headers["etag"], encoding)
+        await send(start_message)
+        await send({"type": "http.response.body", "body": body})
+
+    def _should_buffer(self, headers: MutableHeaders, encoding: Optional[str]) -> bool:
+        """Whether a multi-chunk body is worth collecting to compress it whole."""
+        if encoding is None or not self._is_compressible(headers):
+            return False
+        try:
+            length = int(headers.get("content-length", ""))
+        except ValueError:
+            # Unknown length: a true stream
+            return False
+        return self.minimum_size <= length <= COMPRESSION_BUFFER_MAX_BYTES
+
+    @staticmethod
+    def _is_compressible(headers: MutableHeaders) -> bool:
+        """Whether a response of this type may be compressed, i.e. varies by Accept-Encoding."""
+        if "content-encoding" in headers:
+            return False
+        content_type = headers.get("content-type", "")
+        # Event streams are never buffered, so they never vary by encoding
+        return content_type.startswith(COMPRESSIBLE_CONTENT_TYPES) and not content_type.startswith("text/event-stream")
+
+    def _should_compress(self, status: int, headers: MutableHeaders, body: bytes) -> bool:
+        # Byte ranges refer to the identity body, so partial responses stay as they are
+        return status != 206 and "content-range" not in headers and len(body) >= self.minimum_size
@@ -0,0 +1,46 @@
+"""
+Request id propagation.
+
+Reads the caller's X-Request-ID (or generates one), binds it to the logging
+context for the duration of the request so every log line carries it, and
+echoes it on the response.
+"""
+
+import re
+import uuid
+
+from starlette.datastructures import Headers, MutableHeaders
+
+from app.observability.logging import request_id_var
+
+
+REQUEST_ID_HEADER = "X-Request-ID"
+_SAFE_REQUEST_ID_RE = re.compile(r"^[A-Za-z0-9._-]{1,64}$")
+
+
+class RequestIdMiddleware:
+    """ASGI middleware binding a request id to each HTTP request."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        # Accept a caller-supplied id only if it is short and safe to log
+        request_id = Headers(scope=scope).get(REQUEST_ID_HEADER, "")
+        if not _SAFE_REQUEST_ID_RE.match(request_id):
+            request_id = uuid.uuid4().hex[:16]
+        token = request_id_var.set(request_id)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message)[REQUEST_ID_HEADER] = request_id
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            request_id_var.reset(token)
@@ -1,2 +1,5 @@
 from .prompt import *
-from .api_dto import TashreefPrompt
\ No newline at end of file
+from .api_dto import TashreefPrompt, TashreefBatchPrompt, JobCreatedResponse, JobStatusResponse, CardListItem, CardListResponse
+from .deadline import Deadline, DeadlineExceededError
+from .generation_job import GenerationJob, JobStatusEnum
+from .card_record import CardRecord
@@ -1,5 +1,68 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+import os
 import uuid
 
+# Upper bound on the number of variants a single batch request may ask for
+BATCH_MAX_VARIANTS = int(os.getenv("BATCH_MAX_VARIANTS", "8"))
+
 class TashreefPrompt(BaseModel):
     text: str
+
+
+class TashreefBatchPrompt(BaseModel):
+    """Prompt for generating several distinct card variants in one request."""
+    text: str
+    count: int = Field(default=4, ge=1, le=BATCH_MAX_VARIANTS)
+
+
+class JobCreatedResponse(BaseModel):
+    """Returned when a generation job is enqueued."""
+    job_id: str
+    status: str
+
+
+class JobStatusResponse(BaseModel):
+    """Current state of a generation job, including the card once it has succeeded."""
+    job_id: str
+    status: str
+    attempts: int
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+    result: Optional[Dict[str, Any]] = Field(
+        default=None,
+        description="The CardResponse payload once the job has succeeded."
+    )
+    error: Optional[str] = None
+
+
+# Page size bounds for the card history and gallery listings
+CARD_LIST_DEFAULT_LIMIT = int(os.getenv("CARD_LIST_DEFAULT_LIMIT", "20"))
+CARD_LIST_MAX_LIMIT = int(os.getenv("CARD_LIST_MAX_LIMIT", "100"))
+
+
+class CardListItem(BaseModel):
+    """A lightweight listing row for a stored card: no SVG, no full configs."""
+    id: str
+    created_at: datetime
+    engine_type: str
+    artifact_hash: Optional[str] = None
+    artifact_url: Optional[str] = Field(
+        default=None,
+        description=(
+            "URL of the full stored card SVG (GET /pattern/artifacts/{artifact_hash}); "
+            "left out once the artifact has been evicted from the store."
+        )
+    )
+    summary: Dict[str, Any] = Field(
+        default_factory=dict,
+        description="Event title, colors and the scalar pattern parameters."
+    )
+    prompt: Optional[str] = Field(default=None, description="Only included in history listings.")
+
+
+class CardListResponse(BaseModel):
+    """One page of a card listing; pass next_cursor back as `cursor` for the next page."""
+    items: List[CardListItem]
+    next_cursor: Optional[str] = None
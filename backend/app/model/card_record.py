@@ -0,0 +1,51 @@
+"""
+Persistent record of a generated card.
+
+Every card produced by the generation pipeline (single, batch, streamed or
+background job) is written to the database by the CardWriter write-behind
+queue, so generations are kept for history and analysis without the request
+waiting on the insert. The card SVG itself lives in the artifact store and is
+referenced by its content hash.
+"""
+
+import uuid
+from datetime import datetime, timezone
+
+from sqlalchemy import Column, DateTime, Index, JSON, String, Text
+
+from app.config.db_config import Base
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class CardRecord(Base):
+    """A generated card: its prompt, engine, configs, artifact hash and stage timings."""
+    __tablename__ = "card_records"
+
+    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    prompt = Column(Text, nullable=False)
+    engine_type = Column(String(32), nullable=False)
+    # Which endpoint produced the card: generate, batch, stream or job
+    source = Column(String(16), nullable=False)
+    request_id = Column(String(64), nullable=True)
+    pattern_config = Column(JSON, nullable=False)
+    content_config = Column(JSON, nullable=False)
+    artifact_hash = Column(String(64), nullable=True)
+    degraded_stages = Column(JSON, nullable=False, default=list)
+    # Milliseconds per pipeline stage, as reported in the Server-Timing header
+    timings = Column(JSON, nullable=False, default=dict)
+    # Small precomputed listing summary, so history and gallery pages never
+    # read the full configs
+    summary = Column(JSON, nullable=False, default=dict)
+    created_at = Column(DateTime(timezone=True), nullable=False, default=_utcnow)
+
+    __table_args__ = (
+        # Keyset pagination walks (created_at, id) newest first; the id breaks ties
+        Index("ix_card_records_created_at_id", "created_at", "id"),
+        # Listings filtered by engine ("designs like this") use the same order
+        Index("ix_card_records_engine_created_at_id", "engine_type", "created_at", "id"),
+        # Looks up every card that produced a given stored SVG
+        Index("ix_card_records_artifact_hash", "artifact_hash"),
+    )
@@ -0,0 +1,76 @@
+"""
+Request deadline shared across the generation pipeline.
+
+A Deadline is created by the controller for each request and handed down
+through the service, router, inference and card generation layers. Each stage
+asks it for its remaining budget (minus what the later stages need) and falls
+back to a local default when too little time is left, recording the stage it
+degraded so the response can report it.
+"""
+
+import os
+import time
+from typing import Dict, List, Optional
+
+from app.observability.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+# Default end-to-end budget for a generation request, kept under the gateway timeout
+REQUEST_DEADLINE_SECONDS = float(os.getenv("REQUEST_DEADLINE_SECONDS", "25"))
+
+# Pipeline stages in execution order with the minimum time each one needs to be
+# worth attempting. Stages without a local fallback (render) only reserve time.
+STAGE_MIN_SECONDS: Dict[str, float] = {
+    "routing": float(os.getenv("DEADLINE_MIN_ROUTING_SECONDS", "1.0")),
+    "pattern_config": float(os.getenv("DEADLINE_MIN_PATTERN_CONFIG_SECONDS", "2.0")),
+    "render": float(os.getenv("DEADLINE_MIN_RENDER_SECONDS", "0.5")),
+    "content": float(os.getenv("DEADLINE_MIN_CONTENT_SECONDS", "1.0")),
+}
+
+
+class DeadlineExceededError(TimeoutError):
+    """Raised when a stage runs out of its share of the request deadline."""
+
+
+class Deadline:
+    """
+    Absolute time budget for one request.
+
+    Args:
+        budget_seconds: Total time the request may take from now
+    """
+
+    def __init__(self, budget_seconds: float = REQUEST_DEADLINE_SECONDS):
+        self.budget_seconds = budget_seconds
+        self.expires_at = time.monotonic() + budget_seconds
+        self.degraded_stages: List[str] = []
+
+    def remaining(self) -> float:
+        """Seconds left before the deadline (never negative)."""
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0.0
+
+    def stage_timeout(self, stage: str) -> Optional[float]:
+        """
+        Returns how long the given stage may run, or None if it should fall back.
+
+        The budget is the remaining time minus the minimum reserved for every
+        stage that runs after this one.
+        """
+        stages = list(STAGE_MIN_SECONDS)
+        later_stages = stages[stages.index(stage) + 1:] if stage in STAGE_MIN_SECONDS else []
+        reserve = sum(STAGE_MIN_SECONDS[name] for name in later_stages)
+        available = self.remaining() - reserve
+        if available < STAGE_MIN_SECONDS.get(stage, 0.0):
+            return None
+        return available
+
+    def mark_degraded(self, stage: str) -> None:
+        """Records that a stage fell back to its local default."""
+        if stage not in self.degraded_stages:
+            logger.warning("Stage %s degraded with %.2fs remaining", stage, self.remaining())
+            self.degraded_stages.append(stage)
@@ -0,0 +1,48 @@
+"""
+Persistent generation job model.
+
+Jobs submitted through the asynchronous /pattern/jobs API are stored in the
+database so queued and in-flight work survives a restart: a running job whose
+lease has expired is picked up again by the next available worker.
+"""
+
+import uuid
+from datetime import datetime, timezone
+from enum import Enum
+
+from sqlalchemy import Column, DateTime, Index, Integer, JSON, String, Text
+
+from app.config.db_config import Base
+
+
+class JobStatusEnum(str, Enum):
+    """Lifecycle states of a generation job."""
+    queued = "queued"
+    running = "running"
+    succeeded = "succeeded"
+    failed = "failed"
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class GenerationJob(Base):
+    """A card generation request processed by the background job workers."""
+    __tablename__ = "generation_jobs"
+
+    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    prompt = Column(Text, nullable=False)
+    status = Column(String(16), nullable=False, default=JobStatusEnum.queued.value)
+    attempts = Column(Integer, nullable=False, default=0)
+    result = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
+    lease_expires_at = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(DateTime(timezone=True), nullable=False, default=_utcnow)
+    updated_at = Column(DateTime(timezone=True), nullable=False, default=_utcnow, onupdate=_utcnow)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        # Workers claim the oldest claimable job by status
+        Index("ix_generation_jobs_status_created_at", "status", "created_at"),
+    )
@@ -0,0 +1,20 @@
+from .metrics import (
+    Counter,
+    Histogram,
+    MetricsRegistry,
+    get_registry,
+    record_fallback,
+    render_stats,
+    stage_timer,
+    CARD_WRITES,
+    COALESCED_REQUESTS,
+    COMPLEXITY_DOWNGRADES,
+    FALLBACKS,
+    LLM_REQUESTS,
+    LLM_STREAM_ABORTS,
+    OUTPUT_BYTES,
+    PROMPT_TOKENS,
+    STAGE_DURATION,
+)
+from .timing import RequestTiming, current_timing, request_timing, record_stage
+from .logging import configure_logging, get_logger, log_payload, request_id_var
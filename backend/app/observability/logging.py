@@ -0,0 +1,145 @@
+"""
+Structured, leveled logging for the service.
+
+Every module logs through a standard library logger from get_logger(), using
+lazy %-style arguments so messages below the configured level are never
+formatted. configure_logging() installs a single handler that:
+
+- writes one JSON object per line (LOG_FORMAT=json, the default) or a
+  compact human-readable line (LOG_FORMAT=text) at LOG_LEVEL;
+- tags every record with the current request id (see RequestIdMiddleware)
+  and any `extra` fields passed at the call site;
+- hands records to a background thread through a queue, so stdout I/O never
+  runs on the event loop.
+
+Large payloads such as raw LLM responses go through log_payload(), which only
+emits them for a sampled fraction of calls (LOG_PAYLOAD_SAMPLE_RATE), or
+always at DEBUG, truncated to LOG_PAYLOAD_MAX_CHARS.
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Any, Callable, Optional, Union
+
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+# "json" for log aggregation, "text" for local development
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json").lower()
+# Fraction of verbose payloads (e.g. raw AI responses) logged at INFO
+LOG_PAYLOAD_SAMPLE_RATE = float(os.getenv("LOG_PAYLOAD_SAMPLE_RATE", "0.01"))
+# Payloads are truncated to this many characters
+LOG_PAYLOAD_MAX_CHARS = int(os.getenv("LOG_PAYLOAD_MAX_CHARS", "2000"))
+
+# Attributes present on every LogRecord; anything else came from `extra`
+_RESERVED_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "request_id"}
+
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Returns the logger for a module (pass __name__)."""
+    return logging.getLogger(name)
+
+
+class RequestIdFilter(logging.Filter):
+    """Adds the current request id to every record."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        return True
+
+
+def _extra_fields(record: logging.LogRecord) -> dict:
+    return {key: value for key, value in vars(record).items() if key not in _RESERVED_ATTRS}
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats records as single-line JSON objects."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        if record.request_id:
+            entry["request_id"] = record.request_id
+        entry.update(_extra_fields(record))
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """Formats records as `time LEVEL logger [request id] message key=value ...`."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = f"{self.formatTime(record, '%H:%M:%S')} {record.levelname:<7} {record.name}"
+        if record.request_id:
+            line += f" [{record.request_id}]"
+        line += f" {record.getMessage()}"
+        fields = _extra_fields(record)
+        if fields:
+            line += " " + " ".join(f"{key}={value}" for key, value in fields.items())
+        if record.exc_info:
+            line += "\n" + self.formatException(record.exc_info)
+        return line
+
+
+def configure_logging(level: str = LOG_LEVEL, log_format: str = LOG_FORMAT) -> None:
+    """Installs the queue-backed structured handler on the root logger (idempotent)."""
+    global _listener
+    if _listener is not None:
+        return
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(TextFormatter() if log_format == "text" else JsonFormatter())
+
+    # The request id is read on the logging call's thread, before the record is queued
+    queue_handler = logging.handlers.QueueHandler(queue.SimpleQueue())
+    queue_handler.addFilter(RequestIdFilter())
+
+    root = logging.getLogger()
+    root.handlers = [queue_handler]
+    root.setLevel(level)
+
+    _listener = logging.handlers.QueueListener(queue_handler.queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
+
+
+def log_payload(
+    logger: logging.Logger,
+    label: str,
+    payload: Union[str, Callable[[], str]],
+    **fields: Any
+) -> None:
+    """
+    Logs a verbose payload for a sampled fraction of calls (always at DEBUG).
+
+    `payload` may be a callable so expensive serialization only happens when
+    the payload is actually logged.
+    """
+    if logger.isEnabledFor(logging.DEBUG):
+        level = logging.DEBUG
+    elif random.random() < LOG_PAYLOAD_SAMPLE_RATE and logger.isEnabledFor(logging.INFO):
+        level = logging.INFO
+    else:
+        return
+
+    text = payload() if callable(payload) else payload
+    if len(text) > LOG_PAYLOAD_MAX_CHARS:
+        fields["truncated_from"] = len(text)
+        text = text[:LOG_PAYLOAD_MAX_CHARS]
+    logger.log(level, "%s: %s", label, text, extra=fields)
@@ -0,0 +1,286 @@
+"""
+In-process metrics with Prometheus text exposition.
+
+A deliberately small registry of counters and histograms so instrumentation
+costs a dict lookup and a few additions per observation, with no dependency
+and no locking (everything is updated from the event loop thread). The
+/metrics endpoint renders the registry in the Prometheus text format.
+
+Metrics are per process: when running several uvicorn workers, scrape each
+worker or aggregate in Prometheus.
+"""
+
+import bisect
+import math
+import time
+from contextlib import contextmanager
+from typing import Collection, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from app.observability.timing import record_stage
+
+
+LabelValues = Tuple[str, ...]
+
+# Latency buckets (seconds) covering cache hits through slow LLM calls
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# Size buckets (bytes) from small JSON payloads to multi-megabyte cards
+BYTE_BUCKETS = (1_000, 10_000, 50_000, 100_000, 250_000, 500_000, 1_000_000, 2_500_000, 5_000_000, 10_000_000)
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = [f'{name}="{_escape_label(value)}"' for name, value in zip(names, values)]
+    if extra is not None:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Counter:
+    """
+    Monotonic counter with optional labels.
+
+    Args:
+        name: Metric name
+        documentation: HELP text
+        labelnames: Label names, passed as keyword arguments to inc()
+    """
+
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(tuple(str(labels.get(name, "")) for name in self.labelnames), 0.0)
+
+    def collect(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in self._values.items()
+        ]
+
+
+class Histogram:
+    """
+    Cumulative-bucket histogram with optional labels.
+
+    Args:
+        name: Metric name
+        documentation: HELP text
+        labelnames: Label names, passed as keyword arguments to observe()
+        buckets: Upper bounds of the buckets, in increasing order
+    """
+
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # Per label set: [bucket counts..., +Inf count], sum
+        self._series: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = ([0] * (len(self.buckets) + 1), [0.0])
+        counts, total = series
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        total[0] += value
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        """Observes the wall time of the enclosed block (awaits included)."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def collect(self) -> List[str]:
+        lines = []
+        for key, (counts, total) in self._series.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                labels = _format_labels(self.labelnames, key, ("le", _format_value(bound)))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total[0])}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Holds every metric and renders them in the Prometheus text format."""
+
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+
+    def register(self, metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric '{metric.name}' is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type_name}")
+            lines.extend(metric.collect())
+        return "\n".join(lines) + "\n"
+
+
+def render_stats(
+    name: str,
+    documentation: str,
+    series: Sequence[Tuple[Dict[str, str], Dict[str, object]]],
+    counters: Collection[str] = ()
+) -> str:
+    """
+    Renders components' stats() dicts as metrics named after `<name>_<key>`.
+
+    `series` holds (labels, stats) pairs, e.g. one per model. Used for
+    counters owned by other components (caches, pools) so they are read at
+    scrape time instead of being mirrored on every update.
+
+    Keys listed in `counters` only ever increase within a process (hits,
+    misses, evictions) and are exported as counters named
+    `<name>_<key>_total`, so rate() handles process restarts. Every other key
+    is a current value (sizes, entry counts, ratios) and exported as a gauge.
+    """
+    samples: Dict[str, List[str]] = {}
+    types: Dict[str, str] = {}
+    for labels, stats in series:
+        for key, value in stats.items():
+            if isinstance(value, bool):
+                value = int(value)
+            if not isinstance(value, (int, float)):
+                continue
+            metric_name = f"{name}_{key}_total" if key in counters else f"{name}_{key}"
+            types[metric_name] = "counter" if key in counters else "gauge"
+            label_text = _format_labels(tuple(labels), tuple(labels.values()))
+            samples.setdefault(metric_name, []).append(f"{metric_name}{label_text} {_format_value(value)}")
+
+    lines = []
+    for metric_name, metric_samples in samples.items():
+        lines.append(f"# HELP {metric_name} {documentation}")
+        lines.append(f"# TYPE {metric_name} {types[metric_name]}")
+        lines.extend(metric_samples)
+    return "\n".join(lines) + "\n" if lines else ""
+
+
+_registry = MetricsRegistry()
+
+
+def get_registry() -> MetricsRegistry:
+    """Returns the process-wide MetricsRegistry."""
+    return _registry
+
+
+# --- Pipeline metrics ---------------------------------------------------------
+
+STAGE_DURATION = _registry.histogram(
+    "tashreef_stage_duration_seconds",
+    "Time spent in each generation pipeline stage.",
+    labelnames=("stage", "engine")
+)
+FALLBACKS = _registry.counter(
+    "tashreef_fallbacks_total",
+    "Times a stage fell back to a local default instead of an AI result.",
+    labelnames=("stage", "reason")
+)
+LLM_REQUESTS = _registry.counter(
+    "tashreef_llm_requests_total",
+    "Structured LLM calls by response model and outcome.",
+    labelnames=("response_model", "outcome")
+)
+LLM_STREAM_ABORTS = _registry.counter(
+    "tashreef_llm_stream_aborts_total",
+    "Streamed structured LLM calls aborted early, by response model and reason.",
+    labelnames=("response_model", "reason")
+)
+COALESCED_REQUESTS = _registry.counter(
+    "tashreef_coalesced_requests_total",
+    "Calls that joined identical in-flight work (coalesced) and shared work cancelled once every caller left (abandoned).",
+    labelnames=("group", "outcome")
+)
+OUTPUT_BYTES = _registry.histogram(
+    "tashreef_output_bytes",
+    "Size of generated SVG output.",
+    labelnames=("kind", "engine"),
+    buckets=BYTE_BUCKETS
+)
+
+PROMPT_TOKENS = _registry.counter(
+    "tashreef_prompt_tokens_total",
+    "Estimated tokens in assembled LLM prompts, by prompt and part (static prefix or per-request suffix).",
+    labelnames=("prompt", "part")
+)
+COMPLEXITY_DOWNGRADES = _registry.counter(
+    "tashreef_complexity_downgrades_total",
+    "Pattern config parameters reduced to fit the complexity budget, by engine, parameter and exceeded limit.",
+    labelnames=("engine", "parameter", "limit")
+)
+CARD_WRITES = _registry.counter(
+    "tashreef_card_writes_total",
+    "Generated cards handled by the write-behind queue, by outcome.",
+    labelnames=("outcome",)
+)
+
+
+@contextmanager
+def stage_timer(stage: str, engine: str = "") -> Iterator[None]:
+    """
+    Times one pipeline stage into the stage histogram and, when a request is
+    being timed, into its Server-Timing entries.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - start
+        STAGE_DURATION.observe(seconds, stage=stage, engine=engine)
+        record_stage(stage, seconds)
+
+
+def record_fallback(stage: str, reason: str) -> None:
+    """Counts a stage falling back to its default (e.g. router defaulting to l_system)."""
+    FALLBACKS.inc(stage=stage, reason=reason)
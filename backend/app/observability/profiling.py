@@ -0,0 +1,195 @@
+"""
+Opt-in cProfile capture for slow or sampled requests.
+
+Enable with PROFILE_SLOW_REQUEST_SECONDS (profile every request and keep the
+dumps of those slower than the threshold) and/or PROFILE_SAMPLE_RATE (keep a
+random fraction of requests). Both default to off: while enabled every request
+runs under cProfile, which slows it down noticeably.
+
+Each kept request produces two files in PROFILE_DIR sharing one name:
+    <name>.prof   cProfile stats, for pstats / snakeviz
+    <name>.json   endpoint, prompt, engine type, pattern config and stage timings
+
+The profiler is enabled on the event loop thread for the whole request,
+across its awaits. Anything else the loop runs in that window (other
+requests, background workers) is recorded in the same .prof file and charged
+to the profiled request; only one request is profiled at a time, but the
+others keep running. Under load the .prof file is therefore a profile of the
+whole process during that request, not of the request alone. The .json header
+says so in "attribution" and gives the number of requests of the same
+endpoint that overlapped the window in "overlapping_requests"; profiles with
+zero overlap are the clean ones.
+
+Renders run in the render pool's worker processes and so do not appear in the
+.prof file; replay the captured config in-process to profile the engine:
+
+    python -m app.observability.profiling .cache/profiles/<name>.json
+"""
+
+import asyncio
+import cProfile
+import json
+import os
+import pstats
+import random
+import sys
+import time
+import uuid
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional
+
+from app.observability.timing import RequestTiming
+from app.observability.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+# Keep profiles of requests at least this slow (0 disables)
+PROFILE_SLOW_REQUEST_SECONDS = float(os.getenv("PROFILE_SLOW_REQUEST_SECONDS", "0"))
+# Fraction of requests whose profile is kept regardless of latency (0 disables)
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+# Directory the .prof / .json dumps are written to
+PROFILE_DIR = os.getenv("PROFILE_DIR", ".cache/profiles")
+
+# cProfile allows one active profiler per thread, and every request shares the
+# event loop thread, so only one request is profiled at a time
+_profiler_busy = False
+# Requests inside profile_request right now, and in total, to count overlap
+_requests_in_flight = 0
+_requests_started = 0
+
+_ATTRIBUTION_NOTE = (
+    "Process-wide: everything the event loop ran while this request was in "
+    "flight is included, see overlapping_requests"
+)
+
+
+def profiling_enabled() -> bool:
+    return PROFILE_SLOW_REQUEST_SECONDS > 0 or PROFILE_SAMPLE_RATE > 0
+
+
+class RequestProfile:
+    """
+    Profiling state for one request; the handler adds reproduction details to `context`.
+
+    Args:
+        endpoint: Name of the endpoint being profiled
+        timing: The request's stage timings, saved alongside the dump
+    """
+
+    def __init__(self, endpoint: str, timing: Optional[RequestTiming] = None):
+        self.endpoint = endpoint
+        self.timing = timing
+        self.context: Dict[str, Any] = {}
+        self.profiler: Optional[cProfile.Profile] = None
+        self.sampled = random.random() < PROFILE_SAMPLE_RATE
+        self.overlapping_requests = 0
+
+    def record_card(self, user_prompt: str, card_response) -> None:
+        """Stores what is needed to replay the request's render offline."""
+        self.context.update({
+            "prompt": user_prompt,
+            "engine_type": card_response.pattern_config.engine_type,
+            "pattern_config": card_response.pattern_config.model_dump(mode="json"),
+            "degraded_stages": list(card_response.degraded_stages),
+        })
+
+    def keep_reason(self, elapsed: float) -> Optional[str]:
+        if PROFILE_SLOW_REQUEST_SECONDS > 0 and elapsed >= PROFILE_SLOW_REQUEST_SECONDS:
+            return "slow"
+        if self.sampled:
+            return "sampled"
+        return None
+
+
+@asynccontextmanager
+async def profile_request(endpoint: str, timing: Optional[RequestTiming] = None) -> AsyncIterator[RequestProfile]:
+    """
+    Profiles the enclosed request handling when profiling is enabled and no
+    other request is currently being profiled; writes the dump if it is kept.
+    """
+    global _profiler_busy, _requests_in_flight, _requests_started
+    profile = RequestProfile(endpoint, timing)
+    if not profiling_enabled():
+        yield profile
+        return
+
+    _requests_in_flight += 1
+    _requests_started += 1
+    if _profiler_busy:
+        try:
+            yield profile
+        finally:
+            _requests_in_flight -= 1
+        return
+
+    _profiler_busy = True
+    # Requests already running, plus those started before this one finishes
+    already_running = _requests_in_flight - 1
+    started_before = _requests_started
+    profile.profiler = cProfile.Profile()
+    started_at = time.perf_counter()
+    profile.profiler.enable()
+    try:
+        yield profile
+    finally:
+        profile.profiler.disable()
+        _profiler_busy = False
+        _requests_in_flight -= 1
+        profile.overlapping_requests = already_running + _requests_started - started_before
+        elapsed = time.perf_counter() - started_at
+        reason = profile.keep_reason(elapsed)
+        if reason is not None:
+            try:
+                path = await asyncio.to_thread(_write_dump, profile, elapsed, reason)
+                logger.info("Saved %s request profile (%.2fs) to %s.prof", reason, elapsed, path)
+            except OSError as e:
+                logger.warning("Failed to save request profile: %s", e)
+
+
+def _write_dump(profile: RequestProfile, elapsed: float, reason: str) -> str:
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    engine_type = profile.context.get("engine_type", "unknown")
+    name = f"{time.strftime('%Y%m%d-%H%M%S')}-{profile.endpoint}-{engine_type}-{uuid.uuid4().hex[:8]}"
+    path = os.path.join(PROFILE_DIR, name)
+
+    profile.profiler.dump_stats(f"{path}.prof")
+    metadata = {
+        "endpoint": profile.endpoint,
+        "reason": reason,
+        "elapsed_seconds": round(elapsed, 4),
+        "attribution": _ATTRIBUTION_NOTE,
+        "overlapping_requests": profile.overlapping_requests,
+        "stages": {
+            stage: {"seconds": round(total, 4), "calls": calls}
+            for stage, (total, calls) in (profile.timing.totals() if profile.timing else {}).items()
+        },
+        **profile.context,
+    }
+    with open(f"{path}.json", "w", encoding="utf-8") as f:
+        json.dump(metadata, f, indent=2)
+    return path
+
+
+def replay(dump_path: str, limit: int = 25) -> None:
+    """Re-renders the config captured in a dump under cProfile and prints the hottest functions."""
+    from app.engine.renderer import render_config
+
+    with open(dump_path, encoding="utf-8") as f:
+        metadata = json.load(f)
+    if "pattern_config" not in metadata:
+        raise SystemExit(f"{dump_path} has no pattern_config to replay")
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    svg = render_config(metadata["engine_type"], metadata["pattern_config"])
+    profiler.disable()
+
+    print(f"Rendered {metadata['engine_type']} pattern: {len(svg)} bytes")
+    pstats.Stats(profiler).sort_stats("cumulative").print_stats(limit)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        raise SystemExit("Usage: python -m app.observability.profiling <dump.json>")
+    replay(sys.argv[1])
@@ -0,0 +1,81 @@
+"""
+Per-request stage timings for the Server-Timing response header.
+
+A RequestTiming is bound to a context variable for the duration of a request.
+Every stage_timer() block (see metrics.py) records its duration into the
+current request's timing as well as the global histogram, including blocks
+running in tasks spawned with asyncio.gather, which inherit the context.
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional, Tuple
+
+
+_current_timing: ContextVar[Optional["RequestTiming"]] = ContextVar("request_timing", default=None)
+
+
+class RequestTiming:
+    """Stage durations recorded during one request."""
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.stages: List[Tuple[str, float]] = []
+
+    def record(self, stage: str, seconds: float) -> None:
+        self.stages.append((stage, seconds))
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started_at
+
+    def totals(self) -> Dict[str, Tuple[float, int]]:
+        """Total seconds and number of calls per stage, in first-seen order."""
+        totals: Dict[str, Tuple[float, int]] = {}
+        for stage, seconds in self.stages:
+            total, calls = totals.get(stage, (0.0, 0))
+            totals[stage] = (total + seconds, calls + 1)
+        return totals
+
+    def stage_milliseconds(self) -> Dict[str, float]:
+        """Total milliseconds per stage, rounded for storage."""
+        return {stage: round(total * 1000, 1) for stage, (total, _) in self.totals().items()}
+
+    def server_timing_header(self) -> str:
+        """
+        Formats the timings as a Server-Timing header value (milliseconds).
+
+        Stages that ran several times (e.g. parallel renders in a batch) are
+        summed and annotated with their call count.
+        """
+        entries = []
+        for stage, (total, calls) in self.totals().items():
+            entry = f"{stage};dur={total * 1000:.1f}"
+            if calls > 1:
+                entry += f';desc="{calls} calls"'
+            entries.append(entry)
+        entries.append(f"total;dur={self.elapsed() * 1000:.1f}")
+        return ", ".join(entries)
+
+
+@contextmanager
+def request_timing() -> Iterator[RequestTiming]:
+    """Binds a fresh RequestTiming to the current context for the enclosed block."""
+    timing = RequestTiming()
+    token = _current_timing.set(timing)
+    try:
+        yield timing
+    finally:
+        _current_timing.reset(token)
+
+
+def current_timing() -> Optional[RequestTiming]:
+    """Returns the RequestTiming of the current request, if one is being timed."""
+    return _current_timing.get()
+
+
+def record_stage(stage: str, seconds: float) -> None:
+    """Records a stage duration on the current request, if one is being timed."""
+    timing = _current_timing.get()
+    if timing is not None:
+        timing.record(stage, seconds)
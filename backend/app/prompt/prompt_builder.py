@@ -2,14 +2,42 @@
 Prompt builder utility for constructing engine-specific prompts.
 
 This module provides functionality to concatenate base prompts with
-engine-specific prompts based on the selected engine type.
+engine-specific prompts based on the selected engine type. The static part
+of every engine prompt (base prompt, engine prompt and, for batches, the
+variant instructions) is registered once in the prompt registry at import,
+so building a prompt only appends the user's request.
 """
 
 from app.model.prompt import EngineTypeEnum
 from app.prompt.base_prompt import BASE_PROMPT
+from app.prompt.prompt_registry import AssembledPrompt, get_prompt_registry, user_prompt_suffix
+from app.engine.fractal_engine.prompts import L_SYSTEM_PROMPT
+from app.engine.parametric_engine.prompts import PARAMETRIC_PROMPT
+from app.engine.tessellation_engine.prompts import TESSELLATION_PROMPT
 
 
-def build_engine_prompt(engine_type: EngineTypeEnum, user_prompt: str) -> str:
+ENGINE_PROMPTS = {
+    EngineTypeEnum.l_system: L_SYSTEM_PROMPT,
+    EngineTypeEnum.parametric: PARAMETRIC_PROMPT,
+    EngineTypeEnum.tessellation: TESSELLATION_PROMPT,
+}
+
+BATCH_INSTRUCTIONS = (
+    "Return exactly VARIANTS configurations in the `variants` list, where VARIANTS is "
+    "given below. Each variant must satisfy the request but be visibly distinct from the "
+    "others: vary the parameters, colors and stroke styles rather than repeating the same design."
+)
+
+_registry = get_prompt_registry()
+for _engine_type, _engine_prompt_text in ENGINE_PROMPTS.items():
+    _registry.register(f"pattern_config:{_engine_type.value}", f"{BASE_PROMPT}\n\n{_engine_prompt_text}\n\n---\n")
+    _registry.register(
+        f"pattern_batch:{_engine_type.value}",
+        f"{BASE_PROMPT}\n\n{_engine_prompt_text}\n\n{BATCH_INSTRUCTIONS}\n\n---\n"
+    )
+
+
+def build_engine_prompt(engine_type: EngineTypeEnum, user_prompt: str) -> AssembledPrompt:
     """
     Build a complete prompt by concatenating base prompt, engine-specific prompt, and user prompt.
     
@@ -24,22 +52,27 @@ def build_engine_prompt(engine_type: EngineTypeEnum, user_prompt: str) -> str:
         >>> prompt = build_engine_prompt(EngineTypeEnum.l_system, "Create a fern pattern")
         >>> # Returns: BASE_PROMPT + L_SYSTEM_PROMPT + user_prompt
     """
-    base = BASE_PROMPT
-    
-    # Import and select the appropriate engine-specific prompt
-    if engine_type == EngineTypeEnum.l_system:
-        from app.engine.fractal_engine.prompts import L_SYSTEM_PROMPT
-        engine_prompt = L_SYSTEM_PROMPT
-    elif engine_type == EngineTypeEnum.parametric:
-        from app.engine.parametric_engine.prompts import PARAMETRIC_PROMPT
-        engine_prompt = PARAMETRIC_PROMPT
-    elif engine_type == EngineTypeEnum.tessellation:
-        from app.engine.tessellation_engine.prompts import TESSELLATION_PROMPT
-        engine_prompt = TESSELLATION_PROMPT
-    else:
-        # Default to l_system if unknown engine type
-        from app.engine.fractal_engine.prompts import L_SYSTEM_PROMPT
-        engine_prompt = L_SYSTEM_PROMPT
+    return _registry.assemble(f"pattern_config:{_engine_key(engine_type)}", user_prompt_suffix(user_prompt))
+
+
+def build_batch_prompt(engine_type: EngineTypeEnum, user_prompt: str, count: int) -> AssembledPrompt:
+    """
+    Build a prompt asking for several distinct pattern configs in one call.
     
-    # Concatenate all parts with clear separation
-    return f"{base}\n\n{engine_prompt}\n\n---\nUSER PROMPT:\n{user_prompt}"
+    Args:
+        engine_type: The type of pattern generation engine to use
+        user_prompt: The user's natural language request
+        count: Number of variants to request
+        
+    Returns:
+        A complete prompt string whose response is a `variants` list of engine configs
+    """
+    return _registry.assemble(
+        f"pattern_batch:{_engine_key(engine_type)}",
+        f"VARIANTS: {count}\n{user_prompt_suffix(user_prompt)}"
+    )
+
+
+def _engine_key(engine_type: EngineTypeEnum) -> str:
+    """Returns the registered engine name, defaulting to the L-System prompt."""
+    return engine_type.value if engine_type in ENGINE_PROMPTS else EngineTypeEnum.l_system.value
@@ -0,0 +1,139 @@
+"""
+Registry of static prompt prefixes.
+
+Every LLM call in the pipeline sends a large static instruction block (the
+router rules, the base and engine prompts, the content prompt) followed by a
+short per-request part holding the user's text. The static blocks are
+registered here once, at import, together with their estimated token count
+and a content key, instead of being re-concatenated on every request.
+
+Prompts are assembled as AssembledPrompt objects: plain strings (so every
+backend can keep sending the full text) that also carry the registered prefix
+and the per-request suffix. Backends with prompt/context caching use the
+prefix to send the static part once (see InferenceBackend.prepare_prefixes)
+and only the suffix per request.
+
+Token counts are estimates (PROMPT_CHARS_PER_TOKEN characters per token),
+good enough to compare stages and spot prompt growth, not to bill by.
+"""
+
+import hashlib
+import os
+from typing import Dict, List, Optional
+
+from app.observability.metrics import PROMPT_TOKENS
+
+
+# Average characters per token used to estimate prompt sizes
+PROMPT_CHARS_PER_TOKEN = float(os.getenv("PROMPT_CHARS_PER_TOKEN", "4"))
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimates the number of model tokens in `text`."""
+    return int(len(text) / PROMPT_CHARS_PER_TOKEN + 0.5)
+
+
+class PromptPrefix:
+    """
+    A registered static prompt prefix.
+
+    Args:
+        name: Registry name, e.g. "routing" or "pattern_config:l_system"
+        text: The exact prefix text
+    """
+
+    def __init__(self, name: str, text: str):
+        self.name = name
+        self.text = text
+        self.tokens = estimate_tokens(text)
+        # Content key for backend-side caches; changes whenever the text does
+        self.key = hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+    @property
+    def stage(self) -> str:
+        """The pipeline stage the prefix is used by (the name without its variant)."""
+        return self.name.split(":", 1)[0]
+
+    def __repr__(self) -> str:
+        return f"PromptPrefix({self.name!r}, tokens={self.tokens}, key={self.key!r})"
+
+
+class AssembledPrompt(str):
+    """
+    A full prompt (prefix + suffix) that remembers its parts.
+
+    It is a `str`, so code and backends that only need the text are unchanged.
+    """
+
+    prefix: PromptPrefix
+    suffix: str
+
+    def __new__(cls, prefix: PromptPrefix, suffix: str):
+        prompt = super().__new__(cls, prefix.text + suffix)
+        prompt.prefix = prefix
+        prompt.suffix = suffix
+        return prompt
+
+    @property
+    def suffix_tokens(self) -> int:
+        return estimate_tokens(self.suffix)
+
+
+class PromptRegistry:
+    """Holds the registered prefixes and assembles prompts from them."""
+
+    def __init__(self):
+        self._prefixes: Dict[str, PromptPrefix] = {}
+
+    def register(self, name: str, text: str) -> PromptPrefix:
+        """
+        Registers (or replaces) the static prefix for a prompt name.
+
+        Returns:
+            The registered PromptPrefix
+        """
+        prefix = self._prefixes.get(name)
+        if prefix is None or prefix.text != text:
+            prefix = PromptPrefix(name, text)
+            self._prefixes[name] = prefix
+        return prefix
+
+    def get(self, name: str) -> Optional[PromptPrefix]:
+        return self._prefixes.get(name)
+
+    def prefixes(self) -> List[PromptPrefix]:
+        """Returns every registered prefix."""
+        return list(self._prefixes.values())
+
+    def assemble(self, name: str, suffix: str) -> AssembledPrompt:
+        """
+        Builds the prompt for a registered prefix and records its estimated
+        prefix and suffix token counts.
+
+        Raises:
+            KeyError: If no prefix is registered under `name`
+        """
+        prompt = AssembledPrompt(self._prefixes[name], suffix)
+        PROMPT_TOKENS.inc(prompt.prefix.tokens, prompt=name, part="prefix")
+        PROMPT_TOKENS.inc(prompt.suffix_tokens, prompt=name, part="suffix")
+        return prompt
+
+    def stats(self) -> Dict[str, Dict[str, object]]:
+        """Returns the estimated tokens and cache key of every registered prefix."""
+        return {
+            prefix.name: {"tokens": prefix.tokens, "chars": len(prefix.text), "key": prefix.key}
+            for prefix in self._prefixes.values()
+        }
+
+
+_prompt_registry = PromptRegistry()
+
+
+def get_prompt_registry() -> PromptRegistry:
+    """Returns the process-wide PromptRegistry."""
+    return _prompt_registry
+
+
+def user_prompt_suffix(user_prompt: str) -> str:
+    """The per-request part shared by every pipeline prompt."""
+    return f"USER PROMPT:\n{user_prompt}"
@@ -0,0 +1 @@
+from .health_controller import *
\ No newline at end of file
@@ -0,0 +1,30 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from app.service.startup_service import get_startup_service
+
+router = APIRouter(tags=["Health"])
+
+
+@router.get("/healthz")
+async def get_liveness():
+    """
+    Liveness probe: the process is up and its event loop is responding.
+    
+    Does no I/O, so it answers as soon as the server accepts connections,
+    before the startup warm-up has finished.
+    """
+    return {"status": "ok"}
+
+
+@router.get("/readyz")
+async def get_readiness():
+    """
+    Readiness probe: returns 200 once the startup warm-up has finished and
+    503 while it is still running.
+    
+    The body reports the result of each warm-up step (render_pool, inference,
+    database) and a fresh database ping. A failing database is reported but
+    does not make the process unready, since card generation does not use it.
+    """
+    report = await get_startup_service().readiness()
+    return JSONResponse(content=report, status_code=200 if report["status"] == "ready" else 503)
@@ -0,0 +1 @@
+from .metrics_controller import *
\ No newline at end of file
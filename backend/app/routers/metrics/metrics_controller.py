@@ -0,0 +1,78 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from app.observability.metrics import get_registry, render_stats
+from app.inference.client_manager import get_client_manager
+from app.inference.resilience import get_retry_budget
+from app.service.render_cache import get_render_cache
+from app.cache.shared_cache import get_shared_cache
+from app.service.artifact_store import get_artifact_store
+from app.service.card_writer import get_card_writer
+from app.prompt.prompt_registry import get_prompt_registry
+from app.middleware.compression import get_precompressed_cache
+
+router = APIRouter(tags=["Metrics"])
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """
+    Expose this worker's metrics in the Prometheus text format.
+    
+    Includes per-stage latency histograms (routing, pattern_config, render per
+    engine, content, compose), fallback counters, LLM call outcomes and output
+    sizes, plus gauges read from the inference queue, retry budget, render
+    cache, shared cache, artifact store, card writer and compression cache,
+    and the size of each static prompt prefix, at scrape time.
+    """
+    retry_budget = get_retry_budget()
+    shared_cache = get_shared_cache()
+    body = "".join([
+        get_registry().render(),
+        render_stats(
+            "tashreef_inference",
+            "Inference client manager state per model.",
+            [({"model": model}, stats) for model, stats in get_client_manager().stats().items()]
+        ),
+        render_stats(
+            "tashreef_retry_budget",
+            "LLM retry budget state.",
+            [({}, {"tokens": retry_budget.tokens, "spent": retry_budget.spent, "denied": retry_budget.denied})],
+            counters=("spent", "denied")
+        ),
+        render_stats(
+            "tashreef_render_cache",
+            "Pattern render cache state.",
+            [({}, get_render_cache().stats())],
+            counters=("memory_hits", "shared_hits", "misses", "evictions")
+        ),
+        render_stats(
+            "tashreef_shared_cache",
+            "Host-wide shared cache state for this worker.",
+            [({}, shared_cache.stats())] if shared_cache is not None else [],
+            counters=("hits", "misses", "writes", "evictions", "errors")
+        ),
+        render_stats(
+            "tashreef_artifact_store",
+            "Card artifact store state.",
+            [({}, get_artifact_store().stats())],
+            counters=("evictions",)
+        ),
+        render_stats(
+            "tashreef_prompt_prefix",
+            "Estimated size of each registered static prompt prefix.",
+            [
+                ({"prompt": name}, {"tokens": stats["tokens"], "chars": stats["chars"]})
+                for name, stats in get_prompt_registry().stats().items()
+            ]
+        ),
+        render_stats("tashreef_card_writer", "Card write-behind queue state.", [({}, get_card_writer().stats())]),
+        render_stats(
+            "tashreef_compression_cache",
+            "Precompressed response cache state.",
+            [({}, get_precompressed_cache().stats())],
+            counters=("hits", "misses")
+        ),
+    ])
+    return PlainTextResponse(body, media_type=PROMETHEUS_CONTENT_TYPE)
@@ -1,11 +1,25 @@
-from fastapi import APIRouter, Depends
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import FileResponse, JSONResponse, Response, StreamingResponse
+from pydantic_core import to_json
 from sqlalchemy.ext.asyncio import AsyncSession
-import uuid
-import json
-from app.config.db_config import get_db
+from typing import AsyncIterator, Optional
+from app.config.db_config import database_configured, get_db
 from app.service.pattern_service import PatternService
-from app.model.api_dto import TashreefPrompt
+from app.model.api_dto import (
+    TashreefPrompt, TashreefBatchPrompt, JobCreatedResponse, JobStatusResponse,
+    CardListItem, CardListResponse, CARD_LIST_DEFAULT_LIMIT, CARD_LIST_MAX_LIMIT
+)
+from app.model.prompt import EngineTypeEnum
+from app.service.job_service import get_job_service
+from app.service.render_cache import get_render_cache
+from app.service.artifact_store import get_artifact_store
+from app.middleware.compression import encoded_etag, supported_encodings
+from app.service.card_history_service import InvalidCursorError, get_card_history_service
+from app.inference.client_manager import InferenceOverloadedError
+from app.model.deadline import Deadline
+from app.engine.fractal_engine.models import BatchCardResponse
+from app.observability.timing import request_timing
+from app.observability.profiling import profile_request
 
 router = APIRouter(
     prefix="/pattern",  
@@ -14,10 +28,7 @@ router = APIRouter(
 pattern_service = PatternService()
 
 @router.post("/generate")
-async def generate_draft_card(
-    payload: TashreefPrompt,
-    dbConn: AsyncSession = Depends(get_db)
-):
+async def generate_draft_card(payload: TashreefPrompt):
     """
     Generate a complete draft e-invitation card with AI-powered geometric pattern and content.
     
@@ -29,13 +40,20 @@ async def generate_draft_card(
     
     Args:
         payload: TashreefPrompt containing the user's text description of the desired card
-        dbConn: Database session (injected dependency)
+    
+    No database session is held while the card is generated; the finished
+    card is persisted in the background by the write-behind card writer.
     
     Returns:
         CardResponse JSON containing:
         - card_svg: Complete SVG string for the final e-invitation card
         - pattern_config: L-System configuration used to generate the pattern
         - content_config: AI-generated content (titles, dates, venue) and color scheme
+        - degraded_stages: Stages that fell back to local defaults to meet the request deadline
+        - artifact_hash: Content hash of the stored card SVG (see GET /pattern/artifacts/{artifact_hash})
+    
+    The response carries a Server-Timing header with the duration of each
+    pipeline stage (routing, pattern_config, render, content, compose).
     
     Example Response:
         {
@@ -58,18 +76,302 @@ async def generate_draft_card(
                     "overlay_color": "#000000",
                     "overlay_opacity": 0.4
                 }
-            }
+            },
+            "degraded_stages": [],
+            "artifact_hash": "3f7a9c..."
         }
     """
     user_prompt = payload.text
-    card_response = await pattern_service.generate_pattern(user_prompt, dbConn)
-    card_response_json = card_response.model_dump_json(indent=2)
-    # Parse and return as JSON response
-    if card_response_json:
-        return JSONResponse(content=json.loads(card_response_json))
-    else:
-        return JSONResponse(
-            content={"error": "Failed to generate card"},
-            status_code=500
+    # Request time budget, propagated through every pipeline stage
+    deadline = Deadline()
+    with request_timing() as timing:
+        async with profile_request("generate", timing) as profile:
+            try:
+                card_response = await pattern_service.generate_pattern(user_prompt, deadline)
+            except InferenceOverloadedError:
+                return JSONResponse(
+                    content={"error": "Inference service is busy, please retry shortly"},
+                    status_code=503,
+                    headers={"Retry-After": "5", "Server-Timing": timing.server_timing_header()}
+                )
+            profile.record_card(user_prompt, card_response)
+    # Serialize once, straight to bytes: the card SVG can be several megabytes
+    return Response(
+        content=to_json(card_response),
+        media_type="application/json",
+        headers={"Server-Timing": timing.server_timing_header()}
+    )
+
+
+@router.post("/generate-batch", response_model=BatchCardResponse)
+async def generate_draft_card_batch(payload: TashreefBatchPrompt):
+    """
+    Generate several distinct draft cards for one prompt in a single request.
+    
+    The engine is classified once, the invitation content is generated once,
+    and all pattern variants come from a single structured AI call. The
+    patterns are rendered in parallel and each is composed into its own card.
+    
+    Args:
+        payload: TashreefBatchPrompt with the user's description and the number
+            of variants to generate (`count`, capped by BATCH_MAX_VARIANTS)
+    
+    Returns:
+        BatchCardResponse JSON with a `cards` list of CardResponse objects. It may
+        hold fewer than `count` cards if the AI repeated a variant or a render failed.
+    """
+    deadline = Deadline()
+    with request_timing() as timing:
+        try:
+            cards = await pattern_service.generate_batch(payload.text, payload.count, deadline)
+        except InferenceOverloadedError:
+            return JSONResponse(
+                content={"error": "Inference service is busy, please retry shortly"},
+                status_code=503,
+                headers={"Retry-After": "5", "Server-Timing": timing.server_timing_header()}
+            )
+    return Response(
+        content=to_json(BatchCardResponse(cards=cards)),
+        media_type="application/json",
+        headers={"Server-Timing": timing.server_timing_header()}
+    )
+
+
+def _format_sse(event: str, data: dict) -> str:
+    """Formats one Server-Sent Events message."""
+    return f"event: {event}\ndata: {to_json(data).decode()}\n\n"
+
+
+@router.post("/generate/stream")
+async def stream_draft_card(payload: TashreefPrompt):
+    """
+    Streaming variant of /generate using Server-Sent Events.
+    
+    Emits each stage's result as soon as it is ready so the client can paint
+    the background pattern before the text content arrives:
+    1. `engine`: the selected engine type
+    2. `pattern`: the pattern SVG fragment and the engine configuration
+    3. `content`: the AI-generated content and color scheme
+    4. `card`: the final composed card (same shape as the /generate response)
+    
+    If generation fails, an `error` event with a message is sent instead and
+    the stream ends.
+    
+    Args:
+        payload: TashreefPrompt containing the user's text description of the desired card
+    """
+    user_prompt = payload.text
+    deadline = Deadline()
+
+    async def event_stream():
+        try:
+            async for event, data in pattern_service.stream_pattern(user_prompt, deadline):
+                yield _format_sse(event, data)
+        except InferenceOverloadedError:
+            yield _format_sse("error", {"error": "Inference service is busy, please retry shortly"})
+        except Exception as e:
+            yield _format_sse("error", {"error": f"Failed to generate card: {str(e)}"})
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+async def get_jobs_db() -> AsyncIterator[AsyncSession]:
+    """
+    Database session for the jobs endpoints.
+
+    Raises:
+        HTTPException: 503 if no database is configured, since jobs live there
+    """
+    if not database_configured():
+        raise HTTPException(status_code=503, detail="Generation jobs are unavailable: no database is configured")
+    async for session in get_db():
+        yield session
+
+
+@router.post("/jobs", status_code=202, response_model=JobCreatedResponse)
+async def create_generation_job(
+    payload: TashreefPrompt,
+    dbConn: AsyncSession = Depends(get_jobs_db)
+):
+    """
+    Enqueue a card generation and return immediately with a job id.
+    
+    The job is persisted and processed by background workers; poll
+    GET /pattern/jobs/{job_id} for its status and result.
+    
+    Args:
+        payload: TashreefPrompt containing the user's text description of the desired card
+        dbConn: Database session (injected dependency)
+    
+    Returns 503 while the job workers are not running (no database, or it has
+    not been reachable since startup), rather than queueing work nobody runs.
+    """
+    job_service = get_job_service()
+    if not job_service.running:
+        raise HTTPException(
+            status_code=503,
+            detail="Generation jobs are unavailable: job workers are not running",
+            headers={"Retry-After": "5"}
         )
+    job = await job_service.enqueue(payload.text, dbConn)
+    return JobCreatedResponse(job_id=job.id, status=job.status)
 
+
+@router.get("/jobs/{job_id}", response_model=JobStatusResponse)
+async def get_generation_job(
+    job_id: str,
+    dbConn: AsyncSession = Depends(get_jobs_db)
+):
+    """
+    Return the status of a generation job, and the CardResponse once it has succeeded.
+    
+    Args:
+        job_id: The id returned by POST /pattern/jobs
+        dbConn: Database session (injected dependency)
+    """
+    job = await get_job_service().get_job(job_id, dbConn)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return JobStatusResponse(
+        job_id=job.id,
+        status=job.status,
+        attempts=job.attempts,
+        created_at=job.created_at,
+        finished_at=job.finished_at,
+        result=job.result,
+        error=job.error
+    )
+
+
+@router.get("/artifacts/{artifact_hash}")
+async def get_card_artifact(artifact_hash: str, request: Request):
+    """
+    Serve a stored card SVG by its content hash.
+    
+    Artifacts are immutable, so the hash is a strong ETag and responses may be
+    cached indefinitely. Compressed responses carry a per-encoding ETag (see
+    CompressionMiddleware), and either form in If-None-Match returns 304
+    without touching the file; otherwise the file is streamed straight from disk.
+    
+    Args:
+        artifact_hash: The artifact_hash from a CardResponse
+    """
+    path = await get_artifact_store().get_path(artifact_hash)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Artifact not found")
+
+    etag = f'"{artifact_hash}"'
+    headers = {"ETag": etag, "Cache-Control": "public, max-age=31536000, immutable"}
+    if_none_match = request.headers.get("if-none-match", "")
+    if if_none_match.strip() == "*":
+        return Response(status_code=304, headers=headers)
+    # The identity tag or the tag of any encoding the client may have cached
+    representation_tags = {etag, *(encoded_etag(etag, encoding) for encoding in supported_encodings())}
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag in representation_tags:
+            return Response(status_code=304, headers={**headers, "ETag": tag})
+    return FileResponse(path, media_type="image/svg+xml", headers=headers)
+
+
+async def _card_list_response(request: Request, rows: list, next_cursor) -> CardListResponse:
+    """
+    Builds a listing page, pointing each row at its artifact. Rows whose
+    artifact has since been evicted from the store get no URL instead of one
+    that would return 404.
+    """
+    stored = await get_artifact_store().existing(row["artifact_hash"] for row in rows if row["artifact_hash"])
+    items = [
+        CardListItem(
+            **row,
+            artifact_url=(
+                str(request.url_for("get_card_artifact", artifact_hash=row["artifact_hash"]))
+                if row["artifact_hash"] in stored else None
+            )
+        )
+        for row in rows
+    ]
+    return CardListResponse(items=items, next_cursor=next_cursor)
+
+
+@router.get("/history", response_model=CardListResponse, response_model_exclude_none=True)
+async def list_card_history(
+    request: Request,
+    limit: int = Query(CARD_LIST_DEFAULT_LIMIT, ge=1, le=CARD_LIST_MAX_LIMIT),
+    cursor: Optional[str] = None,
+    engine_type: Optional[EngineTypeEnum] = None,
+    dbConn: AsyncSession = Depends(get_db)
+):
+    """
+    List recently generated cards, newest first, with their prompts.
+    
+    Rows are lightweight: the URL of the stored card SVG (absent once it has
+    been evicted) and a config summary instead of the SVG and full configs.
+    Pages are keyset-paginated: pass the returned next_cursor as `cursor` to
+    fetch the next page; it is absent on the last page.
+    
+    Args:
+        limit: Page size
+        cursor: next_cursor from the previous page
+        engine_type: Only list cards rendered by this engine
+        dbConn: Database session (injected dependency)
+    """
+    try:
+        rows, next_cursor = await get_card_history_service().list_history(
+            dbConn, limit, cursor, engine_type.value if engine_type else None
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return await _card_list_response(request, rows, next_cursor)
+
+
+@router.get("/gallery", response_model=CardListResponse, response_model_exclude_none=True)
+async def list_card_gallery(
+    request: Request,
+    limit: int = Query(CARD_LIST_DEFAULT_LIMIT, ge=1, le=CARD_LIST_MAX_LIMIT),
+    cursor: Optional[str] = None,
+    engine_type: Optional[EngineTypeEnum] = None,
+    like: Optional[str] = Query(None, description="Card id: list designs like this one"),
+    dbConn: AsyncSession = Depends(get_db)
+):
+    """
+    List designs with a stored card SVG, newest first, without prompts.
+    
+    With `like`, lists "designs like this": other cards rendered by the same
+    engine as the given card. Paginated like /pattern/history.
+    
+    Args:
+        limit: Page size
+        cursor: next_cursor from the previous page
+        engine_type: Only list designs rendered by this engine
+        like: Id of a card to find similar designs for
+        dbConn: Database session (injected dependency)
+    """
+    history_service = get_card_history_service()
+    engine_filter = engine_type.value if engine_type else None
+    if like is not None:
+        engine_filter = await history_service.get_engine_type(dbConn, like)
+        if engine_filter is None:
+            raise HTTPException(status_code=404, detail="Card not found")
+    try:
+        rows, next_cursor = await history_service.list_gallery(
+            dbConn, limit, cursor, engine_filter, exclude_id=like
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return await _card_list_response(request, rows, next_cursor)
+
+
+@router.get("/render-cache/stats")
+async def get_render_cache_stats():
+    """
+    Return the pattern render cache counters for this worker process.
+    
+    Includes memory and shared-tier hits, misses, the hit ratio, LRU
+    evictions and the current size of the in-memory tier.
+    """
+    return get_render_cache().stats()
@@ -1 +1,8 @@
-from .pattern_service import *
\ No newline at end of file
+from .pattern_service import *
+from .job_service import JobService, get_job_service
+from .render_pool import RenderPool, get_render_pool
+from .render_cache import RenderCache, canonical_config_hash, get_render_cache
+from .artifact_store import ArtifactStore, get_artifact_store
+from .startup_service import StartupService, get_startup_service
+from .card_writer import CardWriter, get_card_writer
+from .card_history_service import CardHistoryService, InvalidCursorError, get_card_history_service
@@ -0,0 +1,193 @@
+"""
+Content-addressed store for composed card SVGs.
+
+Each card is written once under the sha256 of its bytes, so identical outputs
+share a single file and the hash doubles as a strong ETag. Writes happen in a
+worker thread and are atomic (temp file + rename), so concurrent requests
+never block the event loop or clobber each other.
+
+The store is bounded by total size: when it grows past ARTIFACT_STORE_MAX_BYTES
+the least recently written or served artifacts are deleted until it is back
+under ARTIFACT_STORE_LOW_WATER of the limit. The recency index is per process
+and rebuilt from file modification times on first use, so several workers can
+share one directory; each simply enforces the bound with its own view.
+"""
+
+import asyncio
+import hashlib
+import os
+import re
+import time
+import uuid
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Set
+
+from app.observability.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+# Directory holding the artifacts (created on first write)
+ARTIFACT_STORE_DIR = os.getenv("ARTIFACT_STORE_DIR", ".cache/artifacts")
+# Total size of stored artifacts before the oldest are evicted
+ARTIFACT_STORE_MAX_BYTES = int(os.getenv("ARTIFACT_STORE_MAX_BYTES", str(512 * 1024 * 1024)))
+# Fraction of the limit eviction brings the store back down to
+ARTIFACT_STORE_LOW_WATER = float(os.getenv("ARTIFACT_STORE_LOW_WATER", "0.9"))
+
+_ARTIFACT_HASH_RE = re.compile(r"^[0-9a-f]{64}$")
+
+
+class ArtifactStore:
+    """
+    Size-bounded, content-addressed store of card SVG files.
+
+    Args:
+        root: Directory to store artifacts in
+        max_bytes: Total size at which the least recently used artifacts are evicted
+    """
+
+    def __init__(self, root: str = ARTIFACT_STORE_DIR, max_bytes: int = ARTIFACT_STORE_MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        # Artifact hash -> size in bytes, least recently used first
+        self._index: "OrderedDict[str, int]" = OrderedDict()
+        self._total_bytes = 0
+        self._loaded = False
+        self._lock = asyncio.Lock()
+        self.evictions = 0
+
+    @staticmethod
+    def is_valid_hash(artifact_hash: str) -> bool:
+        return bool(_ARTIFACT_HASH_RE.match(artifact_hash))
+
+    def _path(self, artifact_hash: str) -> str:
+        return os.path.join(self.root, artifact_hash[:2], f"{artifact_hash}.svg")
+
+    async def put(self, svg: str) -> str:
+        """Stores an SVG (once per distinct content) and returns its hash."""
+        data = svg.encode("utf-8")
+        artifact_hash = hashlib.sha256(data).hexdigest()
+        path = self._path(artifact_hash)
+
+        await self._load_index()
+        if artifact_hash in self._index:
+            self._index.move_to_end(artifact_hash)
+            # Another worker sharing the directory may have evicted the file
+            if await asyncio.to_thread(self._touch, path):
+                return artifact_hash
+
+        await asyncio.to_thread(self._write_file, path, data)
+        # Index updates happen between awaits, so they need no lock
+        if artifact_hash not in self._index:
+            self._index[artifact_hash] = len(data)
+            self._total_bytes += len(data)
+        if self._total_bytes > self.max_bytes:
+            await self._evict()
+        return artifact_hash
+
+    async def get_path(self, artifact_hash: str) -> Optional[str]:
+        """Returns the file path of a stored artifact, or None if it does not exist."""
+        if not self.is_valid_hash(artifact_hash):
+            return None
+        path = self._path(artifact_hash)
+        if not await asyncio.to_thread(os.path.isfile, path):
+            return None
+        if artifact_hash in self._index:
+            self._index.move_to_end(artifact_hash)
+        return path
+
+    async def existing(self, artifact_hashes: Iterable[str]) -> Set[str]:
+        """Returns which of the given hashes are still stored (not evicted), in one file-system pass."""
+        candidates = [artifact_hash for artifact_hash in set(artifact_hashes) if self.is_valid_hash(artifact_hash)]
+        if not candidates:
+            return set()
+        present = await asyncio.to_thread(
+            lambda: [artifact_hash for artifact_hash in candidates if os.path.isfile(self._path(artifact_hash))]
+        )
+        return set(present)
+
+    async def _load_index(self) -> None:
+        if self._loaded:
+            return
+        async with self._lock:
+            if self._loaded:
+                return
+            entries = await asyncio.to_thread(self._scan)
+            for artifact_hash, size in entries:
+                if artifact_hash not in self._index:
+                    self._index[artifact_hash] = size
+                    self._total_bytes += size
+            self._loaded = True
+
+    def _scan(self):
+        """Lists (hash, size) for existing artifacts, oldest modification first."""
+        entries = []
+        if not os.path.isdir(self.root):
+            return entries
+        for directory, _, filenames in os.walk(self.root):
+            for filename in filenames:
+                artifact_hash, extension = os.path.splitext(filename)
+                if extension != ".svg" or not self.is_valid_hash(artifact_hash):
+                    continue
+                stat = os.stat(os.path.join(directory, filename))
+                entries.append((stat.st_mtime, artifact_hash, stat.st_size))
+        entries.sort()
+        return [(artifact_hash, size) for _, artifact_hash, size in entries]
+
+    async def _evict(self) -> None:
+        """Deletes least recently used artifacts until under the low-water mark."""
+        target = self.max_bytes * ARTIFACT_STORE_LOW_WATER
+        victims = []
+        while self._total_bytes > target and len(self._index) > 1:
+            artifact_hash, size = self._index.popitem(last=False)
+            self._total_bytes -= size
+            victims.append(self._path(artifact_hash))
+        self.evictions += len(victims)
+        await asyncio.to_thread(self._remove_files, victims)
+        logger.info("Evicted %d artifacts, %d bytes stored", len(victims), self._total_bytes)
+
+    @staticmethod
+    def _write_file(path: str, data: bytes) -> None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, path)
+
+    @staticmethod
+    def _touch(path: str) -> bool:
+        """Marks an artifact as recently used; returns False if its file is gone."""
+        # Modification times keep the recency order for the next index rebuild
+        try:
+            now = time.time()
+            os.utime(path, (now, now))
+            return True
+        except FileNotFoundError:
+            return False
+
+    @staticmethod
+    def _remove_files(paths) -> None:
+        for path in paths:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "artifacts": len(self._index),
+            "bytes": self._total_bytes,
+            "max_bytes": self.max_bytes,
+            "evictions": self.evictions,
+        }
+
+
+_artifact_store: Optional[ArtifactStore] = None
+
+
+def get_artifact_store() -> ArtifactStore:
+    """Returns the process-wide ArtifactStore."""
+    global _artifact_store
+    if _artifact_store is None:
+        _artifact_store = ArtifactStore()
+    return _artifact_store
@@ -0,0 +1,171 @@
+"""
+Card history and gallery listings.
+
+Lists the cards persisted by the CardWriter newest first, using keyset
+(cursor) pagination: each page continues strictly after the (created_at, id)
+of the last row of the previous page. Unlike OFFSET, the cost of a page does
+not grow with how deep into the history it is, and rows inserted while a
+client pages through do not shift or repeat items.
+
+Listings select only the narrow columns (id, timestamps, engine, artifact
+hash and the precomputed summary), never the configs or the SVG.
+"""
+
+import base64
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.engine.fractal_engine.models import CardResponse
+from app.model.card_record import CardRecord
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor cannot be decoded."""
+
+
+def summarize_card(card_response: CardResponse) -> Dict[str, Any]:
+    """
+    Builds the listing summary stored with a card: the event title, text and
+    overlay colors, and the pattern's scalar parameters (rules, point lists
+    and palettes are left out to keep listing rows small).
+    """
+    pattern = card_response.pattern_config.model_dump(mode="json")
+    content = card_response.content_config
+    return {
+        "title": content.event_title,
+        "colors": {
+            "text": content.color_scheme.primary_text_color,
+            "overlay": content.color_scheme.overlay_color,
+            "stroke": pattern.get("style", {}).get("stroke"),
+        },
+        "parameters": {
+            name: value
+            for name, value in pattern.get("parameters", {}).items()
+            if isinstance(value, (str, int, float, bool))
+        },
+    }
+
+
+def encode_cursor(created_at: datetime, card_id: str) -> str:
+    """Encodes the position after a listing row as an opaque URL-safe cursor."""
+    raw = json.dumps([created_at.isoformat(), card_id], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """
+    Decodes a cursor produced by encode_cursor.
+
+    Raises:
+        InvalidCursorError: If the cursor is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, card_id = json.loads(raw)
+        return datetime.fromisoformat(created_at), str(card_id)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursorError("Invalid pagination cursor") from e
+
+
+class CardHistoryService:
+    """Keyset-paginated listings of stored cards."""
+
+    # Narrow column set read for every listing row
+    LIST_COLUMNS = (
+        CardRecord.id,
+        CardRecord.created_at,
+        CardRecord.engine_type,
+        CardRecord.artifact_hash,
+        CardRecord.summary,
+    )
+
+    async def list_history(
+        self,
+        db: AsyncSession,
+        limit: int,
+        cursor: Optional[str] = None,
+        engine_type: Optional[str] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Returns one page of recent cards, newest first, including their prompts.
+
+        Args:
+            db: Database session
+            limit: Maximum number of rows to return
+            cursor: next_cursor from the previous page
+            engine_type: Only list cards rendered by this engine
+
+        Returns:
+            The rows and the cursor of the next page (None on the last page)
+
+        Raises:
+            InvalidCursorError: If the cursor is malformed
+        """
+        query = select(*self.LIST_COLUMNS, CardRecord.prompt)
+        if engine_type is not None:
+            query = query.where(CardRecord.engine_type == engine_type)
+        return await self._page(db, query, limit, cursor)
+
+    async def list_gallery(
+        self,
+        db: AsyncSession,
+        limit: int,
+        cursor: Optional[str] = None,
+        engine_type: Optional[str] = None,
+        exclude_id: Optional[str] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Returns one page of designs with a stored SVG, newest first. Prompts
+        are not included, since gallery pages are meant to be shared.
+
+        Args:
+            db: Database session
+            limit: Maximum number of rows to return
+            cursor: next_cursor from the previous page
+            engine_type: Only list designs rendered by this engine
+            exclude_id: Leave this card out (the reference of a "like this" listing)
+
+        Raises:
+            InvalidCursorError: If the cursor is malformed
+        """
+        query = select(*self.LIST_COLUMNS).where(CardRecord.artifact_hash.is_not(None))
+        if engine_type is not None:
+            query = query.where(CardRecord.engine_type == engine_type)
+        if exclude_id is not None:
+            query = query.where(CardRecord.id != exclude_id)
+        return await self._page(db, query, limit, cursor)
+
+    async def get_engine_type(self, db: AsyncSession, card_id: str) -> Optional[str]:
+        """Returns the engine type of a stored card, or None if it does not exist."""
+        result = await db.execute(select(CardRecord.engine_type).where(CardRecord.id == card_id))
+        return result.scalar_one_or_none()
+
+    async def _page(self, db: AsyncSession, query, limit: int, cursor: Optional[str]):
+        if cursor:
+            created_at, card_id = decode_cursor(cursor)
+            # Row-value comparison matches the (created_at, id) index order exactly
+            query = query.where(tuple_(CardRecord.created_at, CardRecord.id) < tuple_(created_at, card_id))
+        # One extra row tells whether another page exists without a COUNT
+        query = query.order_by(CardRecord.created_at.desc(), CardRecord.id.desc()).limit(limit + 1)
+        rows = [dict(row._mapping) for row in (await db.execute(query)).all()]
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1]["created_at"], rows[-1]["id"])
+        return rows, next_cursor
+
+
+_card_history_service: Optional[CardHistoryService] = None
+
+
+def get_card_history_service() -> CardHistoryService:
+    """Returns the process-wide CardHistoryService."""
+    global _card_history_service
+    if _card_history_service is None:
+        _card_history_service = CardHistoryService()
+    return _card_history_service
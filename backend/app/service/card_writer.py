@@ -0,0 +1,180 @@
+"""
+Write-behind persistence of generated cards.
+
+The request path hands each finished card to CardWriter.enqueue, which only
+appends it to an in-memory queue. A background task drains the queue and
+inserts the cards in batches, one transaction and one multi-row INSERT per
+batch, so a generation never waits on the database and a burst of requests
+costs a handful of round trips instead of one per card.
+
+The queue is bounded: when the database falls behind, new cards are dropped
+(and counted) rather than growing memory without limit. Cards still queued at
+shutdown are flushed before the process exits.
+"""
+
+import asyncio
+import os
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import insert
+
+from app.config.db_config import AsyncSessionLocal, database_configured
+from app.engine.fractal_engine.models import CardResponse
+from app.model.card_record import CardRecord
+from app.service.card_history_service import summarize_card
+from app.observability.logging import get_logger, request_id_var
+from app.observability.metrics import CARD_WRITES
+from app.observability.timing import current_timing
+
+logger = get_logger(__name__)
+
+
+# Maximum number of cards waiting to be written before new ones are dropped
+CARD_WRITE_QUEUE_SIZE = int(os.getenv("CARD_WRITE_QUEUE_SIZE", "1000"))
+# Maximum number of cards inserted in one transaction
+CARD_WRITE_BATCH_SIZE = int(os.getenv("CARD_WRITE_BATCH_SIZE", "50"))
+# How long the writer waits to fill a batch once it has at least one card
+CARD_WRITE_FLUSH_SECONDS = float(os.getenv("CARD_WRITE_FLUSH_SECONDS", "0.5"))
+
+
+class CardWriter:
+    """
+    Batches generated cards into background database inserts.
+
+    Args:
+        queue_size: Maximum number of queued cards
+        batch_size: Maximum number of cards per insert
+        flush_interval: Seconds to wait for a batch to fill before writing it
+    """
+
+    def __init__(
+        self,
+        queue_size: int = CARD_WRITE_QUEUE_SIZE,
+        batch_size: int = CARD_WRITE_BATCH_SIZE,
+        flush_interval: float = CARD_WRITE_FLUSH_SECONDS
+    ):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self._task: Optional[asyncio.Task] = None
+        # True while the writer is waiting for the first card of a batch, the
+        # only point where it can be cancelled without losing a batch
+        self._idle = True
+        self._closing = False
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def enqueue(self, user_prompt: str, card_response: CardResponse, source: str) -> None:
+        """
+        Queues a generated card for persistence without waiting on the database.
+
+        Does nothing while the writer is not running (no database configured,
+        or it was unreachable at startup).
+
+        Args:
+            user_prompt: The prompt the card was generated from
+            card_response: The generated card
+            source: The endpoint that produced it (generate, batch, stream or job)
+        """
+        if not self.running:
+            return
+        timing = current_timing()
+        pattern_config = card_response.pattern_config.model_dump(mode="json")
+        row = {
+            "prompt": user_prompt,
+            "engine_type": pattern_config["engine_type"],
+            "source": source,
+            "request_id": request_id_var.get(),
+            "pattern_config": pattern_config,
+            "content_config": card_response.content_config.model_dump(mode="json"),
+            "artifact_hash": card_response.artifact_hash,
+            "degraded_stages": list(card_response.degraded_stages),
+            "timings": timing.stage_milliseconds() if timing is not None else {},
+            "summary": summarize_card(card_response),
+            # Stamped now rather than at insert, so listings follow generation order
+            "created_at": datetime.now(timezone.utc),
+        }
+        try:
+            self._queue.put_nowait(row)
+        except asyncio.QueueFull:
+            CARD_WRITES.inc(outcome="dropped")
+            logger.warning("Card write queue is full, dropping card record")
+
+    def start(self) -> None:
+        """Starts the background writer on the running event loop."""
+        if self.running or not database_configured():
+            return
+        logger.info("Starting card writer (batches of up to %d)", self.batch_size)
+        self._closing = False
+        self._task = asyncio.create_task(self._run(), name="card-writer")
+
+    async def stop(self) -> None:
+        """Stops the writer after flushing every queued card."""
+        if self._task is None:
+            return
+        task, self._task = self._task, None
+        self._closing = True
+        if self._idle:
+            task.cancel()
+        # A batch being filled or written is finished by the task itself
+        await asyncio.gather(task, return_exceptions=True)
+        while not self._queue.empty():
+            await self._write(self._next_batch_nowait())
+
+    async def _run(self) -> None:
+        while not self._closing:
+            self._idle = True
+            batch = [await self._queue.get()]
+            self._idle = False
+
+            # Give concurrent requests a moment to add to the batch
+            loop = asyncio.get_running_loop()
+            flush_at = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = flush_at - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+                except asyncio.TimeoutError:
+                    break
+            await self._write(batch)
+
+    def _next_batch_nowait(self) -> List[Dict[str, Any]]:
+        batch = []
+        while len(batch) < self.batch_size and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        return batch
+
+    async def _write(self, batch: List[Dict[str, Any]]) -> None:
+        """Inserts one batch in a single transaction; a failed batch is logged and dropped."""
+        if not batch:
+            return
+        try:
+            async with AsyncSessionLocal() as session:
+                async with session.begin():
+                    await session.execute(insert(CardRecord), batch)
+        except Exception as e:
+            CARD_WRITES.inc(len(batch), outcome="failed")
+            logger.error("Failed to write %d card records: %s", len(batch), e)
+            return
+        CARD_WRITES.inc(len(batch), outcome="written")
+        logger.debug("Wrote %d card records", len(batch))
+
+    def stats(self) -> Dict[str, int]:
+        """Returns the current queue depth and capacity."""
+        return {"queue_depth": self._queue.qsize(), "queue_capacity": self._queue.maxsize}
+
+
+_card_writer: Optional[CardWriter] = None
+
+
+def get_card_writer() -> CardWriter:
+    """Returns the process-wide CardWriter."""
+    global _card_writer
+    if _card_writer is None:
+        _card_writer = CardWriter()
+    return _card_writer
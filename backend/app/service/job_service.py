@@ -0,0 +1,263 @@
+"""
+Asynchronous card generation jobs.
+
+Generation requests submitted to /pattern/jobs are persisted as GenerationJob
+rows and processed by a pool of background workers, so the HTTP request
+returns immediately instead of holding a connection and worker slot for the
+whole pipeline. Workers claim jobs with a lease; a job whose lease expires
+(for example because the process restarted mid-generation) is claimed again,
+up to a maximum number of attempts. A job that fails for a transient reason
+(the model is overloaded or the job ran out of time) is queued again under
+the same cap, with an exponential, jittered delay before it may be claimed
+so a struggling model is not hit again straight away; any other error fails
+it right away.
+"""
+
+import asyncio
+import os
+import random
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config.db_config import AsyncSessionLocal
+from app.inference.client_manager import InferenceOverloadedError
+from app.model.deadline import Deadline, DeadlineExceededError
+from app.model.generation_job import GenerationJob, JobStatusEnum
+from app.service.pattern_service import PatternService
+from app.observability.logging import get_logger, request_id_var
+
+logger = get_logger(__name__)
+
+
+# Number of concurrent job workers per process (0 disables background processing)
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+# How long a claimed job is owned by a worker before another worker may retry it
+JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "180"))
+# Time budget for a single job; jobs are not bound by the gateway timeout
+JOB_DEADLINE_SECONDS = float(os.getenv("JOB_DEADLINE_SECONDS", "120"))
+# Maximum number of times a job is attempted before it is marked failed
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+# How often idle workers poll the database for work enqueued elsewhere
+JOB_POLL_INTERVAL_SECONDS = float(os.getenv("JOB_POLL_INTERVAL_SECONDS", "2"))
+# Base delay before a requeued job may run again; doubles with every attempt
+JOB_RETRY_BACKOFF_SECONDS = float(os.getenv("JOB_RETRY_BACKOFF_SECONDS", "2"))
+
+# Errors after which a job is queued again instead of failed
+TRANSIENT_JOB_ERRORS = (InferenceOverloadedError, DeadlineExceededError)
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _retry_delay(attempts: int) -> float:
+    """Seconds a job waits before its next attempt, with jitter so requeued jobs spread out."""
+    delay = JOB_RETRY_BACKOFF_SECONDS * 2 ** attempts
+    return random.uniform(delay / 2, delay)
+
+
+class JobService:
+    """
+    Enqueues generation jobs and runs the workers that process them.
+
+    Args:
+        pattern_service: Service used to run the generation pipeline
+        concurrency: Number of worker tasks to run in this process
+    """
+
+    def __init__(self, pattern_service: Optional[PatternService] = None, concurrency: int = JOB_WORKERS):
+        self.pattern_service = pattern_service or PatternService()
+        self.concurrency = concurrency
+        self._wakeup = asyncio.Event()
+        self._workers: List[asyncio.Task] = []
+
+    async def enqueue(self, user_prompt: str, db: AsyncSession) -> GenerationJob:
+        """Persists a new queued job and wakes an idle worker."""
+        job = GenerationJob(prompt=user_prompt, status=JobStatusEnum.queued.value)
+        db.add(job)
+        await db.commit()
+        logger.info("Enqueued job %s", job.id)
+        self._wakeup.set()
+        return job
+
+    async def get_job(self, job_id: str, db: AsyncSession) -> Optional[GenerationJob]:
+        return await db.get(GenerationJob, job_id)
+
+    @property
+    def running(self) -> bool:
+        """True once the worker tasks have been started in this process."""
+        return bool(self._workers)
+
+    def start(self) -> None:
+        """Starts the worker tasks on the running event loop."""
+        if self._workers or self.concurrency <= 0:
+            return
+        logger.info("Starting %d job workers", self.concurrency)
+        self._workers = [
+            asyncio.create_task(self._worker_loop(index), name=f"job-worker-{index}")
+            for index in range(self.concurrency)
+        ]
+
+    async def stop(self) -> None:
+        """Cancels the worker tasks; jobs they were running are retried after their lease expires."""
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def _worker_loop(self, index: int) -> None:
+        while True:
+            try:
+                job_id = await self._claim_next_job()
+            except Exception as e:
+                logger.error("Worker %d failed to claim a job: %s", index, e)
+                job_id = None
+
+            if job_id is None:
+                # Idle: wait for a local enqueue or poll again for work from other processes
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=JOB_POLL_INTERVAL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            try:
+                await self._run_job(job_id)
+            except Exception:
+                # Keep the worker alive; the job is retried once its lease expires
+                logger.exception("Worker %d failed to run job %s", index, job_id)
+
+    async def _claim_next_job(self) -> Optional[str]:
+        """Atomically claims the oldest due queued (or lease-expired) job, returning its id."""
+        now = _utcnow()
+        claimable = or_(
+            # A requeued job keeps its not-before time in lease_expires_at
+            and_(
+                GenerationJob.status == JobStatusEnum.queued.value,
+                or_(GenerationJob.lease_expires_at.is_(None), GenerationJob.lease_expires_at <= now)
+            ),
+            and_(
+                GenerationJob.status == JobStatusEnum.running.value,
+                GenerationJob.lease_expires_at < now
+            )
+        )
+        async with AsyncSessionLocal() as session:
+            async with session.begin():
+                result = await session.execute(
+                    select(GenerationJob.id, GenerationJob.attempts)
+                    .where(claimable)
+                    .order_by(GenerationJob.created_at)
+                    .limit(1)
+                    .with_for_update(skip_locked=True)
+                )
+                candidate = result.first()
+                if candidate is None:
+                    return None
+                job_id, attempts = candidate
+
+                if attempts >= JOB_MAX_ATTEMPTS:
+                    await session.execute(
+                        update(GenerationJob)
+                        .where(GenerationJob.id == job_id, claimable)
+                        .values(
+                            status=JobStatusEnum.failed.value,
+                            error="Job exceeded its maximum number of attempts",
+                            finished_at=now
+                        )
+                    )
+                    return None
+
+                # Compare-and-set so two workers can never claim the same job,
+                # even on databases without SKIP LOCKED support
+                claimed = await session.execute(
+                    update(GenerationJob)
+                    .where(GenerationJob.id == job_id, claimable)
+                    .values(
+                        status=JobStatusEnum.running.value,
+                        attempts=GenerationJob.attempts + 1,
+                        lease_expires_at=now + timedelta(seconds=JOB_LEASE_SECONDS)
+                    )
+                )
+                return job_id if claimed.rowcount == 1 else None
+
+    async def _run_job(self, job_id: str) -> None:
+        # Tag every log line emitted while the job runs with its id
+        token = request_id_var.set(job_id)
+        try:
+            await self._run_claimed_job(job_id)
+        finally:
+            request_id_var.reset(token)
+
+    async def _run_claimed_job(self, job_id: str) -> None:
+        # Sessions are opened only around the reads and writes, so no pooled
+        # connection is held while the (much longer) generation runs
+        async with AsyncSessionLocal() as session:
+            job = await session.get(GenerationJob, job_id)
+            if job is None:
+                logger.warning("Claimed job %s no longer exists, skipping it", job_id)
+                return
+            prompt, attempts = job.prompt, job.attempts
+        logger.info("Running job %s (attempt %d)", job_id, attempts)
+
+        values = {"lease_expires_at": None}
+        try:
+            card_response = await self.pattern_service.generate_pattern(
+                prompt, Deadline(JOB_DEADLINE_SECONDS), source="job"
+            )
+            values.update(
+                status=JobStatusEnum.succeeded.value,
+                result=card_response.model_dump(mode="json"),
+                error=None
+            )
+            logger.info("Job %s succeeded", job_id)
+        except asyncio.CancelledError:
+            # Shutting down: leave the job running so it is retried once its lease expires
+            raise
+        except TRANSIENT_JOB_ERRORS as e:
+            if attempts < JOB_MAX_ATTEMPTS:
+                delay = _retry_delay(attempts)
+                values.update(
+                    status=JobStatusEnum.queued.value,
+                    error=str(e),
+                    lease_expires_at=_utcnow() + timedelta(seconds=delay)
+                )
+                logger.warning("Job %s hit a transient error, requeueing it in %.1fs: %s", job_id, delay, e)
+            else:
+                values.update(status=JobStatusEnum.failed.value, error=str(e))
+                logger.warning("Job %s failed after %d attempts: %s", job_id, attempts, e)
+        except Exception as e:
+            values.update(status=JobStatusEnum.failed.value, error=str(e))
+            logger.warning("Job %s failed: %s", job_id, e)
+        if values["status"] != JobStatusEnum.queued.value:
+            values["finished_at"] = _utcnow()
+
+        # Only write if this worker still owns the job: if the lease expired
+        # mid-run, another worker has claimed it and its attempt now decides
+        async with AsyncSessionLocal() as session:
+            async with session.begin():
+                written = await session.execute(
+                    update(GenerationJob)
+                    .where(
+                        GenerationJob.id == job_id,
+                        GenerationJob.status == JobStatusEnum.running.value,
+                        GenerationJob.attempts == attempts
+                    )
+                    .values(**values)
+                )
+        if written.rowcount == 0:
+            logger.warning("Job %s was reclaimed after its lease expired, discarding attempt %d", job_id, attempts)
+
+
+_job_service: Optional[JobService] = None
+
+
+def get_job_service() -> JobService:
+    """Returns the process-wide JobService."""
+    global _job_service
+    if _job_service is None:
+        _job_service = JobService()
+    return _job_service
@@ -1,98 +1,361 @@
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from pydantic import Field, create_model
+from functools import lru_cache
+import asyncio
 import uuid
-from app.inference.inference_service import InferenceService
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from app.inference.inference_service import get_inference_service
+from app.inference.client_manager import InferenceOverloadedError
 from app.inference.engine_router import classify_engine
-from app.prompt.prompt_builder import build_engine_prompt
+from app.prompt.prompt_builder import build_batch_prompt, build_engine_prompt
 from app.model.prompt import EngineTypeEnum
+from app.model.deadline import Deadline, DeadlineExceededError
 from app.engine.fractal_engine.models import *
-from app.engine.fractal_engine.processor import process_fractal_request
-from app.engine.parametric_engine.models import ParametricConfig
-from app.engine.parametric_engine.processor import process_parametric_request
-from app.engine.tessellation_engine.models import TessellationConfig
-from app.engine.tessellation_engine.processor import process_tessellation_request
-from app.engine.fractal_engine.card_generator import generate_card
+from app.engine.parametric_engine.models import ParametricConfig, DEFAULT_PARAMETRIC_CONFIG
+from app.engine.tessellation_engine.models import TessellationConfig, DEFAULT_TESSELLATION_CONFIG
+from app.engine.fractal_engine.card_generator import generate_card, compose_card
+from app.engine.complexity import govern_complexity
+from app.cache.single_flight import SingleFlight
+from app.service.render_pool import get_render_pool
+from app.service.render_cache import canonical_config_hash, get_render_cache
+from app.service.artifact_store import get_artifact_store
+from app.service.card_writer import get_card_writer
+from app.observability.metrics import COMPLEXITY_DOWNGRADES, OUTPUT_BYTES, record_fallback, stage_timer
+from app.observability.logging import get_logger
 import json
 from app.prompt.system_prompt import SYSTEM_PROMPT
 
-service = InferenceService()
+logger = get_logger(__name__)
+
+service = get_inference_service()
+
+# Identical renders requested while one is in flight share its result
+_render_flights = SingleFlight("render")
+
+# Config model and deadline fallback config for each engine
+ENGINE_COMPONENTS = {
+    EngineTypeEnum.l_system: (LSystemConfig, DEFAULT_L_SYSTEM_CONFIG),
+    EngineTypeEnum.parametric: (ParametricConfig, DEFAULT_PARAMETRIC_CONFIG),
+    EngineTypeEnum.tessellation: (TessellationConfig, DEFAULT_TESSELLATION_CONFIG),
+}
+
+
+@lru_cache(maxsize=None)
+def variant_batch_model(config_model, count: int):
+    """
+    Builds the structured-output model for a batch call: a `variants` list of
+    up to `count` engine configs, so N configs come back from one model call.
+    """
+    return create_model(
+        f"{config_model.__name__}Variants",
+        variants=(
+            List[config_model],
+            Field(..., min_length=1, max_length=count, description="Distinct pattern configurations.")
+        )
+    )
+
 class PatternService:
-    async def generate_pattern(self, user_prompt:str ,  db: AsyncSession) -> CardResponse:
+    async def generate_pattern(
+        self,
+        user_prompt: str,
+        deadline: Optional[Deadline] = None,
+        source: str = "generate"
+    ) -> CardResponse:
+        """
+        Runs the full pipeline for one card. The finished card is queued for
+        persistence (see CardWriter) without waiting on the database.
+
+        Args:
+            user_prompt: The user's description of the card
+            deadline: Time budget shared by every stage
+            source: Endpoint recorded with the persisted card (generate or job)
+        """
         try:
             # Step 1: Classify engine type using router
-            try:
-                engine_type = await classify_engine(user_prompt)
-                print(f"🎯 Selected engine: {engine_type}")
-            except Exception as e:
-                print(f"⚠️  Router classification failed: {str(e)}")
-                print(f"⚠️  Defaulting to l_system engine")
-                engine_type = EngineTypeEnum.l_system
-            
-            # Step 2: Build engine-specific prompt
-            full_prompt = build_engine_prompt(engine_type, user_prompt)
-            
-            # Step 3: Select appropriate config model and processor based on engine type
-            if engine_type == EngineTypeEnum.l_system:
-                config_model = LSystemConfig
-                processor_func = process_fractal_request
-            elif engine_type == EngineTypeEnum.parametric:
-                config_model = ParametricConfig
-                processor_func = process_parametric_request
-            elif engine_type == EngineTypeEnum.tessellation:
-                config_model = TessellationConfig
-                processor_func = process_tessellation_request
-            else:
-                # Default to l_system if unknown engine type
-                config_model = LSystemConfig
-                processor_func = process_fractal_request
-            
-            print(f"📋 Using config model: {config_model.__name__}")
-
-            # Step 4: Generate pattern config via AI
-            
-            ai_config = await service._generate_structured_content(full_prompt, config_model)
-            if not ai_config:
-                print("\n❌ Failed to generate AI config.")
-                raise ValueError("AI failed to generate valid configuration")
-                
-            print("\n✅ Successfully parsed AI config.")
-           
-            # Step 5: Process pattern using selected processor function
-            try:
-                client_ready_json = processor_func(ai_config)
-                
-                # Step 6: Extract pattern SVG from processor response
-                pattern_data = json.loads(client_ready_json)
-                pattern_svg = pattern_data['svg_string']
-            except Exception as e:
-                print(f"❌ Pattern generation failed for engine '{engine_type}': {str(e)}")
-                print(f"   Config: {ai_config.model_dump_json(indent=2) if ai_config else 'None'}")
-                raise ValueError(f"Failed to generate pattern with {engine_type} engine: {str(e)}")
-            
+            engine_type = await self._select_engine(user_prompt, deadline)
+
+            # Steps 2-4: Build the engine prompt and generate the pattern config via AI
+            ai_config = await self._generate_engine_config(engine_type, user_prompt, deadline)
+            ai_config, downgrades = self._govern_complexity(engine_type, ai_config)
+
+            # Steps 5-6: Render the pattern SVG in the render process pool
+            pattern_svg = await self._render_pattern(engine_type, ai_config)
+
             # Step 7: Generate complete card with content overlay (existing logic)
             try:
-                print("\n--- Generating Complete Card ---")
                 card_response = await generate_card(
                     pattern_svg=pattern_svg,
                     user_prompt=user_prompt,
                     pattern_config=ai_config,
-                    inference_service=service
+                    inference_service=service,
+                    deadline=deadline,
+                    complexity_downgrades=downgrades
                 )
-                
-                # Save the final card SVG
-                output_filename = "sample_patterns/temp_card_output.svg"
-                with open(output_filename, "w") as f:
-                    f.write(card_response.card_svg)
-                print(f"\n✅  Saved final card SVG to: {output_filename}")
-                
+
+                await self._store_card_artifact(card_response)
+                get_card_writer().enqueue(user_prompt, card_response, source)
+
                 # Return CardResponse (maintains backward compatibility)
                 return card_response
+            except (InferenceOverloadedError, DeadlineExceededError):
+                # Transient: the controller answers 503 and jobs requeue
+                raise
             except Exception as e:
-                print(f"❌ Card generation failed: {str(e)}")
+                logger.error("Card generation failed: %s", e)
                 raise ValueError(f"Failed to generate complete card: {str(e)}")
-                
+
         except Exception as e:
-            print(f"\n❌ Pattern generation failed: {str(e)}")
+            logger.error("Pattern generation failed: %s", e)
             # Return error response without falling back to different engine
             raise
 
+    async def stream_pattern(
+        self,
+        user_prompt: str,
+        deadline: Optional[Deadline] = None
+    ) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Runs the same pipeline as generate_pattern, yielding each stage's result
+        as soon as it is ready so clients can paint the card progressively.
+
+        Yields (event, payload) pairs in order:
+            engine:  {"engine_type": ...}
+            pattern: {"pattern_svg": ..., "pattern_config": {...}}
+            content: {"content_config": {...}}
+            card:    the complete CardResponse
+        """
+        engine_type = await self._select_engine(user_prompt, deadline)
+        yield "engine", {"engine_type": engine_type.value}
+
+        ai_config = await self._generate_engine_config(engine_type, user_prompt, deadline)
+        ai_config, downgrades = self._govern_complexity(engine_type, ai_config)
+        pattern_svg = await self._render_pattern(engine_type, ai_config)
+        yield "pattern", {
+            "pattern_svg": pattern_svg,
+            "pattern_config": ai_config.model_dump(mode="json"),
+            "complexity_downgrades": [downgrade.model_dump(mode="json") for downgrade in downgrades],
+        }
+
+        content_config = await service.generate_content_config(user_prompt, deadline=deadline)
+        yield "content", {"content_config": content_config.model_dump(mode="json")}
+
+        card_response = compose_card(pattern_svg, ai_config, content_config, deadline, downgrades)
+        await self._store_card_artifact(card_response)
+        get_card_writer().enqueue(user_prompt, card_response, "stream")
+        yield "card", card_response.model_dump(mode="json")
+
+    async def generate_batch(
+        self,
+        user_prompt: str,
+        count: int,
+        deadline: Optional[Deadline] = None
+    ) -> List[CardResponse]:
+        """
+        Generates up to `count` distinct card variants for one prompt.
+
+        The engine is classified once and the content config is generated once,
+        concurrently with a single structured call that returns every pattern
+        config. The variants are then rendered in parallel in the render pool,
+        so a batch costs about one request plus the renders.
+
+        Fewer cards than requested are returned when the model repeats a
+        variant, a render fails, or the deadline forces the default config.
+        """
+        engine_type = await self._select_engine(user_prompt, deadline)
+
+        # Pattern variants and content are independent, so request them together
+        variant_configs, content_config = await asyncio.gather(
+            self._generate_variant_configs(engine_type, user_prompt, count, deadline),
+            service.generate_content_config(user_prompt, deadline=deadline)
+        )
+
+        governed = [self._govern_complexity(engine_type, config) for config in variant_configs]
+        logger.debug("Rendering %d pattern variants", len(governed))
+        rendered = await asyncio.gather(
+            *(self._render_pattern(engine_type, config) for config, _ in governed),
+            return_exceptions=True
+        )
+
+        cards = []
+        for (config, downgrades), pattern_svg in zip(governed, rendered):
+            if isinstance(pattern_svg, BaseException):
+                logger.warning("Skipping variant that failed to render: %s", pattern_svg)
+                continue
+            cards.append(compose_card(pattern_svg, config, content_config, deadline, downgrades))
+        await asyncio.gather(*(self._store_card_artifact(card) for card in cards))
+        for card in cards:
+            get_card_writer().enqueue(user_prompt, card, "batch")
+
+        if not cards:
+            raise ValueError("Failed to render any pattern variant")
+        logger.info("Generated %d card variants", len(cards))
+        return cards
+
+    async def _select_engine(self, user_prompt: str, deadline: Optional[Deadline]) -> EngineTypeEnum:
+        """
+        Classifies the prompt into an engine type, defaulting to l_system on
+        failure or timeout. An overloaded model is not a routing failure: it
+        propagates so the request is answered with 503.
+        """
+        try:
+            with stage_timer("routing"):
+                engine_type = await classify_engine(user_prompt, deadline)
+        except InferenceOverloadedError:
+            raise
+        except DeadlineExceededError as e:
+            logger.warning("%s, defaulting to l_system", e)
+            if deadline is not None:
+                deadline.mark_degraded("routing")
+            record_fallback("routing", "timeout")
+            engine_type = EngineTypeEnum.l_system
+        except Exception as e:
+            logger.warning("Router classification failed, defaulting to l_system: %s", e)
+            record_fallback("routing", "error")
+            engine_type = EngineTypeEnum.l_system
+        return engine_type
+
+    async def _generate_engine_config(
+        self,
+        engine_type: EngineTypeEnum,
+        user_prompt: str,
+        deadline: Optional[Deadline]
+    ):
+        """Builds the engine-specific prompt and asks the AI for a validated pattern config."""
+        # Build engine-specific prompt
+        full_prompt = build_engine_prompt(engine_type, user_prompt)
+
+        # Select appropriate config model based on engine type (default to l_system)
+        config_model, default_config = ENGINE_COMPONENTS.get(
+            engine_type, ENGINE_COMPONENTS[EngineTypeEnum.l_system]
+        )
+        logger.debug("Using config model: %s", config_model.__name__)
+
+        # Generate pattern config via AI, within the remaining time budget
+        with stage_timer("pattern_config", engine_type.value):
+            ai_config = await self._generate_pattern_config(
+                full_prompt, config_model, default_config, deadline
+            )
+        if not ai_config:
+            logger.error("Failed to generate AI config")
+            raise ValueError("AI failed to generate valid configuration")
+
+        return ai_config
+
+    async def _generate_variant_configs(
+        self,
+        engine_type: EngineTypeEnum,
+        user_prompt: str,
+        count: int,
+        deadline: Optional[Deadline]
+    ) -> list:
+        """Asks the AI for `count` pattern configs in one call and drops duplicates."""
+        config_model, default_config = ENGINE_COMPONENTS.get(
+            engine_type, ENGINE_COMPONENTS[EngineTypeEnum.l_system]
+        )
+        batch_model = variant_batch_model(config_model, count)
+        logger.debug("Using config model: %s (%d variants)", batch_model.__name__, count)
+
+        with stage_timer("pattern_config", engine_type.value):
+            batch = await self._generate_pattern_config(
+                build_batch_prompt(engine_type, user_prompt, count),
+                batch_model,
+                batch_model(variants=[default_config]),
+                deadline
+            )
+        if not batch:
+            logger.error("Failed to generate AI variant configs")
+            raise ValueError("AI failed to generate valid configurations")
+
+        unique_configs = {}
+        for config in batch.variants:
+            unique_configs.setdefault(config.model_dump_json(), config)
+        return list(unique_configs.values())[:count]
+
+    def _govern_complexity(self, engine_type: EngineTypeEnum, ai_config):
+        """
+        Checks the config's preflight complexity estimate against the budget and
+        reduces its detail when it would be too expensive to render.
+
+        Returns:
+            The config to render and the downgrades applied to it
+        """
+        governed_config, downgrades = govern_complexity(engine_type.value, ai_config)
+        for downgrade in downgrades:
+            logger.info(
+                "Reduced %s from %s to %s to fit the %s budget",
+                downgrade.parameter, downgrade.original, downgrade.applied, downgrade.limit,
+                extra={"engine_type": engine_type.value, "estimated": downgrade.estimated, "budget": downgrade.budget}
+            )
+            COMPLEXITY_DOWNGRADES.inc(engine=engine_type.value, parameter=downgrade.parameter, limit=downgrade.limit)
+        return governed_config, downgrades
+
+    async def _render_pattern(self, engine_type: EngineTypeEnum, ai_config) -> str:
+        """
+        Renders the pattern SVG in the render process pool, keeping the
+        CPU-bound engine work off the event loop. Renders are cached by
+        canonical config hash, so repeated configs skip the engine entirely,
+        and concurrent requests for the same config share one render.
+        """
+        render_cache = get_render_cache()
+        cache_key = canonical_config_hash(engine_type.value, ai_config)
+        cached_svg = await render_cache.get(cache_key)
+        if cached_svg is not None:
+            logger.debug("Render cache hit for %s config %s", engine_type.value, cache_key[:12])
+            return cached_svg
+
+        with stage_timer("render", engine_type.value):
+            return await _render_flights.run(
+                cache_key, lambda: self._render_uncached(engine_type, ai_config, cache_key)
+            )
+
+    async def _render_uncached(self, engine_type: EngineTypeEnum, ai_config, cache_key: str) -> str:
+        """Renders in the render pool and stores the SVG in the render cache."""
+        try:
+            pattern_svg = await get_render_pool().render(engine_type.value, ai_config)
+        except Exception as e:
+            logger.error(
+                "Pattern generation failed for engine %s: %s", engine_type.value, e,
+                extra={"config": ai_config.model_dump(mode="json") if ai_config else None}
+            )
+            raise ValueError(f"Failed to generate pattern with {engine_type} engine: {str(e)}")
+
+        OUTPUT_BYTES.observe(len(pattern_svg), kind="pattern_svg", engine=engine_type.value)
+        await get_render_cache().put(cache_key, pattern_svg)
+        return pattern_svg
+
+    async def _store_card_artifact(self, card_response: CardResponse) -> None:
+        """Stores the card SVG in the artifact store and records its hash on the response."""
+        try:
+            card_response.artifact_hash = await get_artifact_store().put(card_response.card_svg)
+            logger.debug("Stored card SVG as artifact %s", card_response.artifact_hash[:12])
+        except OSError as e:
+            # The inline card_svg is still returned, so a storage failure is not fatal
+            logger.warning("Failed to store card SVG artifact: %s", e)
+
+    async def _generate_pattern_config(
+        self,
+        full_prompt: str,
+        config_model,
+        default_config,
+        deadline: Optional[Deadline]
+    ):
+        """
+        Generates the engine config via AI, or returns the engine's default
+        config when the request deadline leaves too little time for the call.
+        """
+        timeout = None
+        if deadline is not None:
+            timeout = deadline.stage_timeout("pattern_config")
+            if timeout is None:
+                logger.warning("Not enough time left for pattern config generation, using default config")
+                deadline.mark_degraded("pattern_config")
+                record_fallback("pattern_config", "deadline")
+                return default_config
+
+        try:
+            return await service._generate_structured_content(full_prompt, config_model, timeout=timeout)
+        except DeadlineExceededError as e:
+            logger.warning("%s, using default config", e)
+            if deadline is not None:
+                deadline.mark_degraded("pattern_config")
+            record_fallback("pattern_config", "timeout")
+            return default_config
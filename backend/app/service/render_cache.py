@@ -0,0 +1,158 @@
+"""
+Content-addressed cache for rendered pattern SVGs.
+
+The engine processors are pure functions of their config, so a render can be
+reused whenever the same config comes back from the model. Configs are hashed
+in canonical form (defaults applied, keys sorted, floats normalized) together
+with the engine type and its renderer version, so equivalent configs share an
+entry and renders from older engine code are never served.
+
+Entries live in two tiers: an in-memory LRU bounded by total SVG size, backed
+by the host-wide shared cache (app/cache/shared_cache.py), which survives
+restarts and lets every worker on a host reuse a render made by any of them.
+"""
+
+import hashlib
+import json
+import os
+from typing import Any, Dict, Optional, Union
+
+from cachetools import LRUCache
+from pydantic import BaseModel
+
+from app.cache.shared_cache import SharedCache, get_shared_cache
+from app.engine.renderer import RENDERERS, engine_version
+from app.observability.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+# Total size of SVGs kept in memory (0 disables the memory tier)
+RENDER_CACHE_MAX_BYTES = int(os.getenv("RENDER_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+# Back the memory tier with the host-wide shared cache
+RENDER_CACHE_SHARED = os.getenv("RENDER_CACHE_SHARED", "true").lower() == "true"
+# Significant digits kept when normalizing floats in the cache key
+RENDER_CACHE_FLOAT_DIGITS = int(os.getenv("RENDER_CACHE_FLOAT_DIGITS", "9"))
+
+
+def _normalize(value: Any) -> Any:
+    """Rounds floats so values differing only in representation noise hash alike."""
+    if isinstance(value, float):
+        normalized = float(f"{value:.{RENDER_CACHE_FLOAT_DIGITS}g}")
+        return normalized + 0.0  # folds -0.0 into 0.0
+    if isinstance(value, dict):
+        return {key: _normalize(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_normalize(item) for item in value]
+    return value
+
+
+def canonical_config_hash(engine_type: str, config: Union[BaseModel, Dict[str, Any]]) -> str:
+    """
+    Returns the cache key for rendering `config` with the given engine.
+
+    The config is re-validated against the engine's model so omitted fields
+    take their defaults, then serialized with sorted keys (which also orders
+    L-System rules) and normalized floats.
+    """
+    config_model, _ = RENDERERS.get(engine_type, RENDERERS["l_system"])
+    config_data = config.model_dump() if isinstance(config, BaseModel) else config
+    canonical = _normalize(config_model.model_validate(config_data).model_dump(mode="json"))
+    payload = json.dumps(
+        {
+            "engine": engine_type,
+            "version": engine_version(engine_type),
+            "config": canonical,
+        },
+        sort_keys=True,
+        separators=(",", ":")
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class _CountingLRUCache(LRUCache):
+    """LRUCache that counts evictions made to stay under its size bound."""
+
+    def __init__(self, maxsize: int):
+        super().__init__(maxsize=maxsize, getsizeof=len)
+        self.evictions = 0
+
+    def popitem(self):
+        self.evictions += 1
+        return super().popitem()
+
+
+class RenderCache:
+    """
+    Two-tier (memory, then shared) cache of rendered pattern SVGs.
+
+    Args:
+        max_bytes: Size bound of the in-memory tier
+        shared: Host-wide tier, or None to disable it
+    """
+
+    # Namespace of the renders in the shared cache
+    NAMESPACE = "render"
+
+    def __init__(self, max_bytes: int = RENDER_CACHE_MAX_BYTES, shared: Optional[SharedCache] = None):
+        self.max_bytes = max_bytes
+        self.shared = shared
+        self._memory = _CountingLRUCache(max_bytes) if max_bytes > 0 else None
+        self.memory_hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+
+    async def get(self, key: str) -> Optional[str]:
+        """Returns the cached SVG for `key`, promoting shared hits into memory."""
+        if self._memory is not None:
+            svg = self._memory.get(key)
+            if svg is not None:
+                self.memory_hits += 1
+                return svg
+
+        if self.shared is not None:
+            svg = await self.shared.get(self.NAMESPACE, key)
+            if svg is not None:
+                self.shared_hits += 1
+                self._remember(key, svg)
+                return svg
+
+        self.misses += 1
+        return None
+
+    async def put(self, key: str, svg: str) -> None:
+        """Stores a rendered SVG in both tiers."""
+        self._remember(key, svg)
+        if self.shared is not None:
+            await self.shared.put(self.NAMESPACE, key, svg)
+
+    def _remember(self, key: str, svg: str) -> None:
+        # Entries larger than the whole memory tier are only kept in the shared tier
+        if self._memory is not None and len(svg) <= self.max_bytes:
+            self._memory[key] = svg
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit, miss and eviction counters plus the memory tier's current size."""
+        lookups = self.memory_hits + self.shared_hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "shared_hits": self.shared_hits,
+            "misses": self.misses,
+            "hit_ratio": round((self.memory_hits + self.shared_hits) / lookups, 4) if lookups else 0.0,
+            "evictions": self._memory.evictions if self._memory is not None else 0,
+            "memory_entries": len(self._memory) if self._memory is not None else 0,
+            "memory_bytes": self._memory.currsize if self._memory is not None else 0,
+            "memory_max_bytes": self.max_bytes,
+            "shared_enabled": self.shared is not None,
+        }
+
+
+_render_cache: Optional[RenderCache] = None
+
+
+def get_render_cache() -> RenderCache:
+    """Returns the process-wide RenderCache."""
+    global _render_cache
+    if _render_cache is None:
+        _render_cache = RenderCache(shared=get_shared_cache() if RENDER_CACHE_SHARED else None)
+    return _render_cache
@@ -0,0 +1,141 @@
+"""
+Process pool for CPU-bound pattern rendering.
+
+The engines are pure Python and can run for seconds on deep L-system
+expansions. Running them inside an async handler freezes the event loop for
+every other in-flight request on the worker, so renders are dispatched to a
+managed process pool sized to the available cores instead.
+
+Only the engine type and a plain dict of the config cross the process
+boundary, and only the SVG string comes back. Each task runs under a CPU time
+limit inside the worker (SIGXCPU on POSIX) with a wall-clock backstop in the
+parent that recycles the pool if a worker stops responding.
+"""
+
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+
+from pydantic import BaseModel
+
+from app.engine.renderer import RenderTimeoutError, render_config, warm_up_renderers
+from app.observability.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+# Number of render processes (0 renders inline on the event loop thread)
+RENDER_WORKERS = int(os.getenv("RENDER_WORKERS", str(os.cpu_count() or 1)))
+# CPU seconds a single render may use before it is aborted
+RENDER_CPU_TIMEOUT_SECONDS = float(os.getenv("RENDER_CPU_TIMEOUT_SECONDS", "10"))
+# Extra wall-clock time allowed on top of the CPU limit before the pool is recycled
+RENDER_WALL_GRACE_SECONDS = float(os.getenv("RENDER_WALL_GRACE_SECONDS", "5"))
+# "spawn" avoids forking a parent that holds gRPC / event loop threads
+RENDER_POOL_START_METHOD = os.getenv("RENDER_POOL_START_METHOD", "spawn")
+
+
+class RenderPool:
+    """
+    Managed process pool that renders pattern configs off the event loop.
+
+    Args:
+        max_workers: Number of worker processes (0 renders inline)
+        cpu_timeout: CPU seconds allowed per render
+    """
+
+    def __init__(self, max_workers: int = RENDER_WORKERS, cpu_timeout: float = RENDER_CPU_TIMEOUT_SECONDS):
+        self.max_workers = max_workers
+        self.cpu_timeout = cpu_timeout
+        self._executor: Optional[ProcessPoolExecutor] = None
+        # Only submit as many renders as there are processes, so the wall-clock
+        # backstop measures execution time rather than time spent queued
+        self._slots = asyncio.Semaphore(max(max_workers, 1))
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            logger.info("Starting %d render processes", self.max_workers)
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context(RENDER_POOL_START_METHOD),
+                # Import the engines as each worker starts rather than on its first render
+                initializer=warm_up_renderers
+            )
+        return self._executor
+
+    async def render(self, engine_type: str, config: BaseModel) -> str:
+        """
+        Renders a validated engine config and returns the pattern SVG string.
+
+        Raises:
+            RenderTimeoutError: If the render exceeds its CPU (or wall-clock) budget
+        """
+        config_data = config.model_dump()
+        if self.max_workers <= 0:
+            return render_config(engine_type, config_data)
+
+        loop = asyncio.get_running_loop()
+        async with self._slots:
+            executor = self._get_executor()
+            future = loop.run_in_executor(executor, render_config, engine_type, config_data, self.cpu_timeout)
+            try:
+                return await asyncio.wait_for(future, timeout=self.cpu_timeout + RENDER_WALL_GRACE_SECONDS)
+            except asyncio.TimeoutError:
+                # The worker is stuck somewhere the CPU limit could not interrupt; kill it
+                logger.error("Render exceeded wall-clock limit, recycling pool")
+                self._recycle(executor)
+                raise RenderTimeoutError("Pattern render exceeded its time limit")
+            except BrokenProcessPool:
+                logger.error("Render process died, recycling pool")
+                self._recycle(executor)
+                raise
+
+    def _recycle(self, executor: ProcessPoolExecutor) -> None:
+        """
+        Terminates every worker process of `executor` and lets the next render
+        start a fresh pool.
+
+        Renders that fail together on a broken pool each ask for a recycle; only
+        the first one acts, so the fresh pool started since is left alone.
+        """
+        if self._executor is not executor:
+            return
+        self._executor = None
+        for process in list(getattr(executor, "_processes", {}).values()):
+            process.terminate()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    async def warm_up(self) -> None:
+        """
+        Starts the worker processes ahead of the first request, so the first
+        renders do not pay for process start-up and engine imports.
+        """
+        if self.max_workers <= 0:
+            warm_up_renderers()
+            return
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        # The pool spawns a process per submission until it is full; each
+        # process runs the warm_up_renderers initializer before its first task
+        await asyncio.gather(*(
+            loop.run_in_executor(executor, os.getpid) for _ in range(self.max_workers)
+        ))
+        logger.info("Warmed up %d render processes", self.max_workers)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+
+_render_pool: Optional[RenderPool] = None
+
+
+def get_render_pool() -> RenderPool:
+    """Returns the process-wide RenderPool."""
+    global _render_pool
+    if _render_pool is None:
+        _render_pool = RenderPool()
+    return _render_pool
@@ -0,0 +1,149 @@
+"""
+Process warm-up, liveness and readiness.
+
+Importing the app does no I/O: the database engine, inference client and
+engine modules are all created on first use. At startup a background task
+warms them up (render processes, engine imports, inference client, database
+tables, card writer and job workers) while the server is already accepting connections,
+so liveness answers immediately and readiness flips once warm-up finishes.
+
+If the database is unreachable at startup, its step is retried in the
+background with exponential backoff, and the card writer and job workers
+start once it succeeds; until then the jobs endpoints answer 503.
+"""
+
+import asyncio
+import os
+import time
+from typing import Dict, Optional
+
+from app.config.db_config import database_configured, init_models, ping_database
+from app.inference.inference_service import get_inference_service
+from app.observability.logging import get_logger
+from app.prompt.prompt_registry import get_prompt_registry
+from app.service.card_writer import get_card_writer
+from app.service.job_service import get_job_service
+from app.service.render_pool import get_render_pool
+
+logger = get_logger(__name__)
+
+
+# Run the warm-up at startup (disable to defer all initialization to first use)
+STARTUP_WARM_UP = os.getenv("STARTUP_WARM_UP", "true").lower() == "true"
+# Time allowed for the database ping in a readiness check
+READINESS_DB_TIMEOUT_SECONDS = float(os.getenv("READINESS_DB_TIMEOUT_SECONDS", "2"))
+# First delay before retrying a failed database warm-up; doubles up to the maximum
+STARTUP_DB_RETRY_SECONDS = float(os.getenv("STARTUP_DB_RETRY_SECONDS", "1"))
+STARTUP_DB_RETRY_MAX_SECONDS = float(os.getenv("STARTUP_DB_RETRY_MAX_SECONDS", "30"))
+
+
+class StartupService:
+    """
+    Runs the startup warm-up and reports liveness and readiness.
+
+    Each warm-up step is recorded in `checks` as "ok", "skipped" or the
+    error it raised. A failed step does not block readiness, since the
+    component is initialized again on first use; only the database is
+    re-checked on every readiness probe, because it can go away later.
+    """
+
+    def __init__(self):
+        self.ready = False
+        self.checks: Dict[str, str] = {}
+        self.warm_up_seconds: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+        self._database_task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Starts the warm-up in the background on the running event loop."""
+        if self._task is not None:
+            return
+        if not STARTUP_WARM_UP:
+            self.ready = True
+            return
+        self._task = asyncio.create_task(self.warm_up(), name="startup-warm-up")
+
+    async def stop(self) -> None:
+        """Cancels an unfinished warm-up, stops the job workers and flushes the card writer."""
+        for task in (self._task, self._database_task):
+            if task is not None and not task.done():
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+        await get_job_service().stop()
+        await get_card_writer().stop()
+
+    async def warm_up(self) -> None:
+        """Initializes every lazily created component, then marks the process ready."""
+        started = time.perf_counter()
+        await self._run_step("render_pool", get_render_pool().warm_up())
+        await self._run_step("inference", self._warm_up_inference())
+        if database_configured():
+            if await self._run_step("database", init_models()):
+                self._start_database_workers()
+            else:
+                self._database_task = asyncio.create_task(self._retry_database(), name="startup-database-retry")
+        else:
+            self.checks["database"] = "skipped"
+        self.warm_up_seconds = time.perf_counter() - started
+        self.ready = True
+        logger.info("Warm-up finished in %.2fs", self.warm_up_seconds, extra={"checks": self.checks})
+
+    def _start_database_workers(self) -> None:
+        get_card_writer().start()
+        get_job_service().start()
+
+    async def _retry_database(self) -> None:
+        """Retries the database warm-up until it succeeds, then starts the workers that need it."""
+        delay = STARTUP_DB_RETRY_SECONDS
+        while True:
+            await asyncio.sleep(delay)
+            if await self._run_step("database", init_models()):
+                logger.info("Database is reachable, starting the card writer and job workers")
+                self._start_database_workers()
+                return
+            delay = min(delay * 2, STARTUP_DB_RETRY_MAX_SECONDS)
+
+    async def _warm_up_inference(self) -> None:
+        # Creating the backend may initialize the Vertex AI SDK, which does blocking I/O
+        backend = await asyncio.to_thread(lambda: get_inference_service().backend)
+        # Let backends with prompt caching register the static prompt prefixes once
+        await backend.prepare_prefixes(get_prompt_registry().prefixes())
+
+    async def _run_step(self, name: str, step) -> bool:
+        try:
+            await step
+        except Exception as e:
+            logger.warning("Warm-up step %s failed: %s", name, e)
+            self.checks[name] = f"error: {e}"
+            return False
+        self.checks[name] = "ok"
+        return True
+
+    async def readiness(self) -> Dict[str, object]:
+        """
+        Returns the readiness report: whether warm-up has finished, each step's
+        result, and a fresh database ping when a database is configured.
+        """
+        checks = dict(self.checks)
+        if self.ready and database_configured():
+            try:
+                await asyncio.wait_for(ping_database(), timeout=READINESS_DB_TIMEOUT_SECONDS)
+                checks["database"] = "ok"
+            except Exception as e:
+                checks["database"] = f"error: {e or type(e).__name__}"
+        return {
+            "status": "ready" if self.ready else "starting",
+            "warm_up_seconds": self.warm_up_seconds,
+            "checks": checks,
+        }
+
+
+_startup_service: Optional[StartupService] = None
+
+
+def get_startup_service() -> StartupService:
+    """Returns the process-wide StartupService."""
+    global _startup_service
+    if _startup_service is None:
+        _startup_service = StartupService()
+    return _startup_service
@@ -0,0 +1,342 @@
+"""
+Micro-benchmarks for the pattern engines, with stored baselines.
+
+Times each engine stage on a matrix of representative configs:
+
+- l_system.rewrite / l_system.components: apply_l_system_rules, and the
+  full component build (rewriting plus the turtle interpreter), for the four
+  prompt examples (fern, Koch, Sierpinski, dragon) at several iteration counts
+- parametric.curve / parametric.path: the point generator of each of the
+  four equation types and their conversion to path data
+- tessellation.tiles / tessellation.pattern: the tile geometry and the
+  pattern SVG for each of the four tile shapes
+- compose.card_svg: the card overlay composition around patterns of each
+  engine
+
+Each case records its median and fastest time, its peak traced memory (measured in a
+separate, untimed run because tracemalloc slows allocation) and the size of
+its output. With --update the results are written to the baseline file;
+otherwise they are compared with it and any case whose fastest time grows beyond
+--tolerance, or whose memory or output grows beyond --memory-tolerance, is
+flagged and the run exits with status 1. Times are compared on the fastest
+sample, which is the least affected by other load on the machine.
+Baselines are machine specific: record them on the machine (or CI runner)
+that runs the comparison.
+
+Usage (from the backend directory):
+    python -m benchmarks.engine_benchmark [--update] [--filter l_system] [--repeat 7]
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.engine.fractal_engine.card_generator import DEFAULT_CONTENT_CONFIG, _compose_card_svg
+from app.engine.fractal_engine.engine import apply_l_system_rules, generate_l_system_components
+from app.engine.fractal_engine.models import LSystemConfig
+from app.engine.fractal_engine.processor import render_fractal_svg
+from app.engine.parametric_engine.engine import (
+    generate_epitrochoid_curve,
+    generate_hypotrochoid_curve,
+    generate_lissajous_curve,
+    generate_rose_curve,
+    points_to_path,
+)
+from app.engine.parametric_engine.models import ParametricConfig
+from app.engine.parametric_engine.processor import render_parametric_svg
+from app.engine.tessellation_engine.engine import generate_tessellation_components
+from app.engine.tessellation_engine.models import TessellationConfig
+from app.engine.tessellation_engine.processor import build_tessellation_pattern_svg, render_tessellation_svg
+
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baselines", "engine_benchmark.json")
+
+# The L-system examples from the engine prompt: (axiom, rules, angle)
+L_SYSTEM_EXAMPLES = {
+    "fern": ("X", {"X": "F+[[X]-X]-F[-FX]+X", "F": "FF"}, 25.0),
+    "koch": ("F--F--F", {"F": "F+F--F+F"}, 60.0),
+    "sierpinski": ("F-G-G", {"F": "F-G+F+G-F", "G": "GG"}, 120.0),
+    "dragon": ("FX", {"X": "X+YF+", "Y": "-FX-Y"}, 90.0),
+}
+L_SYSTEM_ITERATIONS = (3, 5, 7)
+
+PARAMETRIC_CURVES = {
+    "rose": generate_rose_curve,
+    "lissajous": generate_lissajous_curve,
+    "epitrochoid": generate_epitrochoid_curve,
+    "hypotrochoid": generate_hypotrochoid_curve,
+}
+PARAMETRIC_POINTS = (500, 2000)
+
+TILE_SHAPES = ("square", "hexagon", "triangle", "diamond")
+
+# Minimum duration of one timed sample; fast cases are looped to reach it
+MIN_SAMPLE_SECONDS = 0.01
+
+
+def l_system_config(example: str, iterations: int) -> LSystemConfig:
+    axiom, rules, angle = L_SYSTEM_EXAMPLES[example]
+    return LSystemConfig.model_validate({
+        "parameters": {"axiom": axiom, "rules": rules, "angle": angle, "iterations": iterations},
+        "style": {"stroke": "#2E7D32"},
+    })
+
+
+def parametric_config(equation_type: str, num_points: int) -> ParametricConfig:
+    return ParametricConfig.model_validate({
+        "parameters": {
+            "equation_type": equation_type,
+            "amplitude_a": 200.0,
+            "amplitude_b": 150.0,
+            "frequency_a": 5.0,
+            "frequency_b": 3.0,
+            "phase_shift": 0.5,
+            "num_points": num_points,
+        },
+        "style": {"stroke": "#FF1493"},
+    })
+
+
+def tessellation_config(tile_shape: str) -> TessellationConfig:
+    return TessellationConfig.model_validate({
+        "parameters": {
+            "tile_shape": tile_shape,
+            "tile_size": 100.0,
+            "rotation": 15.0,
+            "spacing": 2.0,
+            "color_palette": ["#4682B4", "#87CEEB", "#B0E0E6"],
+        },
+        "style": {},
+    })
+
+
+def build_cases() -> Dict[str, Callable[[], Any]]:
+    """
+    Returns every benchmark case by name. Inputs are prepared here, outside
+    the timed callables, so each case times only its own stage.
+    """
+    cases: Dict[str, Callable[[], Any]] = {}
+
+    for example, (axiom, rules, _) in L_SYSTEM_EXAMPLES.items():
+        for iterations in L_SYSTEM_ITERATIONS:
+            config = l_system_config(example, iterations)
+            label = f"[{example},i={iterations}]"
+            cases[f"l_system.rewrite{label}"] = (
+                lambda axiom=axiom, rules=rules, iterations=iterations: apply_l_system_rules(axiom, rules, iterations)
+            )
+            cases[f"l_system.components{label}"] = (
+                lambda config=config: generate_l_system_components(config)["path_data"]
+            )
+
+    for equation_type, curve in PARAMETRIC_CURVES.items():
+        for num_points in PARAMETRIC_POINTS:
+            params = parametric_config(equation_type, num_points).parameters
+            label = f"[{equation_type},n={num_points}]"
+            cases[f"parametric.curve{label}"] = lambda curve=curve, params=params: curve(params)
+            cases[f"parametric.path{label}"] = lambda points=curve(params): points_to_path(points)
+
+    for tile_shape in TILE_SHAPES:
+        config = tessellation_config(tile_shape)
+        cases[f"tessellation.tiles[{tile_shape}]"] = lambda config=config: generate_tessellation_components(config)
+        cases[f"tessellation.pattern[{tile_shape}]"] = (
+            lambda components=generate_tessellation_components(config): build_tessellation_pattern_svg(components)
+        )
+
+    patterns = {
+        "fern,i=5": render_fractal_svg(l_system_config("fern", 5)),
+        "fern,i=7": render_fractal_svg(l_system_config("fern", 7)),
+        "rose,n=2000": render_parametric_svg(parametric_config("rose", 2000)),
+        "hexagon": render_tessellation_svg(tessellation_config("hexagon")),
+    }
+    for label, pattern_svg in patterns.items():
+        cases[f"compose.card_svg[{label}]"] = (
+            lambda pattern_svg=pattern_svg: _compose_card_svg(pattern_svg, DEFAULT_CONTENT_CONFIG)
+        )
+
+    return cases
+
+
+def _output_bytes(result: Any) -> int:
+    """Size of a case's output: the string itself, or the JSON of structured results."""
+    if isinstance(result, str):
+        return len(result.encode("utf-8"))
+    return len(json.dumps(result, default=str).encode("utf-8"))
+
+
+def _sample(func: Callable[[], Any], number: int) -> float:
+    """Milliseconds per call of `func`, averaged over `number` calls."""
+    start = time.perf_counter()
+    for _ in range(number):
+        func()
+    return (time.perf_counter() - start) * 1000 / number
+
+
+def _peak_kb(func: Callable[[], Any]) -> float:
+    """Peak traced allocation of one call, in KB."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 1024
+
+
+def measure(cases: Dict[str, Callable[[], Any]], repeat: int) -> Dict[str, Dict[str, float]]:
+    """
+    Benchmarks every case.
+
+    Samples are taken round-robin (one sample of every case per round), so
+    a slow spell on the machine affects one sample of many cases rather than
+    every sample of one case.
+
+    Returns:
+        Per case: time_ms (median per call), min_ms, peak_kb (traced
+        allocation peak of one call) and output_bytes
+    """
+    numbers = {}
+    output_bytes = {}
+    for name, func in cases.items():
+        output_bytes[name] = _output_bytes(func())
+        # Loop fast cases so every sample is long enough to time reliably
+        numbers[name] = max(1, int(MIN_SAMPLE_SECONDS / max(_sample(func, 1) / 1000, 1e-9)))
+
+    samples: Dict[str, List[float]] = {name: [] for name in cases}
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            for name, func in cases.items():
+                samples[name].append(_sample(func, numbers[name]))
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+    return {
+        name: {
+            "time_ms": statistics.median(samples[name]),
+            "min_ms": min(samples[name]),
+            "peak_kb": _peak_kb(func),
+            "output_bytes": output_bytes[name],
+        }
+        for name, func in cases.items()
+    }
+
+
+def load_baseline(path: str) -> Optional[Dict[str, Any]]:
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as baseline_file:
+        return json.load(baseline_file)
+
+
+def save_baseline(
+    path: str,
+    results: Dict[str, Dict[str, float]],
+    repeat: int,
+    merge_with: Optional[Dict[str, Any]]
+) -> None:
+    """Writes the results as the new baseline, keeping cases excluded by --filter."""
+    cases = dict(merge_with["cases"]) if merge_with else {}
+    cases.update({name: {key: round(value, 4) for key, value in result.items()} for name, result in results.items()})
+    baseline = {
+        "meta": {
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "repeat": repeat,
+        },
+        "cases": dict(sorted(cases.items())),
+    }
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as baseline_file:
+        json.dump(baseline, baseline_file, indent=2)
+        baseline_file.write("\n")
+
+
+def compare(
+    result: Dict[str, float],
+    baseline: Optional[Dict[str, float]],
+    tolerance: float,
+    memory_tolerance: float,
+    min_delta_ms: float
+) -> Tuple[Optional[float], List[str]]:
+    """
+    Compares a case with its baseline.
+
+    Returns:
+        The relative time change (None without a baseline) and the names of
+        the metrics that regressed beyond their tolerance
+    """
+    if baseline is None:
+        return None, []
+    regressions = []
+    time_change = result["min_ms"] / baseline["min_ms"] - 1 if baseline["min_ms"] else 0.0
+    # Sub-threshold absolute changes are timer noise, whatever their ratio
+    if time_change > tolerance and result["min_ms"] - baseline["min_ms"] > min_delta_ms:
+        regressions.append("time")
+    for metric in ("peak_kb", "output_bytes"):
+        if baseline.get(metric) and result[metric] > baseline[metric] * (1 + memory_tolerance):
+            regressions.append(metric)
+    return time_change, regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=7, help="Timed samples per case")
+    parser.add_argument("--filter", default="", help="Only run cases whose name contains this text")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline JSON file")
+    parser.add_argument("--update", action="store_true", help="Write the results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative time increase")
+    parser.add_argument(
+        "--memory-tolerance", type=float, default=0.10,
+        help="Allowed relative increase of peak memory and output bytes"
+    )
+    parser.add_argument("--min-delta-ms", type=float, default=0.05, help="Ignore time increases smaller than this")
+    args = parser.parse_args()
+
+    baseline = load_baseline(args.baseline)
+    baseline_cases = baseline["cases"] if baseline else {}
+    cases = {name: func for name, func in build_cases().items() if args.filter in name}
+
+    print(f"{'case':<44} {'median ms':>10} {'min ms':>9} {'peak KB':>9} {'output B':>10} {'vs base':>8}")
+    results = measure(cases, args.repeat)
+    regressed = {}
+    for name, result in results.items():
+        time_change, regressions = compare(
+            result, baseline_cases.get(name), args.tolerance, args.memory_tolerance, args.min_delta_ms
+        )
+        change = f"{time_change:+.0%}" if time_change is not None else "new"
+        flag = f"  REGRESSED: {', '.join(regressions)}" if regressions else ""
+        print(
+            f"{name:<44} {result['time_ms']:>10.3f} {result['min_ms']:>9.3f} {result['peak_kb']:>9.1f} "
+            f"{result['output_bytes']:>10} {change:>8}{flag}"
+        )
+        if regressions:
+            regressed[name] = regressions
+
+    if args.update:
+        save_baseline(args.baseline, results, args.repeat, baseline)
+        print(f"\nWrote baseline for {len(results)} cases to {args.baseline}")
+        return
+    if baseline is None:
+        print(f"\nNo baseline at {args.baseline}; run with --update to record one")
+        return
+    if regressed:
+        print(f"\n{len(regressed)} of {len(results)} cases regressed beyond tolerance")
+        sys.exit(1)
+    print(f"\nNo regressions in {len(results)} cases")
+
+
+if __name__ == "__main__":
+    main()
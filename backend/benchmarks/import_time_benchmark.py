@@ -0,0 +1,72 @@
+"""
+Benchmark for the cold import time of the API process.
+
+Imports `app.main` in fresh interpreters with `python -X importtime`, so
+nothing is cached in sys.modules, and reports the median total import time
+and the slowest app modules and third-party packages. Each interpreter runs
+without DATABASE_URL, which also checks that importing the app does no I/O.
+
+Usage (from the backend directory):
+    python -m benchmarks.import_time_benchmark [--repeat 5] [--module app.main] [--top 15]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+
+def _import_once(module: str) -> Dict[str, int]:
+    """Imports `module` in a fresh interpreter; returns cumulative microseconds per imported module."""
+    env = dict(os.environ)
+    env.pop("DATABASE_URL", None)
+    env.setdefault("INFERENCE_BACKEND", "local")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, env=env, check=True
+    )
+    cumulative = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, _, cumulative_us, name = (part.strip() for part in line.replace("import time:", "|", 1).split("|"))
+        if cumulative_us.isdigit():
+            # A module re-imported by a later `from package import name` gets a second, near-zero line
+            cumulative[name] = max(cumulative.get(name, 0), int(cumulative_us))
+    return cumulative
+
+
+def _top(samples: Dict[str, List[int]], names: List[str], count: int) -> List[Tuple[str, float]]:
+    """The `count` slowest of `names` by median cumulative milliseconds."""
+    medians = [(name, statistics.median(samples[name]) / 1000) for name in names]
+    return sorted(medians, key=lambda item: item[1], reverse=True)[:count]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh interpreters to import in")
+    parser.add_argument("--module", default="app.main", help="Module to import")
+    parser.add_argument("--top", type=int, default=15, help="Modules to list per table")
+    args = parser.parse_args()
+
+    samples: Dict[str, List[int]] = defaultdict(list)
+    for _ in range(args.repeat):
+        for name, cumulative_us in _import_once(args.module).items():
+            samples[name].append(cumulative_us)
+
+    total_ms = statistics.median(samples[args.module]) / 1000
+    print(f"{args.module}: {total_ms:.1f} ms median over {args.repeat} runs")
+
+    app_modules = [name for name in samples if name.startswith("app.") and name != args.module]
+    packages = [name for name in samples if "." not in name and name != "app"]
+    for title, names in (("app modules", app_modules), ("top-level packages", packages)):
+        print(f"\n{title:<48} {'cumulative ms':>13}")
+        for name, cumulative_ms in _top(samples, names, args.top):
+            print(f"{name:<48} {cumulative_ms:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,306 @@
+"""
+Load test that replays a corpus of user prompts against the full app in-process.
+
+The FastAPI app runs in this process (lifespan included) with the local
+inference backend, so the whole pipeline runs: routing, structured calls,
+render pool, composition and the card writer when DATABASE_URL is set. It
+needs no GCP access. The backend's response latency comes from a configurable
+distribution (see LOCAL_BACKEND_LATENCY in app/inference/backends/local_backend.py),
+so a capacity change to PatternService can be checked against realistic model
+latency before it is deployed.
+
+For each concurrency level, that many clients replay the corpus round-robin
+in a closed loop. The report for each level gives:
+- throughput and error count;
+- p50 / p95 / p99 latency of the whole request and of every pipeline stage,
+  read from each response's Server-Timing header;
+- event-loop lag, sampled by a task that measures how late its sleeps wake up.
+
+Capacity settings (INFERENCE_MAX_CONCURRENCY, RENDER_WORKERS, ...) are read
+from the environment as usual. The clients share the event loop with the
+app, so client overhead is included in the results. The render cache is disabled unless --render-cache
+is given, so repeated prompts still render, and cached LLM responses are not
+reused unless --llm-cache is given, so repeated prompts still call the backend.
+
+Corpus sources:
+- --corpus: a text file (one prompt per line, '#' comments), a JSONL file
+  with "prompt" or "text" fields, or a directory of profiling dumps (*.json,
+  see app/observability/profiling.py). Defaults to benchmarks/corpora/prompts.txt.
+- --corpus-db: a database URL whose recorded card prompts are replayed.
+
+Usage (from the backend directory):
+    python -m benchmarks.replay_load_benchmark [--concurrency 1,4,16,64] [--requests 100]
+        [--latency "lognormal:-0.7,0.5"] [--endpoint generate|batch] [--output results.json]
+"""
+
+import argparse
+import asyncio
+import glob
+import importlib
+import json
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+
+DEFAULT_CORPUS = os.path.join(os.path.dirname(__file__), "corpora", "prompts.txt")
+LOOP_LAG_INTERVAL_SECONDS = 0.01
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Linearly interpolated percentile of `values` (0.0 for an empty list)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def summarize(values: List[float]) -> Dict[str, float]:
+    return {
+        "p50": percentile(values, 0.50),
+        "p95": percentile(values, 0.95),
+        "p99": percentile(values, 0.99),
+        "max": max(values) if values else 0.0,
+    }
+
+
+def load_corpus(path: str) -> List[str]:
+    """Reads prompts from a text file, a JSONL file or a directory of profiling dumps."""
+    if os.path.isdir(path):
+        prompts = []
+        for dump_path in sorted(glob.glob(os.path.join(path, "*.json"))):
+            with open(dump_path, encoding="utf-8") as dump_file:
+                prompt = json.load(dump_file).get("prompt")
+            if prompt:
+                prompts.append(prompt)
+        return prompts
+
+    with open(path, encoding="utf-8") as corpus_file:
+        lines = [line.strip() for line in corpus_file]
+    if path.endswith(".jsonl"):
+        records = [json.loads(line) for line in lines if line]
+        return [record.get("prompt") or record.get("text") for record in records if record.get("prompt") or record.get("text")]
+    return [line for line in lines if line and not line.startswith("#")]
+
+
+async def load_corpus_from_database(database_url: str, limit: int) -> List[str]:
+    """Reads the most recent distinct prompts recorded by the card writer."""
+    from sqlalchemy import select
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    from app.model.card_record import CardRecord
+
+    engine = create_async_engine(database_url)
+    try:
+        async with engine.connect() as connection:
+            result = await connection.execute(
+                select(CardRecord.prompt).order_by(CardRecord.created_at.desc()).limit(limit)
+            )
+            return list(dict.fromkeys(row[0] for row in result))
+    finally:
+        await engine.dispose()
+
+
+def parse_server_timing(header: str) -> Dict[str, float]:
+    """Parses a Server-Timing header into milliseconds per stage."""
+    stages = {}
+    for entry in header.split(","):
+        name, *params = (part.strip() for part in entry.split(";"))
+        for param in params:
+            if param.startswith("dur="):
+                stages[name] = float(param[4:])
+    return stages
+
+
+class LoopLagMonitor:
+    """
+    Measures event-loop lag: how much later than requested a short sleep
+    resumes. Sustained lag means something is blocking the loop.
+    """
+
+    def __init__(self, interval: float = LOOP_LAG_INTERVAL_SECONDS):
+        self.interval = interval
+        self.samples: List[float] = []
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self) -> None:
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, time.perf_counter() - start - self.interval) * 1000)
+
+    def start(self) -> None:
+        self.samples = []
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> List[float]:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        return self.samples
+
+
+async def run_level(
+    client,
+    endpoint: str,
+    payload_extra: Dict[str, Any],
+    prompts: List[str],
+    concurrency: int,
+    request_count: int
+) -> Dict[str, Any]:
+    """Replays `request_count` prompts with `concurrency` closed-loop clients."""
+    latencies: List[float] = []
+    stage_samples: Dict[str, List[float]] = {}
+    statuses: Dict[str, int] = {}
+    next_index = 0
+
+    async def client_loop() -> None:
+        nonlocal next_index
+        while next_index < request_count:
+            prompt = prompts[next_index % len(prompts)]
+            next_index += 1
+            start = time.perf_counter()
+            try:
+                response = await client.post(endpoint, json={"text": prompt, **payload_extra})
+                status = str(response.status_code)
+            except Exception as e:
+                response, status = None, type(e).__name__
+            latencies.append((time.perf_counter() - start) * 1000)
+            statuses[status] = statuses.get(status, 0) + 1
+            if response is not None and response.status_code == 200:
+                for stage, milliseconds in parse_server_timing(response.headers.get("server-timing", "")).items():
+                    stage_samples.setdefault(stage, []).append(milliseconds)
+
+    monitor = LoopLagMonitor()
+    monitor.start()
+    start = time.perf_counter()
+    await asyncio.gather(*(client_loop() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    loop_lag = await monitor.stop()
+
+    return {
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": sum(count for status, count in statuses.items() if status != "200"),
+        "statuses": statuses,
+        "seconds": elapsed,
+        "throughput": len(latencies) / elapsed if elapsed else 0.0,
+        "latency_ms": summarize(latencies),
+        "stages_ms": {stage: summarize(samples) for stage, samples in stage_samples.items()},
+        "loop_lag_ms": summarize(loop_lag),
+    }
+
+
+def print_level(result: Dict[str, Any]) -> None:
+    latency = result["latency_ms"]
+    lag = result["loop_lag_ms"]
+    print(
+        f"\nconcurrency {result['concurrency']}: {result['requests']} requests in {result['seconds']:.1f}s, "
+        f"{result['throughput']:.2f} req/s, {result['errors']} errors {result['statuses']}"
+    )
+    print(f"  {'stage':<16} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    print(f"  {'request':<16} {latency['p50']:>9.1f} {latency['p95']:>9.1f} {latency['p99']:>9.1f} {latency['max']:>9.1f}")
+    for stage, stats in result["stages_ms"].items():
+        print(f"  {stage:<16} {stats['p50']:>9.1f} {stats['p95']:>9.1f} {stats['p99']:>9.1f} {stats['max']:>9.1f}")
+    print(f"  {'loop lag':<16} {lag['p50']:>9.1f} {lag['p95']:>9.1f} {lag['p99']:>9.1f} {lag['max']:>9.1f}")
+
+
+def configure_environment(args: argparse.Namespace) -> None:
+    """Sets the app's environment; must run before any app module is imported."""
+    os.environ["INFERENCE_BACKEND"] = "local"
+    os.environ["LOCAL_BACKEND_LATENCY"] = args.latency
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    if args.render_workers is not None:
+        os.environ["RENDER_WORKERS"] = str(args.render_workers)
+    if not args.render_cache:
+        os.environ["RENDER_CACHE_MAX_BYTES"] = "0"
+        os.environ["RENDER_CACHE_SHARED"] = "false"
+    if not args.llm_cache:
+        os.environ["INFERENCE_CACHE_TTL_SECONDS"] = "0"
+
+
+async def run(args: argparse.Namespace, prompts: List[str]) -> List[Dict[str, Any]]:
+    import httpx
+
+    app = importlib.import_module("app.main").app
+    endpoint, payload_extra = (
+        ("/ts/pattern/generate-batch", {"count": args.batch_count}) if args.endpoint == "batch"
+        else ("/ts/pattern/generate", {})
+    )
+
+    results = []
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://replay", timeout=None) as client:
+            started = time.perf_counter()
+            while (await client.get("/readyz")).status_code != 200:
+                await asyncio.sleep(0.1)
+            print(f"App ready after {time.perf_counter() - started:.1f}s; replaying {len(prompts)} prompts")
+
+            if args.warmup:
+                await run_level(client, endpoint, payload_extra, prompts, 1, args.warmup)
+            for concurrency in args.concurrency:
+                result = await run_level(
+                    client, endpoint, payload_extra, prompts, concurrency, max(args.requests, concurrency)
+                )
+                print_level(result)
+                results.append(result)
+    return results
+
+
+def print_summary(results: List[Dict[str, Any]]) -> None:
+    print(f"\n{'concurrency':>11} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'lag p99':>9} {'errors':>7}")
+    for result in results:
+        latency = result["latency_ms"]
+        print(
+            f"{result['concurrency']:>11} {result['throughput']:>8.2f} {latency['p50']:>9.1f} "
+            f"{latency['p95']:>9.1f} {latency['p99']:>9.1f} {result['loop_lag_ms']['p99']:>9.1f} {result['errors']:>7}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS, help="Prompt file (.txt / .jsonl) or profile dump directory")
+    parser.add_argument("--corpus-db", help="Database URL to read recorded card prompts from instead")
+    parser.add_argument("--corpus-limit", type=int, default=1000, help="Prompts read from --corpus-db")
+    parser.add_argument(
+        "--concurrency", type=lambda text: [int(level) for level in text.split(",")], default=[1, 4, 16, 64],
+        help="Comma-separated concurrency levels to sweep"
+    )
+    parser.add_argument("--requests", type=int, default=100, help="Requests per concurrency level")
+    parser.add_argument("--warmup", type=int, default=5, help="Unrecorded requests before the sweep")
+    parser.add_argument("--latency", default="lognormal:-0.7,0.5", help="LOCAL_BACKEND_LATENCY spec or JSON")
+    parser.add_argument("--endpoint", choices=("generate", "batch"), default="generate")
+    parser.add_argument("--batch-count", type=int, default=3, help="Variants per request with --endpoint batch")
+    parser.add_argument("--render-workers", type=int, help="Override RENDER_WORKERS")
+    parser.add_argument("--render-cache", action="store_true", help="Keep the render cache enabled")
+    parser.add_argument("--llm-cache", action="store_true", help="Reuse structured LLM responses from the shared cache")
+    parser.add_argument("--output", help="Write the full results as JSON to this file")
+    args = parser.parse_args()
+
+    configure_environment(args)
+    if args.corpus_db:
+        prompts = asyncio.run(load_corpus_from_database(args.corpus_db, args.corpus_limit))
+    else:
+        prompts = load_corpus(args.corpus)
+    if not prompts:
+        parser.error("The corpus holds no prompts")
+
+    results = asyncio.run(run(args, prompts))
+    print_summary(results)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output_file:
+            json.dump({"args": vars(args), "results": results}, output_file, indent=2)
+        print(f"\nWrote results to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Benchmark for serializing a CardResponse into the /pattern/generate response body.
+
+Compares the previous controller path (pretty-printed model_dump_json, parsed
+back with json.loads and re-encoded by JSONResponse) with the single-pass
+pydantic_core.to_json path, on fractal cards of increasing size.
+
+Usage (from the backend directory):
+    python -m benchmarks.serialization_benchmark [--repeat 20]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import statistics
+import time
+
+from fastapi.responses import JSONResponse, Response
+from pydantic_core import to_json
+
+from app.engine.fractal_engine.card_generator import DEFAULT_CONTENT_CONFIG, compose_card
+from app.engine.fractal_engine.models import LSystemConfig
+from app.engine.fractal_engine.processor import render_fractal_svg
+
+
+# Fern config rendered at increasing depths to produce progressively larger cards
+FERN_CONFIG = {
+    "engine_type": "l_system",
+    "parameters": {
+        "axiom": "X",
+        "rules": {"X": "F+[[X]-X]-F[-FX]+X", "F": "FF"},
+        "angle": 25.0,
+        "iterations": 5,
+    },
+    "style": {"fill": "none", "stroke": "#2E7D32", "stroke_width": 0.5},
+}
+ITERATIONS = (4, 5, 6, 7)
+
+
+def _build_card(iterations: int):
+    config_data = json.loads(json.dumps(FERN_CONFIG))
+    config_data["parameters"]["iterations"] = iterations
+    config = LSystemConfig.model_validate(config_data)
+    # Keep the engine's progress output out of the results table
+    with contextlib.redirect_stdout(io.StringIO()):
+        return compose_card(render_fractal_svg(config), config, DEFAULT_CONTENT_CONFIG)
+
+
+def three_pass(card_response) -> bytes:
+    """The previous controller path."""
+    card_response_json = card_response.model_dump_json(indent=2)
+    return JSONResponse(content=json.loads(card_response_json)).body
+
+
+def single_pass(card_response) -> bytes:
+    """The current controller path."""
+    return Response(content=to_json(card_response), media_type="application/json").body
+
+
+def _time(func, card_response, repeat: int) -> float:
+    """Median wall time of `func` in milliseconds."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(card_response)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=20, help="Timed runs per case")
+    args = parser.parse_args()
+
+    print(f"{'iterations':>10} {'svg size':>10} {'3-pass ms':>10} {'1-pass ms':>10} {'saved ms':>9} {'speedup':>8}")
+    for iterations in ITERATIONS:
+        card_response = _build_card(iterations)
+        assert json.loads(three_pass(card_response)) == json.loads(single_pass(card_response))
+
+        old_ms = _time(three_pass, card_response, args.repeat)
+        new_ms = _time(single_pass, card_response, args.repeat)
+        size_kb = len(card_response.card_svg) / 1024
+        print(
+            f"{iterations:>10} {size_kb:>8.0f}KB {old_ms:>10.2f} {new_ms:>10.2f} "
+            f"{old_ms - new_ms:>9.2f} {old_ms / new_ms:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Tests for the tail-latency controls in app.inference.resilience.
+
+Calls go through the offline LocalBackend with scripted latencies, so hedging
+is exercised against real (simulated) response times. Run from backend/ with
+`python -m pytest tests`.
+"""
+
+import asyncio
+import random
+import time
+
+import pytest
+
+from app.engine.fractal_engine.models import ContentConfig
+from app.inference.backends.local_backend import LatencyDistribution, LocalBackend
+from app.inference.resilience import ResilientCaller, RetryBudget
+
+PROMPT = "USER PROMPT: a garden wedding"
+
+
+def _warm_tracker(caller: ResilientCaller, key: str, seconds: float) -> None:
+    """Records enough fast calls for the hedge delay to be known."""
+    tracker = caller.tracker(key)
+    for _ in range(tracker.min_samples):
+        tracker.record(seconds)
+
+
+def test_sequence_latency_repeats_its_last_value():
+    distribution = LatencyDistribution("sequence:2.0,0.1")
+    rng = random.Random(0)
+    assert [distribution.sample(rng) for _ in range(4)] == [2.0, 0.1, 0.1, 0.1]
+
+
+def test_slow_first_call_is_hedged():
+    backend = LocalBackend("test-model", latency={"default": LatencyDistribution("sequence:2.0,0.05")})
+    budget = RetryBudget(ratio=0.0, max_tokens=1)
+    caller = ResilientCaller(max_attempts=1, hedging_enabled=True, retry_budget=budget)
+    _warm_tracker(caller, "ContentConfig", 0.05)
+
+    started = time.monotonic()
+    response = asyncio.run(caller.run(lambda: backend.generate_json(PROMPT, ContentConfig), "ContentConfig"))
+    elapsed = time.monotonic() - started
+
+    ContentConfig.model_validate_json(response)
+    # The hedge answers after ~0.1s instead of waiting out the 2s primary call
+    assert elapsed < 1.0
+    assert budget.spent == 1
+
+
+def test_spent_budget_stops_hedging():
+    backend = LocalBackend("test-model", latency={"default": LatencyDistribution("sequence:0.5,0.05")})
+    budget = RetryBudget(ratio=0.0, max_tokens=0)
+    caller = ResilientCaller(max_attempts=1, hedging_enabled=True, retry_budget=budget)
+    _warm_tracker(caller, "ContentConfig", 0.05)
+
+    started = time.monotonic()
+    asyncio.run(caller.run(lambda: backend.generate_json(PROMPT, ContentConfig), "ContentConfig"))
+
+    assert time.monotonic() - started >= 0.5
+    assert budget.spent == 0
+    assert budget.denied == 1
+
+
+def test_spent_budget_stops_retries():
+    budget = RetryBudget(ratio=0.0, max_tokens=1)
+    caller = ResilientCaller(max_attempts=5, hedging_enabled=False, retry_budget=budget)
+    calls = 0
+
+    async def failing_call():
+        nonlocal calls
+        calls += 1
+        raise ValueError("invalid response")
+
+    with pytest.raises(ValueError):
+        asyncio.run(caller.run(failing_call, "ContentConfig"))
+
+    # One retry paid for by the single token, then the empty budget stops the rest
+    assert calls == 2
+    assert budget.spent == 1
+    assert budget.denied == 1